@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework.pagination import (
+    CursorPagination, PageNumberPagination)
+
+
+class NameCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (name, id). Clients can ask for a different
+    page size with ?page_size=, up to API_MAX_PAGE_SIZE.
+    """
+    ordering = ('name', 'id')
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Numbered pages of search results, which are ordered by rank rather than
+    by a column that a cursor could use.
+    """
+    page_size = settings.SEARCH_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
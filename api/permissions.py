@@ -1,7 +1,6 @@
 from rest_framework import permissions
 
-from restaurants.models import Restaurant
-from menus.models import Menu, MenuSection, MenuItem
+from menus_project.permissions import get_restaurant_pk, is_restaurant_admin
 
 
 class HasRestaurantPermissionsOrReadOnly(permissions.BasePermission):
@@ -13,16 +12,10 @@ class HasRestaurantPermissionsOrReadOnly(permissions.BasePermission):
             return True
         elif request.method in permissions.SAFE_METHODS:
             return True
-        elif type(obj) == Restaurant:
-            return request.user in obj.admin_users.all()
-        elif type(obj) == Menu:
-            return request.user in obj.restaurant.admin_users.all()
-        elif type(obj) == MenuSection:
-            return request.user in obj.menu.restaurant.admin_users.all()
-        elif type(obj) == MenuItem:
-            return request.user \
-                in obj.menusection.menu.restaurant.admin_users.all()
+
+        restaurant_pk = get_restaurant_pk(obj)
         # if non-restaurant object submitted, raise TypeError
-        else:
+        if restaurant_pk is None:
             raise TypeError("This permission can only be used with a "
                             "Restaurant-related object.")
+        return is_restaurant_admin(request.user, restaurant_pk)
@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from restaurants.models import Restaurant
 from menus.models import Menu, MenuSection, MenuItem
+from search.models import SearchEntry
 
 
 class RestaurantSerializer(serializers.ModelSerializer):
@@ -27,16 +28,9 @@ class MenuSerializer(serializers.ModelSerializer):
             ['id', 'name', 'menusection_set', 'restaurant_name']
         read_only_fields = ['menusection_set', 'restaurant_name']
 
-    def __init__(self, *args, **kwargs):
-        if 'context' in kwargs \
-                and kwargs['context'].get('restaurant_pk'):
-            self.restaurant = \
-                Restaurant.objects.get(pk=kwargs['context']['restaurant_pk'])
-        super().__init__(*args, **kwargs)
-
     def create(self, validated_data):
         menu = Menu.objects.create(
-            restaurant=self.restaurant, **validated_data)
+            restaurant=self.context['restaurant'], **validated_data)
         return menu
 
 
@@ -50,14 +44,9 @@ class MenuSectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'menuitem_set', 'restaurant_name', 'menu_name']
         read_only_fields = ['menuitem_set', 'restaurant_name', 'menu_name']
 
-    def __init__(self, *args, **kwargs):
-        if 'context' in kwargs and kwargs['context'].get('menu_pk'):
-            self.menu = Menu.objects.get(pk=kwargs['context']['menu_pk'])
-        super().__init__(*args, **kwargs)
-
     def create(self, validated_data):
         menusection = MenuSection.objects.create(
-            menu=self.menu, **validated_data)
+            menu=self.context['menu'], **validated_data)
         return menusection
 
 
@@ -73,14 +62,77 @@ class MenuItemSerializer(serializers.ModelSerializer):
                   'menu_name', 'menusection_name']
         read_only_fields = ['restaurant_name', 'menu_name', 'menusection_name']
 
-    def __init__(self, *args, **kwargs):
-        if 'context' in kwargs \
-                and kwargs['context'].get('menusection_pk'):
-            self.menusection = \
-                MenuSection.objects.get(pk=kwargs['context']['menusection_pk'])
-        super().__init__(*args, **kwargs)
-
     def create(self, validated_data):
         menuitem = MenuItem.objects.create(
-            menusection=self.menusection, **validated_data)
+            menusection=self.context['menusection'], **validated_data)
         return menuitem
+
+
+class MenuItemTreeSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = MenuItem
+        fields = ['id', 'name', 'description', 'price']
+        read_only_fields = fields
+
+
+class MenuSectionTreeSerializer(serializers.ModelSerializer):
+    menuitem_set = MenuItemTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MenuSection
+        fields = ['id', 'name', 'note', 'menuitem_set']
+        read_only_fields = fields
+
+
+class MenuTreeSerializer(serializers.ModelSerializer):
+    menusection_set = MenuSectionTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Menu
+        fields = ['id', 'name', 'description', 'menusection_set']
+        read_only_fields = fields
+
+
+class RestaurantTreeSerializer(serializers.ModelSerializer):
+    """
+    A restaurant with all of its menus, sections and items nested inside
+    it. Expects a queryset from restaurant_menu_tree_queryset().
+    """
+    menu_set = MenuTreeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Restaurant
+        fields = ['id', 'name', 'menu_set']
+        read_only_fields = fields
+
+
+class MenuSectionBulkSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = MenuSection
+        fields = ['id', 'name', 'note']
+        read_only_fields = ['id']
+
+
+class MenuItemBulkSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = MenuItem
+        fields = ['id', 'name', 'description', 'price']
+        read_only_fields = ['id']
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    url = serializers.ReadOnlyField(source='get_absolute_url')
+    restaurant_name = serializers.ReadOnlyField(source='restaurant.name')
+    menu_name = serializers.ReadOnlyField(source='menu.name', default=None)
+    menusection_name = \
+        serializers.ReadOnlyField(source='menusection.name', default=None)
+
+    class Meta:
+        model = SearchEntry
+        fields = ['kind', 'object_id', 'name', 'text', 'url', 'restaurant',
+                  'menu', 'menusection', 'menuitem', 'restaurant_name',
+                  'menu_name', 'menusection_name']
+        read_only_fields = fields
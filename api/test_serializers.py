@@ -225,3 +225,26 @@ class MenuItemSerializerTest(APITestCase):
         # object count increased by 1
         new_menuitem_count = MenuItem.objects.count()
         self.assertEqual(old_menuitem_count + 1, new_menuitem_count)
+
+
+class RestaurantTreeSerializerTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.serializer = serializers.RestaurantTreeSerializer
+        cls.test_menuitem = f.MenuItemFactory(price=1250)
+
+    def test_meta_model_name(self):
+        self.assertEqual(self.serializer.Meta.model.__name__, 'Restaurant')
+
+    def test_meta_fields(self):
+        self.assertEqual(
+            self.serializer.Meta.fields, ['id', 'name', 'menu_set'])
+
+    def test_nested_menuitem_has_price(self):
+        restaurant = self.test_menuitem.menusection.menu.restaurant
+        data = self.serializer(restaurant).data
+        menuitem_data = \
+            data['menu_set'][0]['menusection_set'][0]['menuitem_set'][0]
+        self.assertEqual(menuitem_data['name'], self.test_menuitem.name)
+        self.assertEqual(menuitem_data['price'], 1250)
@@ -1,4 +1,9 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
@@ -7,9 +12,11 @@ from rest_framework.test import APITestCase
 from menus_project import constants as c
 from menus_project import factories as f
 from . import serializers, views
+from .pagination import NameCursorPagination, SearchPagination
 from .permissions import HasRestaurantPermissionsOrReadOnly
 from restaurants.models import Restaurant
 from menus.models import Menu, MenuSection, MenuItem
+from search.backends import SearchResults
 
 class IsUsernameAvailableTest(APITestCase):
 
@@ -108,6 +115,9 @@ class RestaurantListTest(APITestCase):
         self.assertEqual(
             self.view.serializer_class, serializers.RestaurantSerializer)
 
+    def test_pagination_class(self):
+        self.assertEqual(self.view.pagination_class, NameCursorPagination)
+
     # request.GET
     def test_request_get_method_list_objects_unauthenticated_user(self):
         self.client.logout()
@@ -116,7 +126,7 @@ class RestaurantListTest(APITestCase):
 
     def test_request_get_method_list_objects_authenticated_user(self):
         # get expected objects from serializer
-        restaurants = Restaurant.objects.all()
+        restaurants = Restaurant.objects.order_by('name', 'id')
         serializer = serializers.RestaurantSerializer(restaurants, many=True)
 
         # get actual objects from view
@@ -124,7 +134,35 @@ class RestaurantListTest(APITestCase):
         self.assertEqual(self.response.status_code, 200)
 
         # compare the expected result with the actual result
-        self.assertEqual(self.response.data, serializer.data)
+        self.assertEqual(self.response.data['results'], serializer.data)
+
+    def test_request_get_method_list_objects_paginated(self):
+        restaurants = Restaurant.objects.order_by('name', 'id')
+        serializer = serializers.RestaurantSerializer(restaurants, many=True)
+
+        # walk the pages using the next cursor
+        results = []
+        next_url = self.current_test_url + '?page_size=2'
+        while next_url:
+            self.response = self.client.get(next_url)
+            self.assertEqual(self.response.status_code, 200)
+            self.assertLessEqual(len(self.response.data['results']), 2)
+            results += self.response.data['results']
+            next_url = self.response.data['next']
+
+        self.assertEqual(results, serializer.data)
+
+    def test_request_get_method_list_objects_query_count(self):
+        # session, user, restaurants, admin users, menus
+        with self.assertNumQueries(5):
+            self.client.get(self.current_test_url)
+
+        for test_restaurant in f.RestaurantFactory.create_batch(
+                3, admin_users=[self.restaurant_admin_user]):
+            f.MenuFactory.create_batch(2, restaurant=test_restaurant)
+
+        with self.assertNumQueries(5):
+            self.client.get(self.current_test_url)
 
     # request.POST
     def test_request_post_method_create_object_unauthenticated_user(self):
@@ -219,6 +257,19 @@ class RestaurantDetailTest(APITestCase):
         # compare the expected result with the result
         self.assertEqual(self.response.data, dict(serializer.data[0]))
 
+    def test_request_get_method_if_none_match_returns_304(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+
+    def test_request_get_method_if_none_match_unauthenticated_user(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.client.logout()
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 403)
+
     # request.PUT
     def test_request_put_method_update_object_unauthenticated_user(self):
         post_data = {'name': 'Updated Restaurant Name'}
@@ -276,6 +327,114 @@ class RestaurantDetailTest(APITestCase):
         self.assertEqual(old_restaurant_count - 1, new_restaurant_count)
 
 
+class RestaurantTreeTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.view = views.RestaurantTree
+
+        # create model objects
+        cls.test_user = f.UserFactory()
+        cls.test_restaurant = f.RestaurantFactory()
+
+        # generate test url
+        cls.current_test_url = reverse('api:restaurant_tree', kwargs={
+            'restaurant_pk': cls.test_restaurant.pk})
+
+    def setUp(self):
+        self.client.login(username=self.test_user.username,
+                          password=c.TEST_USER_PASSWORD)
+
+    def add_menu(self, number_of_menusections, number_of_menuitems):
+        test_menu = f.MenuFactory(restaurant=self.test_restaurant)
+        for i in range(number_of_menusections):
+            test_menusection = f.MenuSectionFactory(menu=test_menu)
+            for j in range(number_of_menuitems):
+                f.MenuItemFactory(menusection=test_menusection, price=500)
+        return test_menu
+
+    # view attributes
+    def test_view_name(self):
+        self.assertEqual(self.view.__name__, 'RestaurantTree')
+
+    def test_view_parent_class(self):
+        self.assertEqual(self.view.__bases__[-1], generics.RetrieveAPIView)
+
+    def test_permission_classes(self):
+        self.assertEqual(
+            self.view.permission_classes, [HasRestaurantPermissionsOrReadOnly])
+
+    def test_lookup_url_kwarg(self):
+        self.assertEqual(self.view.lookup_url_kwarg, 'restaurant_pk')
+
+    def test_serializer_class(self):
+        self.assertEqual(
+            self.view.serializer_class, serializers.RestaurantTreeSerializer)
+
+    # request.GET
+    def test_request_get_method_unauthenticated_user(self):
+        self.client.logout()
+        self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_get_method_authenticated_user(self):
+        test_menu = self.add_menu(1, 1)
+        test_menusection = test_menu.menusection_set.get()
+        test_menuitem = test_menusection.menuitem_set.get()
+
+        self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(self.response.json(), {
+            'id': self.test_restaurant.pk,
+            'name': self.test_restaurant.name,
+            'menu_set': [{
+                'id': test_menu.pk,
+                'name': test_menu.name,
+                'description': None,
+                'menusection_set': [{
+                    'id': test_menusection.pk,
+                    'name': test_menusection.name,
+                    'note': None,
+                    'menuitem_set': [{
+                        'id': test_menuitem.pk,
+                        'name': test_menuitem.name,
+                        'description': test_menuitem.description,
+                        'price': 500}]}]}]})
+
+    def test_request_get_method_if_none_match_returns_304(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+
+    def test_request_get_method_query_count_does_not_grow_with_tree(self):
+        self.add_menu(1, 1)
+
+        # session, user, restaurant.updated_at, restaurant, menus,
+        # sections, items
+        with self.assertNumQueries(7):
+            self.client.get(self.current_test_url)
+
+        for i in range(3):
+            self.add_menu(3, 3)
+
+        with self.assertNumQueries(7):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(len(self.response.json()['menu_set']), 4)
+
+    # request.PUT
+    def test_request_put_method_not_allowed(self):
+        self.response = self.client.put(
+            self.current_test_url, {'name': 'Updated Restaurant Name'})
+        self.assertEqual(self.response.status_code, 405)
+
+    # bad kwargs
+    def test_bad_kwargs(self):
+        self.response = self.client.get(
+            reverse('api:restaurant_tree', kwargs={'restaurant_pk': 0}))
+        self.assertEqual(self.response.status_code, 404)
+
+
 class MenuListTest(APITestCase):
 
     @classmethod
@@ -292,7 +451,7 @@ class MenuListTest(APITestCase):
             admin_users=[cls.restaurant_admin_user])
 
         # generate test url
-        cls.kwargs = {'restaurant_pk': cls.test_menus[0].pk}
+        cls.kwargs = {'restaurant_pk': cls.test_restaurant.pk}
         cls.current_test_url = reverse('api:menu_list', kwargs=cls.kwargs)
 
     def setUp(self):
@@ -317,6 +476,9 @@ class MenuListTest(APITestCase):
         self.assertEqual(
             self.view.serializer_class, serializers.MenuSerializer)
 
+    def test_pagination_class(self):
+        self.assertEqual(self.view.pagination_class, NameCursorPagination)
+
     # request.GET
     def test_request_get_method_list_objects_unauthenticated_user(self):
         self.client.logout()
@@ -334,7 +496,8 @@ class MenuListTest(APITestCase):
     def test_request_get_method_list_objects_authorized_user(self):
         # get expected result from serializer
         menus = Menu.objects.filter(
-            restaurant__pk=self.test_menus[0].restaurant.pk)
+            restaurant__pk=self.test_menus[0].restaurant.pk) \
+            .order_by('name', 'id')
         serializer = serializers.MenuSerializer(menus, many=True)
 
         # get result from view
@@ -342,7 +505,12 @@ class MenuListTest(APITestCase):
         self.assertEqual(self.response.status_code, 200)
 
         # compare the expected result with the result
-        self.assertEqual(self.response.data, serializer.data)
+        self.assertEqual(self.response.data['results'], serializer.data)
+
+    def test_request_get_method_list_objects_page_size(self):
+        self.response = self.client.get(self.current_test_url + '?page_size=1')
+        self.assertEqual(len(self.response.data['results']), 1)
+        self.assertIsNotNone(self.response.data['next'])
 
     # request.POST
     def test_request_post_method_create_object_unauthenticated_user(self):
@@ -379,6 +547,28 @@ class MenuListTest(APITestCase):
             self.response.data['restaurant_name'], self.test_restaurant.name)
         self.assertEqual(self.response.data['name'], post_data['name'])
 
+    # parent object
+    def test_request_post_method_parent_is_loaded_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.response = self.client.post(
+                self.current_test_url, {'name': c.TEST_MENU_NAME})
+        self.assertEqual(self.response.status_code, 201)
+
+        restaurant_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "restaurants_restaurant"' in query['sql']]
+        self.assertEqual(len(restaurant_selects), 1)
+
+    def test_bad_kwargs(self):
+        self.current_test_url = reverse(
+            'api:menu_list', kwargs={'restaurant_pk': 0})
+        self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 404)
+        self.response = self.client.post(
+            self.current_test_url, {'name': c.TEST_MENU_NAME})
+        self.assertEqual(self.response.status_code, 404)
+
 
 class MenuDetailTest(APITestCase):
 
@@ -449,6 +639,38 @@ class MenuDetailTest(APITestCase):
         # compare the expected result with the result
         self.assertEqual(self.response.data, dict(serializer.data[0]))
 
+    def test_request_get_method_if_none_match_returns_304(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+
+    def test_request_get_method_if_none_match_unauthenticated_user(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.client.logout()
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_get_method_if_none_match_other_restaurant(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        other_restaurant = \
+            f.RestaurantFactory(admin_users=[self.restaurant_admin_user])
+        self.kwargs['restaurant_pk'] = other_restaurant.pk
+        self.response = self.client.get(
+            reverse('api:menu_detail', kwargs=self.kwargs),
+            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 404)
+
+    def test_request_get_method_if_none_match_after_change(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        f.MenuItemFactory(
+            menusection=f.MenuSectionFactory(menu=self.test_menu))
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 200)
+        self.assertNotEqual(self.response['ETag'], etag)
+
     # request.PUT
     def test_request_put_method_update_object_unauthenticated_user(self):
         post_data = {'name': 'Updated Menu Name'}
@@ -549,6 +771,9 @@ class MenuSectionListTest(APITestCase):
         self.assertEqual(
             self.view.serializer_class, serializers.MenuSectionSerializer)
 
+    def test_pagination_class(self):
+        self.assertEqual(self.view.pagination_class, NameCursorPagination)
+
     # request.GET
     def test_request_get_method_list_objects_unauthenticated_user(self):
         self.client.logout()
@@ -565,8 +790,8 @@ class MenuSectionListTest(APITestCase):
 
     def test_request_get_method_list_objects_authorized_user(self):
         # get expected objects from serializer
-        menusections = \
-            MenuSection.objects.filter(menu__pk=self.test_menu.pk)
+        menusections = MenuSection.objects \
+            .filter(menu__pk=self.test_menu.pk).order_by('name', 'id')
         serializer = serializers.MenuSectionSerializer(menusections, many=True)
 
         # get actual objects from view
@@ -574,7 +799,7 @@ class MenuSectionListTest(APITestCase):
         self.assertEqual(self.response.status_code, 200)
 
         # compare the expected result with the actual result
-        self.assertEqual(self.response.data, serializer.data)
+        self.assertEqual(self.response.data['results'], serializer.data)
 
     # request.POST
     def test_request_post_method_create_object_unauthenticated_user(self):
@@ -611,6 +836,34 @@ class MenuSectionListTest(APITestCase):
             self.response.data['menu_name'], self.test_menu.name)
         self.assertEqual(self.response.data['name'], post_data['name'])
 
+    # parent object
+    def test_request_post_method_parent_is_loaded_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.response = self.client.post(
+                self.current_test_url, {'name': c.TEST_MENUSECTION_NAME})
+        self.assertEqual(self.response.status_code, 201)
+
+        menu_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "menus_menu"' in query['sql']]
+        self.assertEqual(len(menu_selects), 1)
+
+    def test_bad_kwargs(self):
+        other_restaurant = \
+            f.RestaurantFactory(admin_users=[self.restaurant_admin_user])
+        for kwargs in [
+                {'restaurant_pk': self.kwargs['restaurant_pk'], 'menu_pk': 0},
+                {'restaurant_pk': other_restaurant.pk,
+                 'menu_pk': self.kwargs['menu_pk']}]:
+            self.current_test_url = \
+                reverse('api:menusection_list', kwargs=kwargs)
+            self.response = self.client.get(self.current_test_url)
+            self.assertEqual(self.response.status_code, 404)
+            self.response = self.client.post(
+                self.current_test_url, {'name': c.TEST_MENUSECTION_NAME})
+            self.assertEqual(self.response.status_code, 404)
+
 
 class MenuSectionDetailTest(APITestCase):
 
@@ -683,6 +936,29 @@ class MenuSectionDetailTest(APITestCase):
         # compare the expected result with the result
         self.assertEqual(self.response.data, dict(serializer.data[0]))
 
+    def test_request_get_method_if_none_match_returns_304(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+
+    def test_request_get_method_if_none_match_unauthenticated_user(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.client.logout()
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_get_method_if_none_match_other_menu(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        other_menu = f.MenuFactory(
+            restaurant=self.test_menusection.menu.restaurant)
+        self.kwargs['menu_pk'] = other_menu.pk
+        self.response = self.client.get(
+            reverse('api:menusection_detail', kwargs=self.kwargs),
+            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 404)
+
     # request.PUT
     def test_request_put_method_update_object_unauthenticated_user(self):
         post_data = {'name': 'Updated Menu Section Name'}
@@ -787,6 +1063,9 @@ class MenuItemListTest(APITestCase):
         self.assertEqual(
             self.view.serializer_class, serializers.MenuItemSerializer)
 
+    def test_pagination_class(self):
+        self.assertEqual(self.view.pagination_class, NameCursorPagination)
+
     # request.GET
     def test_request_get_method_list_objects_unauthenticated_user(self):
         self.client.logout()
@@ -804,7 +1083,7 @@ class MenuItemListTest(APITestCase):
     def test_request_get_method_list_objects_authorized_user(self):
         # get expected objects from serializer
         menuitems = MenuItem.objects.filter(
-            menusection__pk=self.test_menusection.pk)
+            menusection__pk=self.test_menusection.pk).order_by('name', 'id')
         serializer = serializers.MenuItemSerializer(menuitems, many=True)
 
         # get actual objects from view
@@ -812,7 +1091,7 @@ class MenuItemListTest(APITestCase):
         self.assertEqual(self.response.status_code, 200)
 
         # compare the expected result with the actual result
-        self.assertEqual(self.response.data, serializer.data)
+        self.assertEqual(self.response.data['results'], serializer.data)
 
     # request.POST
     def test_request_post_method_create_object_unauthenticated_user(self):
@@ -849,6 +1128,33 @@ class MenuItemListTest(APITestCase):
             self.response.data['menusection_name'], self.test_menusection.name)
         self.assertEqual(self.response.data['name'], post_data['name'])
 
+    # parent object
+    def test_request_post_method_parent_is_loaded_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.response = self.client.post(
+                self.current_test_url, {'name': c.TEST_MENUITEM_NAME})
+        self.assertEqual(self.response.status_code, 201)
+
+        menusection_selects = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "menus_menusection"' in query['sql']]
+        self.assertEqual(len(menusection_selects), 1)
+
+    def test_bad_kwargs(self):
+        other_menu = f.MenuFactory(admin_users=[self.restaurant_admin_user])
+        for kwargs in [
+                dict(self.kwargs, menusection_pk=0),
+                dict(self.kwargs, menu_pk=other_menu.pk),
+                dict(self.kwargs, restaurant_pk=other_menu.restaurant.pk)]:
+            self.current_test_url = \
+                reverse('api:menuitem_list', kwargs=kwargs)
+            self.response = self.client.get(self.current_test_url)
+            self.assertEqual(self.response.status_code, 404)
+            self.response = self.client.post(
+                self.current_test_url, {'name': c.TEST_MENUITEM_NAME})
+            self.assertEqual(self.response.status_code, 404)
+
 
 class MenuItemDetailTest(APITestCase):
 
@@ -921,6 +1227,29 @@ class MenuItemDetailTest(APITestCase):
         # compare the expected result with the result
         self.assertEqual(self.response.data, dict(serializer.data[0]))
 
+    def test_request_get_method_if_none_match_returns_304(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 304)
+
+    def test_request_get_method_if_none_match_unauthenticated_user(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        self.client.logout()
+        self.response = self.client.get(
+            self.current_test_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_get_method_if_none_match_other_menusection(self):
+        etag = self.client.get(self.current_test_url)['ETag']
+        other_menusection = f.MenuSectionFactory(
+            menu=self.test_menuitem.menusection.menu)
+        self.kwargs['menusection_pk'] = other_menusection.pk
+        self.response = self.client.get(
+            reverse('api:menuitem_detail', kwargs=self.kwargs),
+            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(self.response.status_code, 404)
+
     # request.PUT
     def test_request_put_method_update_object_unauthenticated_user(self):
         post_data = {'name': 'Updated Menu Item Name',
@@ -979,3 +1308,379 @@ class MenuItemDetailTest(APITestCase):
         # object deleted successfully, object count decreased by one
         self.assertEqual(self.response.status_code, 204)
         self.assertEqual(old_menuitem_count - 1, new_menuitem_count)
+
+
+class MenuSectionBulkTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.view = views.MenuSectionBulk
+
+        # create model objects
+        cls.test_user = f.UserFactory()
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menusection = \
+            f.MenuSectionFactory(admin_users=[cls.restaurant_admin_user])
+        cls.test_menu = cls.test_menusection.menu
+
+        # generate test url
+        cls.kwargs = {
+            'restaurant_pk': cls.test_menu.restaurant.pk,
+            'menu_pk': cls.test_menu.pk}
+        cls.current_test_url = \
+            reverse('api:menusection_bulk', kwargs=cls.kwargs)
+
+    def setUp(self):
+        self.client.login(username=self.restaurant_admin_user.username,
+                          password=c.TEST_USER_PASSWORD)
+
+    # view attributes
+    def test_view_name(self):
+        self.assertEqual(self.view.__name__, 'MenuSectionBulk')
+
+    def test_view_parent_class(self):
+        self.assertEqual(self.view.__bases__[-1], views.BulkUpsertView)
+
+    def test_permission_classes(self):
+        self.assertEqual(
+            self.view.permission_classes, [HasRestaurantPermissionsOrReadOnly])
+
+    def test_serializer_class(self):
+        self.assertEqual(
+            self.view.serializer_class, serializers.MenuSectionBulkSerializer)
+
+    # request.POST
+    def test_request_post_method_unauthenticated_user(self):
+        self.client.logout()
+        self.response = self.client.post(
+            self.current_test_url, [{'name': 'Appetizers'}], format='json')
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_post_method_authenticated_user(self):
+        self.client.login(
+            username=self.test_user.username, password=c.TEST_USER_PASSWORD)
+        self.response = self.client.post(
+            self.current_test_url, [{'name': 'Appetizers'}], format='json')
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_post_method_create_and_update_objects(self):
+        post_data = [
+            {'name': 'Appetizers', 'note': 'New note'},
+            {'name': self.test_menusection.name, 'note': 'Updated note'}]
+
+        old_menusection_count = MenuSection.objects.count()
+        self.response = self.client.post(
+            self.current_test_url, post_data, format='json')
+        self.assertEqual(self.response.status_code, 201)
+        self.assertEqual(
+            MenuSection.objects.count(), old_menusection_count + 1)
+
+        # objects are returned in request order, with their ids
+        new_menusection = MenuSection.objects.get(
+            menu=self.test_menu, slug='appetizers')
+        self.assertEqual(
+            [row['id'] for row in self.response.data],
+            [new_menusection.pk, self.test_menusection.pk])
+        self.assertEqual(new_menusection.note, 'New note')
+
+        self.test_menusection.refresh_from_db()
+        self.assertEqual(self.test_menusection.note, 'Updated note')
+
+    def test_request_post_method_update_only(self):
+        self.response = self.client.post(
+            self.current_test_url,
+            [{'name': self.test_menusection.name, 'note': 'Updated note'}],
+            format='json')
+        self.assertEqual(self.response.status_code, 200)
+
+    def test_request_post_method_touches_restaurant(self):
+        old_updated_at = self.test_menu.restaurant.updated_at
+        self.client.post(
+            self.current_test_url, [{'name': 'Appetizers'}], format='json')
+        self.test_menu.restaurant.refresh_from_db()
+        self.assertGreater(
+            self.test_menu.restaurant.updated_at, old_updated_at)
+
+    def test_request_post_method_invalid_rows_write_nothing(self):
+        post_data = [
+            {'name': 'Appetizers'},
+            {'name': ''},
+            {'name': c.RESERVED_KEYWORDS[0]},
+            {'name': 'appetizers'}]
+
+        old_menusection_count = MenuSection.objects.count()
+        self.response = self.client.post(
+            self.current_test_url, post_data, format='json')
+        self.assertEqual(self.response.status_code, 400)
+        self.assertEqual(MenuSection.objects.count(), old_menusection_count)
+
+        # errors are aligned with the rows of the request
+        self.assertEqual(len(self.response.data), len(post_data))
+        self.assertEqual(self.response.data[0], {})
+        self.assertIn('name', self.response.data[1])
+        self.assertEqual(
+            self.response.data[2], {'name': [c.RESERVED_KEYWORD_ERROR_STRING]})
+        self.assertEqual(
+            self.response.data[3],
+            {'name': [c.API_BULK_DUPLICATE_SLUG_ERROR_STRING]})
+
+    def test_request_post_method_not_a_list(self):
+        self.response = self.client.post(
+            self.current_test_url, {'name': 'Appetizers'}, format='json')
+        self.assertEqual(self.response.status_code, 400)
+        self.assertEqual(
+            self.response.data,
+            {'non_field_errors': [c.API_BULK_NOT_A_LIST_ERROR_STRING]})
+
+    @override_settings(API_MAX_BULK_SIZE=2)
+    def test_request_post_method_too_many_objects(self):
+        post_data = [{'name': 'Section %d' % i} for i in range(3)]
+        self.response = self.client.post(
+            self.current_test_url, post_data, format='json')
+        self.assertEqual(self.response.status_code, 400)
+        self.assertEqual(
+            self.response.data,
+            {'non_field_errors': [
+                c.API_BULK_TOO_MANY_OBJECTS_ERROR_STRING.format(max_size=2)]})
+
+    def test_request_post_method_number_of_queries(self):
+        def post_sections(count):
+            post_data = [{'name': self.test_menusection.name}] + [
+                {'name': 'Section %d-%d' % (count, i)} for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                self.response = self.client.post(
+                    self.current_test_url, post_data, format='json')
+            self.assertEqual(self.response.status_code, 201)
+            return len(queries)
+
+        self.assertEqual(post_sections(1), post_sections(20))
+
+    def test_bad_kwargs(self):
+        other_menu = f.MenuFactory(admin_users=[self.restaurant_admin_user])
+        for kwargs in [
+                dict(self.kwargs, menu_pk=0),
+                dict(self.kwargs, restaurant_pk=other_menu.restaurant.pk)]:
+            self.current_test_url = \
+                reverse('api:menusection_bulk', kwargs=kwargs)
+            self.response = self.client.post(
+                self.current_test_url, [{'name': 'Appetizers'}],
+                format='json')
+            self.assertEqual(self.response.status_code, 404)
+
+
+class MenuItemBulkTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.view = views.MenuItemBulk
+
+        # create model objects
+        cls.test_user = f.UserFactory()
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menuitem = \
+            f.MenuItemFactory(admin_users=[cls.restaurant_admin_user])
+        cls.test_menusection = cls.test_menuitem.menusection
+
+        # generate test url
+        cls.kwargs = {
+            'restaurant_pk': cls.test_menusection.menu.restaurant.pk,
+            'menu_pk': cls.test_menusection.menu.pk,
+            'menusection_pk': cls.test_menusection.pk}
+        cls.current_test_url = \
+            reverse('api:menuitem_bulk', kwargs=cls.kwargs)
+
+    def setUp(self):
+        self.client.login(username=self.restaurant_admin_user.username,
+                          password=c.TEST_USER_PASSWORD)
+
+    # view attributes
+    def test_view_name(self):
+        self.assertEqual(self.view.__name__, 'MenuItemBulk')
+
+    def test_view_parent_class(self):
+        self.assertEqual(self.view.__bases__[-1], views.BulkUpsertView)
+
+    def test_serializer_class(self):
+        self.assertEqual(
+            self.view.serializer_class, serializers.MenuItemBulkSerializer)
+
+    # request.POST
+    def test_request_post_method_authenticated_user(self):
+        self.client.login(
+            username=self.test_user.username, password=c.TEST_USER_PASSWORD)
+        self.response = self.client.post(
+            self.current_test_url, [{'name': 'Garden Salad'}], format='json')
+        self.assertEqual(self.response.status_code, 403)
+
+    def test_request_post_method_create_and_update_objects(self):
+        post_data = [
+            {'name': 'Garden Salad', 'price': 500},
+            {'name': self.test_menuitem.name, 'description': 'Updated'}]
+
+        old_menuitem_count = MenuItem.objects.count()
+        self.response = self.client.post(
+            self.current_test_url, post_data, format='json')
+        self.assertEqual(self.response.status_code, 201)
+        self.assertEqual(MenuItem.objects.count(), old_menuitem_count + 1)
+
+        new_menuitem = MenuItem.objects.get(
+            menusection=self.test_menusection, slug='garden-salad')
+        self.assertEqual(new_menuitem.price, 500)
+        self.assertEqual(
+            [row['id'] for row in self.response.data],
+            [new_menuitem.pk, self.test_menuitem.pk])
+
+        # fields that are not submitted are left unchanged
+        old_price = self.test_menuitem.price
+        self.test_menuitem.refresh_from_db()
+        self.assertEqual(self.test_menuitem.description, 'Updated')
+        self.assertEqual(self.test_menuitem.price, old_price)
+
+    def test_request_post_method_updates_search_entries(self):
+        post_data = [
+            {'name': 'Garden Salad'},
+            {'name': self.test_menuitem.name, 'description': 'Vinaigrette'}]
+        self.client.post(self.current_test_url, post_data, format='json')
+        self.assertEqual(
+            [entry.name for entry in SearchResults('garden')[:10]],
+            ['Garden Salad'])
+        self.assertEqual(
+            [entry.menuitem for entry in SearchResults('vinaigrette')[:10]],
+            [self.test_menuitem])
+
+    # the other request's queries are counted against this one's budget
+    @override_settings(QUERY_BUDGETS_STRICT=False)
+    def test_request_post_method_only_writes_submitted_fields(self):
+        get_serializer = views.MenuItemBulk.get_serializer
+        updated = []
+
+        def get_serializer_after_concurrent_update(view, *args, **kwargs):
+            # another request changes the price after the view has fetched
+            # the existing objects
+            if not updated:
+                MenuItem.objects.filter(pk=self.test_menuitem.pk) \
+                    .update(price=999)
+                updated.append(True)
+            return get_serializer(view, *args, **kwargs)
+
+        post_data = [
+            {'name': self.test_menuitem.name, 'description': 'Updated'}]
+        with mock.patch.object(views.MenuItemBulk, 'get_serializer',
+                               get_serializer_after_concurrent_update):
+            self.response = self.client.post(
+                self.current_test_url, post_data, format='json')
+        self.assertEqual(self.response.status_code, 200)
+        self.test_menuitem.refresh_from_db()
+        self.assertEqual(self.test_menuitem.description, 'Updated')
+        self.assertEqual(self.test_menuitem.price, 999)
+
+    # the other request's queries are counted against this one's budget
+    @override_settings(QUERY_BUDGETS_STRICT=False)
+    def test_request_post_method_concurrent_create(self):
+        get_serializer = views.MenuItemBulk.get_serializer
+
+        def get_serializer_after_concurrent_create(view, *args, **kwargs):
+            # another request creates one of the objects after the view has
+            # fetched the existing slugs
+            if not MenuItem.objects.filter(slug='garden-salad').exists():
+                f.MenuItemFactory(
+                    name='Garden Salad', menusection=self.test_menusection)
+            return get_serializer(view, *args, **kwargs)
+
+        post_data = [{'name': 'Caesar Salad'}, {'name': 'Garden Salad'}]
+        with mock.patch.object(views.MenuItemBulk, 'get_serializer',
+                               get_serializer_after_concurrent_create):
+            self.response = self.client.post(
+                self.current_test_url, post_data, format='json')
+        self.assertEqual(self.response.status_code, 400)
+        self.assertEqual(
+            self.response.data,
+            [{}, {'name': [MenuItem.duplicate_slug_error_string]}])
+        self.assertFalse(MenuItem.objects.filter(slug='caesar-salad').exists())
+
+    def test_bad_kwargs(self):
+        other_menusection = \
+            f.MenuSectionFactory(admin_users=[self.restaurant_admin_user])
+        for kwargs in [
+                dict(self.kwargs, menusection_pk=0),
+                dict(self.kwargs, menusection_pk=other_menusection.pk)]:
+            self.current_test_url = \
+                reverse('api:menuitem_bulk', kwargs=kwargs)
+            self.response = self.client.post(
+                self.current_test_url, [{'name': 'Garden Salad'}],
+                format='json')
+            self.assertEqual(self.response.status_code, 404)
+
+
+class SearchListTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.view = views.SearchList
+        cls.test_menuitem = f.MenuItemFactory(
+            name="Margherita", description="Tomato and mozzarella")
+        cls.current_test_url = reverse('api:search')
+
+    # view attributes
+    def test_view_parent_class(self):
+        self.assertEqual(self.view.__bases__[-1], generics.ListAPIView)
+
+    def test_serializer_class(self):
+        self.assertEqual(
+            self.view.serializer_class, serializers.SearchResultSerializer)
+
+    def test_pagination_class(self):
+        self.assertEqual(self.view.pagination_class, SearchPagination)
+
+    # request.GET
+    def test_request_get_method_unauthenticated_user(self):
+        with self.assertNumQueries(3):
+            self.response = self.client.get(
+                self.current_test_url, {'q': 'marg'})
+        self.assertEqual(self.response.status_code, 200)
+        self.assertEqual(self.response.data['count'], 1)
+        menusection = self.test_menuitem.menusection
+        self.assertEqual(self.response.data['results'], [{
+            'kind': 'menuitem',
+            'object_id': self.test_menuitem.pk,
+            'name': 'Margherita',
+            'text': 'Tomato and mozzarella',
+            'url': self.test_menuitem.get_absolute_url(),
+            'restaurant': menusection.menu.restaurant.pk,
+            'menu': menusection.menu.pk,
+            'menusection': menusection.pk,
+            'menuitem': self.test_menuitem.pk,
+            'restaurant_name': menusection.menu.restaurant.name,
+            'menu_name': menusection.menu.name,
+            'menusection_name': menusection.name}])
+
+    def test_request_get_method_restaurant_result(self):
+        restaurant = self.test_menuitem.menusection.menu.restaurant
+        self.response = self.client.get(
+            self.current_test_url, {'q': restaurant.name})
+        result = self.response.data['results'][0]
+        self.assertEqual(result['kind'], 'restaurant')
+        self.assertEqual(result['url'], restaurant.get_absolute_url())
+        self.assertIsNone(result['menu'])
+        self.assertIsNone(result['menu_name'])
+
+    def test_request_get_method_paginated(self):
+        for name in ["Margherita Speciale", "Margherita Bianca"]:
+            f.MenuItemFactory(name=name)
+        self.response = self.client.get(
+            self.current_test_url, {'q': 'margherita', 'page_size': 2})
+        self.assertEqual(self.response.data['count'], 3)
+        self.assertEqual(len(self.response.data['results']), 2)
+
+        self.response = self.client.get(self.response.data['next'])
+        self.assertEqual(len(self.response.data['results']), 1)
+        self.assertIsNone(self.response.data['next'])
+
+    def test_request_get_method_empty_query(self):
+        with self.assertNumQueries(0):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.data['count'], 0)
+
+    def test_request_post_method_not_allowed(self):
+        self.response = self.client.post(self.current_test_url, {})
+        self.assertEqual(self.response.status_code, 405)
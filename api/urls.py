@@ -1,13 +1,14 @@
 from django.urls import path
 from rest_framework.authtoken.views import obtain_auth_token
 
+from menus_project.async_views import async_read_view
 from . import views
 
 app_name = 'api'
 
 urlpatterns = [
     path('',
-         views.api_root,
+         async_read_view(views.api_root),
          name='api_root'),
     path('api-token-auth/',
          obtain_auth_token,
@@ -15,38 +16,54 @@ urlpatterns = [
 
     # users
     path('users/is-username-available/<str:username>/',
-         views.is_username_available,
+         async_read_view(views.is_username_available),
          name='is_username_available'),
     path('users/is-email-available/<str:email>/',
-         views.is_email_available,
+         async_read_view(views.is_email_available),
          name='is_email_available'),
 
+    # search
+    path('search/',
+         async_read_view(views.SearchList.as_view()),
+         name='search'),
+
     # restaurants
     path('restaurants/',
-         views.RestaurantList.as_view(),
+         async_read_view(views.RestaurantList.as_view()),
          name='restaurant_list'),
     path('restaurants/<int:restaurant_pk>/',
-         views.RestaurantDetail.as_view(),
+         async_read_view(views.RestaurantDetail.as_view()),
          name='restaurant_detail'),
+    path('restaurants/<int:restaurant_pk>/tree/',
+         async_read_view(views.RestaurantTree.as_view()),
+         name='restaurant_tree'),
     path('restaurants/<int:restaurant_pk>/menus/',
-         views.MenuList.as_view(),
+         async_read_view(views.MenuList.as_view()),
          name='menu_list'),
     path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/',
-         views.MenuDetail.as_view(),
+         async_read_view(views.MenuDetail.as_view()),
          name='menu_detail'),
     path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/sections/',
-         views.MenuSectionList.as_view(),
+         async_read_view(views.MenuSectionList.as_view()),
          name='menusection_list'),
+    path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/sections/'
+         'bulk/',
+         views.MenuSectionBulk.as_view(),
+         name='menusection_bulk'),
     path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/sections/'
          '<int:menusection_pk>/',
-         views.MenuSectionDetail.as_view(),
+         async_read_view(views.MenuSectionDetail.as_view()),
          name='menusection_detail'),
     path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/sections/'
          '<int:menusection_pk>/items/',
-         views.MenuItemList.as_view(),
+         async_read_view(views.MenuItemList.as_view()),
          name='menuitem_list'),
+    path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/sections/'
+         '<int:menusection_pk>/items/bulk/',
+         views.MenuItemBulk.as_view(),
+         name='menuitem_bulk'),
     path('restaurants/<int:restaurant_pk>/menus/<int:menu_pk>/sections/'
          '<int:menusection_pk>/items/<int:menuitem_pk>/',
-         views.MenuItemDetail.as_view(),
+         async_read_view(views.MenuItemDetail.as_view()),
          name='menuitem_detail'),
     ]
@@ -1,14 +1,29 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
 from django.http import HttpResponseRedirect, JsonResponse
 from django.urls import reverse
-from rest_framework import generics
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from . import serializers
+from .pagination import NameCursorPagination, SearchPagination
 from .permissions import HasRestaurantPermissionsOrReadOnly
+from menus_project.conditional import (
+    ConditionalGetMixin, get_restaurant_etag, get_validating_restaurant)
+from menus_project import constants as c
 from menus_project.constants import FRONTEND_SERVER_URL_CONFIRM_EMAIL
+from restaurants.loaders import restaurant_menu_tree_queryset
 from restaurants.models import Restaurant
 from menus.models import Menu, MenuSection, MenuItem
+from search.backends import SearchResults
+from search.models import index_objects
 
 UserModel = get_user_model()
 
@@ -35,13 +50,215 @@ def is_email_available(request, email):
         return JsonResponse({'isEmailAvailable': False})
 
 
+class RestaurantConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for API detail views. The restaurant is found with
+    conditional_restaurant_lookups, a dict of {lookup: url_kwarg} with an
+    entry for every pk in the URL, so that a URL whose objects do not belong
+    together is a 404 rather than a 304.
+    """
+    conditional_restaurant_lookups = {'pk': 'restaurant_pk'}
+
+    def get_conditional_etag(self, restaurant):
+        # the JSON and browsable API renderings of an object differ
+        return get_restaurant_etag(
+            restaurant, self.request.accepted_renderer.format)
+
+    def get_conditional_restaurant(self):
+        restaurant = get_validating_restaurant(**{
+            lookup: self.kwargs[url_kwarg] for lookup, url_kwarg
+            in self.conditional_restaurant_lookups.items()})
+        if restaurant is not None:
+            self.check_object_permissions(self.request, restaurant)
+        return restaurant
+
+
+def prefetch_pks(lookup, model, *fields):
+    """
+    Prefetch a relation that is only serialized as a list of primary keys.
+    A reverse foreign key relation must also pass the name of the foreign
+    key, so the prefetched rows can be matched to their parents.
+    """
+    return Prefetch(lookup, queryset=model.objects.only('pk', *fields))
+
+
+class ParentObjectMixin:
+    """
+    For list views nested under a parent object. The parent is resolved
+    once per request, used for the object permission check and passed to
+    the serializer as context[parent_context_name]. A missing parent is a
+    404.
+    """
+    parent_context_name = None
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        self.check_object_permissions(request, self.get_parent())
+
+    def get_parent(self):
+        if not hasattr(self, 'parent'):
+            self.parent = generics.get_object_or_404(
+                self.get_parent_queryset())
+        return self.parent
+
+    def get_parent_queryset(self):
+        raise NotImplementedError
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context[self.parent_context_name] = self.get_parent()
+        return context
+
+
+class RestaurantParentMixin(ParentObjectMixin):
+    parent_context_name = 'restaurant'
+
+    def get_parent_queryset(self):
+        return Restaurant.objects.filter(pk=self.kwargs['restaurant_pk'])
+
+
+class MenuParentMixin(ParentObjectMixin):
+    parent_context_name = 'menu'
+
+    def get_parent_queryset(self):
+        return Menu.objects.select_related('restaurant').filter(
+            restaurant__pk=self.kwargs['restaurant_pk'],
+            pk=self.kwargs['menu_pk'])
+
+
+class MenuSectionParentMixin(ParentObjectMixin):
+    parent_context_name = 'menusection'
+
+    def get_parent_queryset(self):
+        return MenuSection.objects.select_related('menu__restaurant').filter(
+            menu__restaurant__pk=self.kwargs['restaurant_pk'],
+            menu__pk=self.kwargs['menu_pk'],
+            pk=self.kwargs['menusection_pk'])
+
+
+class BulkUpsertView(generics.GenericAPIView):
+    """
+    Create or update a list of objects under one parent in a single
+    transaction. Each row is matched to an existing object by the slug of
+    its name, checked in memory against one fetch of the parent's existing
+    slugs.
+
+    If any row is invalid, nothing is written and the response is a list
+    of per-row errors in request order (empty for valid rows).
+    """
+    permission_classes = [HasRestaurantPermissionsOrReadOnly]
+
+    def get_parent_restaurant(self):
+        raise NotImplementedError
+
+    def post(self, request, *args, **kwargs):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'non_field_errors': [c.API_BULK_NOT_A_LIST_ERROR_STRING]},
+                status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.API_MAX_BULK_SIZE:
+            return Response(
+                {'non_field_errors': [
+                    c.API_BULK_TOO_MANY_OBJECTS_ERROR_STRING.format(
+                        max_size=settings.API_MAX_BULK_SIZE)]},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_serializer_class().Meta.model
+        parent_filter = {self.parent_context_name: self.get_parent()}
+        existing_objects = {
+            obj.slug: obj for obj in model.objects.filter(**parent_filter)}
+
+        errors = []
+        objs = []
+        slugs = set()
+        objs_to_create = []
+        # by the fields submitted for them
+        objs_to_update = defaultdict(list)
+        updated_at = timezone.now()
+        for row in rows:
+            serializer = self.get_serializer(data=row)
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+
+            slug = slugify(serializer.validated_data['name'])
+            if slug in c.RESERVED_KEYWORDS:
+                errors.append({'name': [c.RESERVED_KEYWORD_ERROR_STRING]})
+                continue
+            if slug in slugs:
+                errors.append(
+                    {'name': [c.API_BULK_DUPLICATE_SLUG_ERROR_STRING]})
+                continue
+            slugs.add(slug)
+            errors.append({})
+
+            obj = existing_objects.get(slug)
+            if obj is None:
+                obj = model(
+                    slug=slug, **parent_filter, **serializer.validated_data)
+                objs_to_create.append(obj)
+            else:
+                for field, value in serializer.validated_data.items():
+                    setattr(obj, field, value)
+                obj.updated_at = updated_at
+                objs_to_update[tuple(sorted(serializer.validated_data))] \
+                    .append(obj)
+            objs.append(obj)
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objs_to_create)
+                # only the submitted fields are written, so that a field
+                # changed since the objects were fetched (e.g. by an image
+                # job) is not reverted
+                for fields, group in objs_to_update.items():
+                    model.objects.bulk_update(group, [*fields, 'updated_at'])
+                # bulk_create() and bulk_update() do not send post_save
+                index_objects(model.objects.filter(
+                    slug__in=slugs, **parent_filter))
+                self.get_parent_restaurant().touch()
+        except IntegrityError:
+            # another request has created some of the new objects since the
+            # existing slugs were fetched
+            new_slugs = {obj.slug for obj in objs_to_create}
+            duplicate_slugs = set(model.objects.filter(
+                slug__in=new_slugs, **parent_filter)
+                .values_list('slug', flat=True))
+            if not duplicate_slugs:
+                raise
+            return Response(
+                [{'name': [model.duplicate_slug_error_string]}
+                 if obj.slug in duplicate_slugs and obj.slug in new_slugs
+                 else {} for obj in objs],
+                status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_create() does not set primary keys on every database backend
+        saved_objects = {
+            obj.slug: obj for obj in model.objects.filter(
+                slug__in=slugs, **parent_filter)}
+        serializer = self.get_serializer(
+            [saved_objects[obj.slug] for obj in objs], many=True)
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if objs_to_create
+            else status.HTTP_200_OK)
+
+
 class RestaurantList(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
-    queryset = Restaurant.objects.all()
+    queryset = Restaurant.objects.prefetch_related(
+        prefetch_pks('admin_users', UserModel),
+        prefetch_pks('menu_set', Menu, 'restaurant'))
     serializer_class = serializers.RestaurantSerializer
+    pagination_class = NameCursorPagination
 
 
-class RestaurantDetail(generics.RetrieveUpdateDestroyAPIView):
+class RestaurantDetail(
+        RestaurantConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
     lookup_url_kwarg = 'restaurant_pk'
     serializer_class = serializers.RestaurantSerializer
@@ -50,86 +267,124 @@ class RestaurantDetail(generics.RetrieveUpdateDestroyAPIView):
         return Restaurant.objects.filter(pk=self.kwargs['restaurant_pk'])
 
 
-class MenuList(generics.ListCreateAPIView):
+class RestaurantTree(RestaurantConditionalGetMixin, generics.RetrieveAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
     lookup_url_kwarg = 'restaurant_pk'
-    serializer_class = serializers.MenuSerializer
+    serializer_class = serializers.RestaurantTreeSerializer
 
-    def check_permissions(self, request):
-        super().check_permissions(request)
-        obj = Restaurant.objects.get(pk=self.kwargs['restaurant_pk'])
-        super().check_object_permissions(request, obj)
+    def get_queryset(self):
+        return restaurant_menu_tree_queryset() \
+            .filter(pk=self.kwargs['restaurant_pk'])
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['restaurant_pk'] = self.kwargs['restaurant_pk']
-        return context
+
+class MenuList(RestaurantParentMixin, generics.ListCreateAPIView):
+    permission_classes = [HasRestaurantPermissionsOrReadOnly]
+    lookup_url_kwarg = 'restaurant_pk'
+    serializer_class = serializers.MenuSerializer
+    pagination_class = NameCursorPagination
 
     def get_queryset(self):
-        return Menu.objects.filter(restaurant__pk=self.kwargs['restaurant_pk'])
+        return Menu.objects \
+            .filter(restaurant__pk=self.kwargs['restaurant_pk']) \
+            .select_related('restaurant') \
+            .prefetch_related(
+                prefetch_pks('menusection_set', MenuSection, 'menu'))
 
 
-class MenuDetail(generics.RetrieveUpdateDestroyAPIView):
+class MenuDetail(
+        RestaurantConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
+    conditional_restaurant_lookups = {
+        'pk': 'restaurant_pk', 'menu__pk': 'menu_pk'}
     lookup_url_kwarg = 'menu_pk'
     serializer_class = serializers.MenuSerializer
 
     def get_queryset(self):
-        return Menu.objects.filter(pk=self.kwargs['menu_pk'])
+        return Menu.objects.filter(
+            restaurant__pk=self.kwargs['restaurant_pk'],
+            pk=self.kwargs['menu_pk'])
 
 
-class MenuSectionList(generics.ListCreateAPIView):
+class MenuSectionList(MenuParentMixin, generics.ListCreateAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
     lookup_url_kwarg = 'menu_pk'
     serializer_class = serializers.MenuSectionSerializer
-
-    def check_permissions(self, request):
-        super().check_permissions(request)
-        obj = Restaurant.objects.get(pk=self.kwargs['restaurant_pk'])
-        super().check_object_permissions(request, obj)
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['menu_pk'] = self.kwargs['menu_pk']
-        return context
+    pagination_class = NameCursorPagination
 
     def get_queryset(self):
-        return MenuSection.objects.filter(menu__pk=self.kwargs['menu_pk'])
+        return MenuSection.objects.filter(menu__pk=self.kwargs['menu_pk']) \
+            .select_related('menu__restaurant') \
+            .prefetch_related(
+                prefetch_pks('menuitem_set', MenuItem, 'menusection'))
 
 
-class MenuSectionDetail(generics.RetrieveUpdateDestroyAPIView):
+class MenuSectionDetail(
+        RestaurantConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
+    conditional_restaurant_lookups = {
+        'pk': 'restaurant_pk', 'menu__pk': 'menu_pk',
+        'menu__menusection__pk': 'menusection_pk'}
     lookup_url_kwarg = 'menusection_pk'
     serializer_class = serializers.MenuSectionSerializer
 
     def get_queryset(self):
-        return MenuSection.objects.filter(pk=self.kwargs['menusection_pk'])
+        return MenuSection.objects.filter(
+            menu__restaurant__pk=self.kwargs['restaurant_pk'],
+            menu__pk=self.kwargs['menu_pk'],
+            pk=self.kwargs['menusection_pk'])
 
 
-class MenuItemList(generics.ListCreateAPIView):
+class MenuItemList(MenuSectionParentMixin, generics.ListCreateAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
     lookup_url_kwarg = 'menu_pk'
     serializer_class = serializers.MenuItemSerializer
-
-    def check_permissions(self, request):
-        super().check_permissions(request)
-        obj = Restaurant.objects.get(pk=self.kwargs['restaurant_pk'])
-        super().check_object_permissions(request, obj)
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['menusection_pk'] = self.kwargs['menusection_pk']
-        return context
+    pagination_class = NameCursorPagination
 
     def get_queryset(self):
         return MenuItem.objects.filter(
-            menusection=self.kwargs['menusection_pk'])
+            menusection=self.kwargs['menusection_pk']) \
+            .select_related('menusection__menu__restaurant')
 
 
-class MenuItemDetail(generics.RetrieveUpdateDestroyAPIView):
+class MenuItemDetail(
+        RestaurantConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [HasRestaurantPermissionsOrReadOnly]
+    conditional_restaurant_lookups = {
+        'pk': 'restaurant_pk', 'menu__pk': 'menu_pk',
+        'menu__menusection__pk': 'menusection_pk',
+        'menu__menusection__menuitem__pk': 'menuitem_pk'}
     lookup_url_kwarg = 'menuitem_pk'
     serializer_class = serializers.MenuItemSerializer
 
     def get_queryset(self):
-        return MenuItem.objects.filter(pk=self.kwargs['menuitem_pk'])
+        return MenuItem.objects.filter(
+            menusection__menu__restaurant__pk=self.kwargs['restaurant_pk'],
+            menusection__menu__pk=self.kwargs['menu_pk'],
+            menusection__pk=self.kwargs['menusection_pk'],
+            pk=self.kwargs['menuitem_pk'])
+
+
+class MenuSectionBulk(MenuParentMixin, BulkUpsertView):
+    serializer_class = serializers.MenuSectionBulkSerializer
+
+    def get_parent_restaurant(self):
+        return self.get_parent().restaurant
+
+
+class MenuItemBulk(MenuSectionParentMixin, BulkUpsertView):
+    serializer_class = serializers.MenuItemBulkSerializer
+
+    def get_parent_restaurant(self):
+        return self.get_parent().menu.restaurant
+
+
+class SearchList(generics.ListAPIView):
+    """
+    Restaurants, menus, sections and items that match the query (?q=), best
+    match first.
+    """
+    serializer_class = serializers.SearchResultSerializer
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        return SearchResults(self.request.query_params.get('q', ''))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Menu, MenuSection, MenuItem
+from .models import ImageJob, Menu, MenuSection, MenuItem
 
 
 @admin.register(Menu)
@@ -26,3 +26,15 @@ class MenuItemAdmin(admin.ModelAdmin):
 
     class Meta:
         model = MenuItem
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image_name', 'status', 'attempts', 'created_at')
+    list_filter = ['status']
+    readonly_fields = ['content_type', 'object_id', 'image_name',
+                       'attempts', 'error', 'created_at', 'started_at',
+                       'finished_at']
+
+    class Meta:
+        model = ImageJob
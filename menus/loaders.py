@@ -0,0 +1,36 @@
+from django.shortcuts import get_object_or_404
+
+from .models import Menu, MenuSection
+
+
+def menu_tree_queryset():
+    """
+    Menu queryset that loads the restaurant, and every section and item of
+    the menu in a fixed number of queries.
+    """
+    return Menu.objects.select_related('restaurant').prefetch_related(
+        'menusection_set__menuitem_set')
+
+
+def menusection_tree_queryset():
+    """
+    MenuSection queryset that loads the menu, restaurant and every item of
+    the section in a fixed number of queries.
+    """
+    return MenuSection.objects.select_related('menu__restaurant') \
+        .prefetch_related('menuitem_set')
+
+
+def get_menu_tree(restaurant_slug, menu_slug):
+    return get_object_or_404(
+        menu_tree_queryset(),
+        restaurant__slug=restaurant_slug,
+        slug=menu_slug)
+
+
+def get_menusection_tree(restaurant_slug, menu_slug, menusection_slug):
+    return get_object_or_404(
+        menusection_tree_queryset(),
+        menu__restaurant__slug=restaurant_slug,
+        menu__slug=menu_slug,
+        slug=menusection_slug)
@@ -0,0 +1,258 @@
+import contextlib
+import itertools
+import json
+import logging
+import random
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from menus.models import MenuItem
+from menus_project import benchmarks
+from restaurants.models import Restaurant
+
+# the rendered page cache is bypassed unless --page-cache is given, so
+# that the views themselves are timed
+NO_PAGE_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'menus': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = "Time the HTML and API hot paths against a generated dataset " \
+        "and report p50/p95/p99 latency and query counts as JSON. The " \
+        "dataset is rolled back when the benchmark ends. Use --output to " \
+        "save the results, and --baseline to compare them with saved " \
+        "results; the command fails if a path runs more queries than in " \
+        "the baseline, and warns if its median latency is more than " \
+        "--tolerance above the baseline's. benchmarks/baseline.json holds " \
+        "the results of a default run on an empty SQLite database; its " \
+        "latencies depend on the machine it was run on, so regenerate it " \
+        "(with --output) on the machine that compares against it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=20)
+        parser.add_argument('--menus', type=int, default=3,
+                            help="Menus per restaurant")
+        parser.add_argument('--sections', type=int, default=8,
+                            help="Sections per menu")
+        parser.add_argument('--items', type=int, default=20,
+                            help="Items per section")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=50,
+                            help="Timed requests per path")
+        parser.add_argument('--warmup', type=int, default=5,
+                            help="Untimed requests per path")
+        parser.add_argument('--bulk-size', type=int, default=10,
+                            help="Items per bulk create request")
+        parser.add_argument('--page-cache', action='store_true',
+                            help="Serve HTML pages from the rendered page "
+                                 "cache, as configured")
+        parser.add_argument('--output', help="Write the results to a file")
+        parser.add_argument('--baseline',
+                            help="Compare the results with a results file")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Relative median latency increase above "
+                                 "which a warning is written")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        if options['page_cache']:
+            page_cache_settings = contextlib.nullcontext()
+        else:
+            page_cache_settings = override_settings(CACHES=NO_PAGE_CACHE)
+
+        # do not log every benchmark request
+        instrumentation_logger = \
+            logging.getLogger('menus_project.instrumentation')
+        log_level = instrumentation_logger.level
+        if options['verbosity'] < 2:
+            instrumentation_logger.setLevel(logging.WARNING)
+
+        try:
+            with transaction.atomic(), page_cache_settings:
+                self.last_existing_restaurant_pk = \
+                    Restaurant.objects.aggregate(Max('pk'))['pk__max'] or 0
+                call_command(
+                    'generate_dataset', users=options['restaurants'],
+                    restaurants=options['restaurants'],
+                    menus=options['menus'], sections=options['sections'],
+                    items=options['items'], seed=options['seed'],
+                    stdout=self.stderr)
+                results = self.run_benchmarks(options)
+                transaction.set_rollback(True)
+        finally:
+            instrumentation_logger.setLevel(log_level)
+
+        report = json.dumps({
+            'dataset': {key: options[key] for key in [
+                'restaurants', 'menus', 'sections', 'items', 'seed']},
+            'database': connection.vendor,
+            'page_cache': options['page_cache'],
+            'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+        if options['baseline']:
+            self.compare(results, options)
+
+    def run_benchmarks(self, options):
+        menuitems = list(
+            MenuItem.objects
+            .filter(menusection__menu__restaurant__in=self.get_restaurants())
+            .select_related('menusection__menu__restaurant'))
+        samples = self.random.choices(
+            menuitems, k=options['warmup'] + options['requests'])
+
+        # HTML pages are requested anonymously, as most visitors do, and the
+        # API is used by an admin of each restaurant
+        anonymous_client = Client()
+        admin_client = Client()
+        admin_client.force_login(
+            samples[0].menusection.menu.restaurant.admin_users.get())
+
+        get_benchmarks = [
+            ('html:restaurant_list', anonymous_client,
+             lambda item: reverse('restaurants:restaurant_list')),
+            ('html:restaurant_detail', anonymous_client,
+             lambda item: get_restaurant(item).get_absolute_url()),
+            ('html:menu_detail', anonymous_client,
+             lambda item: item.menusection.menu.get_absolute_url()),
+            ('html:menusection_detail', anonymous_client,
+             lambda item: item.menusection.get_absolute_url()),
+            ('html:menuitem_detail', anonymous_client,
+             lambda item: item.get_absolute_url()),
+            ('html:search', anonymous_client,
+             lambda item: get_search_url('search:search', item)),
+            ('api:restaurant_list', admin_client,
+             lambda item: reverse('api:restaurant_list')),
+            ('api:menu_list', admin_client,
+             lambda item: reverse('api:menu_list', kwargs=get_api_kwargs(
+                 item, 'restaurant'))),
+            ('api:restaurant_tree', admin_client,
+             lambda item: reverse('api:restaurant_tree', kwargs=get_api_kwargs(
+                 item, 'restaurant'))),
+            ('api:menu_detail', admin_client,
+             lambda item: reverse('api:menu_detail', kwargs=get_api_kwargs(
+                 item, 'menu'))),
+            ('api:menusection_detail', admin_client,
+             lambda item: reverse(
+                 'api:menusection_detail', kwargs=get_api_kwargs(
+                     item, 'menusection'))),
+            ('api:menuitem_detail', admin_client,
+             lambda item: reverse(
+                 'api:menuitem_detail', kwargs=get_api_kwargs(
+                     item, 'menuitem'))),
+            ('api:search', admin_client,
+             lambda item: get_search_url('api:search', item)),
+        ]
+
+        results = {}
+        for name, client, get_url in get_benchmarks:
+            self.stderr.write(f"Timing {name}...")
+            results[name] = self.time_requests(
+                name, options, [
+                    (client.get, [get_url(item)], {}) for item in samples])
+
+        # the bulk creates are made by an admin of the restaurant of the
+        # first sample, in that restaurant's sections
+        restaurant = get_restaurant(samples[0])
+        bulk_samples = [item for item in menuitems
+                        if get_restaurant(item) == restaurant]
+        names = (f'Benchmark Item {i}' for i in itertools.count(1))
+        self.stderr.write("Timing api:menuitem_bulk...")
+        results['api:menuitem_bulk'] = self.time_requests(
+            'api:menuitem_bulk', options, [
+                (admin_client.post, [
+                    reverse('api:menuitem_bulk', kwargs=get_api_kwargs(
+                        item, 'menusection')),
+                    json.dumps([
+                        {'name': next(names), 'description': ''}
+                        for i in range(options['bulk_size'])])],
+                 {'content_type': 'application/json'})
+                for item in self.random.choices(
+                    bulk_samples, k=len(samples))])
+        return results
+
+    def get_restaurants(self):
+        # only the generated restaurants, which have one admin user each
+        return Restaurant.objects.filter(
+            pk__gt=self.last_existing_restaurant_pk)
+
+    def time_requests(self, name, options, requests):
+        timings = []
+        query_counts = []
+        for i, (method, args, kwargs) in enumerate(requests):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = method(*args, **kwargs)
+                elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code >= 400:
+                raise CommandError(
+                    f"{name}: {args[0]} returned {response.status_code}")
+            if i >= options['warmup']:
+                timings.append(elapsed)
+                query_counts.append(len(queries))
+        return benchmarks.summarize(timings, query_counts)
+
+    def compare(self, results, options):
+        try:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(
+                f"Could not read the baseline {options['baseline']}: {e}")
+
+        regressions = []
+        for name, message, is_regression, is_slower in \
+                benchmarks.compare_to_baseline(
+                    results, baseline, options['tolerance']):
+            if is_regression:
+                regressions.append(name)
+                self.stderr.write(f"{name}: {message} REGRESSION")
+            elif is_slower:
+                self.stderr.write(f"{name}: {message} SLOWER (warning)")
+            else:
+                self.stderr.write(f"{name}: {message}")
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} path(s) regressed against the baseline: "
+                f"{', '.join(regressions)}")
+
+
+def get_restaurant(menuitem):
+    return menuitem.menusection.menu.restaurant
+
+
+def get_api_kwargs(menuitem, level):
+    """
+    Return the URL kwargs of the API endpoint of a menu item or one of its
+    ancestors (e.g. level='menu' for the item's menu).
+    """
+    menusection = menuitem.menusection
+    objs = {'restaurant': menusection.menu.restaurant,
+            'menu': menusection.menu,
+            'menusection': menusection,
+            'menuitem': menuitem}
+    kwargs = {}
+    for name, obj in objs.items():
+        kwargs[f'{name}_pk'] = obj.pk
+        if name == level:
+            return kwargs
+
+
+def get_search_url(url_name, menuitem):
+    # the first word of the item's name, which also matches other items
+    return reverse(url_name) + '?' + urlencode(
+        {'q': menuitem.name.split()[0]})
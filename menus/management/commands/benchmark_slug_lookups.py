@@ -0,0 +1,127 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from menus.models import Menu, MenuSection, MenuItem
+from menus_project import factories as f
+from restaurants.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = "Seed a large set of menu items and time the slug-path lookup " \
+        "used by the menu item detail page. The seeded data is rolled " \
+        "back when the benchmark ends. To compare against the schema " \
+        "without the composite slug indexes, run 'migrate menus 0009' " \
+        "first, on a throwaway database only (e.g. 'createdb -T menus " \
+        "menus_benchmark' with MENUS_DATABASE_NAME=menus_benchmark, or a " \
+        "copy of the project directory with SQLite): it also drops the " \
+        "unique slug constraints, and 'migrate menus' fails to add them " \
+        "again if duplicate slugs have been saved in the meantime."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=10)
+        parser.add_argument('--menus', type=int, default=5,
+                            help="Menus per restaurant")
+        parser.add_argument('--sections', type=int, default=10,
+                            help="Sections per menu")
+        parser.add_argument('--items', type=int, default=40,
+                            help="Items per section")
+        parser.add_argument('--lookups', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            slug_paths = self.get_slug_paths(options)
+            self.report_query_plan(slug_paths[0])
+            self.report_latency(slug_paths)
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        restaurants = []
+        for i in range(options['restaurants']):
+            restaurant = f.RestaurantFactory.build(
+                name=f"Benchmark Restaurant {i + 1}")
+            restaurant.slug = slugify(restaurant.name)
+            restaurants.append(restaurant)
+        self.restaurant_slugs = [obj.slug for obj in restaurants]
+        Restaurant.objects.bulk_create(restaurants)
+
+        # bulk_create() does not set primary keys on every database backend,
+        # so each level is read back before its children are built
+        menus = self.build_children(
+            f.MenuFactory, 'restaurant', options['menus'],
+            Restaurant.objects.filter(slug__in=self.restaurant_slugs))
+        Menu.objects.bulk_create(menus)
+
+        menusections = self.build_children(
+            f.MenuSectionFactory, 'menu', options['sections'],
+            Menu.objects.filter(restaurant__slug__in=self.restaurant_slugs))
+        MenuSection.objects.bulk_create(menusections)
+
+        menuitems = self.build_children(
+            f.MenuItemFactory, 'menusection', options['items'],
+            MenuSection.objects.filter(
+                menu__restaurant__slug__in=self.restaurant_slugs))
+        MenuItem.objects.bulk_create(menuitems, batch_size=1000)
+
+        self.stdout.write(
+            f"Seeded {len(restaurants)} restaurants, {len(menus)} menus, "
+            f"{len(menusections)} sections and {len(menuitems)} items "
+            f"({connection.vendor}).")
+
+    def build_children(self, factory, parent_field, size, parents):
+        children = []
+        for parent in parents:
+            # restart the factory's name sequence for every parent, so that
+            # the same slugs appear under many parents as on real menus
+            factory.reset_sequence()
+            for child in factory.build_batch(size, **{parent_field: parent}):
+                child.slug = slugify(child.name)
+                children.append(child)
+        return children
+
+    def get_slug_paths(self, options):
+        slug_paths = list(
+            MenuItem.objects
+            .filter(menusection__menu__restaurant__slug__in=(
+                self.restaurant_slugs))
+            .values_list('menusection__menu__restaurant__slug',
+                         'menusection__menu__slug', 'menusection__slug',
+                         'slug'))
+        return random.Random(options['seed']).choices(
+            slug_paths, k=options['lookups'])
+
+    def get_lookup(self, slug_path):
+        # the same lookup as MenuItemDetailView.get_object()
+        restaurant_slug, menu_slug, menusection_slug, menuitem_slug = \
+            slug_path
+        return MenuItem.objects.filter(
+            menusection__menu__restaurant__slug=restaurant_slug,
+            menusection__menu__slug=menu_slug,
+            menusection__slug=menusection_slug,
+            slug=menuitem_slug)
+
+    def report_query_plan(self, slug_path):
+        self.stdout.write("Query plan:")
+        for line in self.get_lookup(slug_path).explain().splitlines():
+            self.stdout.write(f"  {line}")
+
+    def report_latency(self, slug_paths):
+        timings = []
+        for slug_path in slug_paths:
+            start = time.perf_counter()
+            self.get_lookup(slug_path).get()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"{len(timings)} lookups: "
+            f"mean {statistics.mean(timings):.3f} ms, "
+            f"median {statistics.median(timings):.3f} ms, "
+            f"p95 {p95:.3f} ms")
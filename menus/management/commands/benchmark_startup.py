@@ -0,0 +1,110 @@
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from menus_project.gunicorn_conf import WORKER_MODELS
+
+GUNICORN_COMMAND = ['gunicorn', '-c', 'python:menus_project.gunicorn_conf']
+
+
+class Command(BaseCommand):
+    help = "Start gunicorn with each worker model of " \
+        "menus_project.gunicorn_conf, with and without preload_app, and " \
+        "report the median time to the first response as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs='+', choices=WORKER_MODELS,
+                            default=WORKER_MODELS)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--runs', type=int, default=3,
+                            help="Starts per configuration")
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--timeout', type=float, default=60,
+                            help="Seconds to wait for the first response")
+
+    def handle(self, *args, **options):
+        results = {}
+        for model in options['models']:
+            results[model] = {}
+            for preload in [True, False]:
+                key = 'preload_ms' if preload else 'no_preload_ms'
+                self.stderr.write(
+                    f"Starting {model} workers "
+                    f"({'with' if preload else 'without'} preload)...")
+                timings = [self.time_first_response(model, preload, options)
+                           for i in range(options['runs'])]
+                results[model][key] = round(statistics.median(timings), 1)
+
+        self.stdout.write(json.dumps({
+            'workers': options['workers'],
+            'path': options['path'],
+            'results': results}, indent=2))
+
+    def time_first_response(self, model, preload, options):
+        """
+        Start gunicorn, and return the milliseconds until it answers a
+        request to --path.
+        """
+        port = get_free_port()
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get(
+                'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+            GUNICORN_WORKER_MODEL=model,
+            GUNICORN_WORKERS=str(options['workers']),
+            GUNICORN_BIND=f'127.0.0.1:{port}',
+            GUNICORN_PRELOAD='1' if preload else '0')
+
+        with tempfile.TemporaryFile() as log:
+            start = time.perf_counter()
+            process = subprocess.Popen(
+                GUNICORN_COMMAND, env=env, cwd=settings.BASE_DIR,
+                stdout=log, stderr=subprocess.STDOUT)
+            try:
+                while time.perf_counter() - start < options['timeout']:
+                    if process.poll() is not None:
+                        log.seek(0)
+                        raise CommandError(
+                            f"gunicorn ({model}) exited with code "
+                            f"{process.returncode}:\n"
+                            f"{log.read().decode('utf-8', 'replace')}")
+                    if get_status(port, options['path']) is not None:
+                        return (time.perf_counter() - start) * 1000
+                    time.sleep(0.01)
+                raise CommandError(
+                    f"gunicorn ({model}) did not respond within "
+                    f"{options['timeout']} seconds.")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_status(port, path):
+    """
+    Return the status of a response to a GET request, or None if the
+    server is not accepting connections yet.
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        connection.close()
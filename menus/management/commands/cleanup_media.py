@@ -0,0 +1,83 @@
+import collections
+import datetime
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from menus_project.images import (
+    VARIANT_FORMATS, get_image_models, get_variant_name)
+from menus_project.storage import IMAGE_UPLOAD_DIRECTORY
+
+
+class Command(BaseCommand):
+    help = "Delete the uploaded images and image variants that no " \
+        "restaurant, menu or section uses any more (e.g. replaced " \
+        "uploads, or the images of menus deleted along with their " \
+        "restaurant)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="List the files that would be deleted")
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help="Keep files modified less than this many seconds ago "
+                 "(e.g. uploads whose object is being saved, or the "
+                 "variants of a running image job)")
+
+    def handle(self, *args, **options):
+        references, variant_names = self.get_references()
+        cutoff = timezone.now() - datetime.timedelta(
+            seconds=options['min_age'])
+
+        count = size = 0
+        for name in walk(default_storage, IMAGE_UPLOAD_DIRECTORY):
+            if name in references or name in variant_names \
+                    or default_storage.get_modified_time(name) > cutoff:
+                continue
+            count += 1
+            size += default_storage.size(name)
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                default_storage.delete(name)
+
+        shared = sum(1 for count in references.values() if count > 1)
+        self.stdout.write(
+            f"{'Would delete' if options['dry_run'] else 'Deleted'} "
+            f"{count} unused files ({size} bytes). {len(references)} images "
+            f"are in use, {shared} of them by more than one object.")
+
+    def get_references(self):
+        """
+        Return the number of objects that use each image file, by name, and
+        the names of the variants of those images.
+        """
+        references = collections.Counter()
+        variant_names = set()
+        for model in get_image_models():
+            objs = model._default_manager.exclude(image='') \
+                .exclude(image=None) \
+                .values_list('image', 'image_variant_widths',
+                             'image_variant_hash')
+            for name, widths, variant_hash in objs.iterator(
+                    chunk_size=settings.DATABASE_ITERATOR_CHUNK_SIZE):
+                references[name] += 1
+                variant_names.update(
+                    get_variant_name(name, width, format, variant_hash)
+                    for width in widths for format in VARIANT_FORMATS)
+        return references, variant_names
+
+
+def walk(storage, directory):
+    """Yield the name of every file in a storage directory and below."""
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in directories:
+        yield from walk(storage, os.path.join(directory, name))
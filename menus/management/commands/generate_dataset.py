@@ -0,0 +1,196 @@
+import itertools
+import time
+
+import factory.random
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import slugify
+
+from menus.models import Menu, MenuSection, MenuItem
+from menus_project import constants as c
+from menus_project import factories as f
+from restaurants.models import Restaurant
+from search.models import index_objects
+
+UserModel = get_user_model()
+
+# rows built in memory before they are written
+CHUNK_SIZE = 20000
+MAX_RESTAURANTS_PER_CHUNK = 500
+
+
+class Command(BaseCommand):
+    help = "Generate a large dataset of users, restaurants, menus, sections " \
+        "and items with bulk_create(). The same --seed always generates " \
+        "the same dataset. Generated users have the test user password."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--restaurants', type=int, default=100)
+        parser.add_argument('--menus', type=int, default=3,
+                            help="Menus per restaurant")
+        parser.add_argument('--sections', type=int, default=8,
+                            help="Sections per menu")
+        parser.add_argument('--items', type=int, default=20,
+                            help="Items per section")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+
+        # reseed the random generators used by the factories (including
+        # Faker) and restart their sequences, so that the same seed always
+        # builds the same objects
+        factory.random.reseed_random(options['seed'])
+        for factory_class in [f.RandomUserFactory, f.RandomRestaurantFactory,
+                              f.RandomMenuFactory, f.RandomMenuSectionFactory,
+                              f.RandomMenuItemFactory]:
+            factory_class.reset_sequence(force=True)
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            users = self.generate_users(options)
+            counts = self.generate_restaurants(users, options)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Generated {len(users)} users, {counts[Restaurant]} "
+            f"restaurants, {counts[Menu]} menus, {counts[MenuSection]} "
+            f"sections and {counts[MenuItem]} items in {elapsed:.1f} "
+            f"seconds.")
+
+    def generate_users(self, options):
+        used_usernames = set(
+            UserModel.objects.values_list('username', flat=True).iterator(
+                chunk_size=settings.DATABASE_ITERATOR_CHUNK_SIZE))
+        users = []
+        for user in f.RandomUserFactory.build_batch(options['users']):
+            username = user.username
+            for i in itertools.count(2):
+                if user.username not in used_usernames:
+                    break
+                user.username = f'{username}.{i}'
+            user.email = f'{user.username}@email.com'
+            used_usernames.add(user.username)
+            users.append(user)
+        UserModel.objects.bulk_create(users, batch_size=self.batch_size)
+
+        # bulk_create() does not set primary keys on every database backend
+        usernames = [user.username for user in users]
+        return [user
+                for i in range(0, len(usernames), self.batch_size)
+                for user in UserModel.objects.filter(
+                    username__in=usernames[i:i + self.batch_size])
+                .order_by('pk').only('pk')]
+
+    def generate_restaurants(self, users, options):
+        """
+        Generate the restaurants in chunks, so that the whole dataset is
+        never held in memory at once.
+        """
+        used_slugs = set(
+            Restaurant.objects.values_list('slug', flat=True).iterator(
+                chunk_size=settings.DATABASE_ITERATOR_CHUNK_SIZE))
+        counts = dict.fromkeys([Restaurant, Menu, MenuSection, MenuItem], 0)
+        admin_users = itertools.cycle(users)
+
+        items_per_restaurant = max(
+            1, options['menus'] * options['sections'] * options['items'])
+        restaurants_per_chunk = min(
+            MAX_RESTAURANTS_PER_CHUNK,
+            max(1, CHUNK_SIZE // items_per_restaurant))
+
+        remaining = options['restaurants']
+        while remaining:
+            chunk_size = min(remaining, restaurants_per_chunk)
+            remaining -= chunk_size
+
+            restaurants = []
+            for restaurant in \
+                    f.RandomRestaurantFactory.build_batch(chunk_size):
+                restaurant.name = \
+                    get_unique_name(restaurant.name, used_slugs)
+                restaurant.slug = slugify(restaurant.name)
+                restaurants.append(restaurant)
+            Restaurant.objects.bulk_create(
+                restaurants, batch_size=self.batch_size)
+            restaurants = list(Restaurant.objects.filter(
+                slug__in=[obj.slug for obj in restaurants]).order_by('pk'))
+
+            if users:
+                Restaurant.admin_users.through.objects.bulk_create(
+                    [Restaurant.admin_users.through(
+                        restaurant=restaurant, user=next(admin_users))
+                     for restaurant in restaurants],
+                    batch_size=self.batch_size)
+
+            # bulk_create() does not set primary keys on every database
+            # backend, so each level is read back before its children are
+            # built
+            self.generate_children(
+                f.RandomMenuFactory, 'restaurant', options['menus'],
+                restaurants)
+            menus = list(Menu.objects.filter(
+                restaurant__in=restaurants).order_by('pk'))
+            self.generate_children(
+                f.RandomMenuSectionFactory, 'menu', options['sections'],
+                menus)
+            menusections = list(MenuSection.objects.filter(
+                menu__restaurant__in=restaurants).order_by('pk'))
+            menuitems = self.generate_children(
+                f.RandomMenuItemFactory, 'menusection', options['items'],
+                menusections)
+
+            # bulk_create() does not send post_save
+            for queryset in [
+                    Restaurant.objects.filter(
+                        pk__in=[obj.pk for obj in restaurants]),
+                    Menu.objects.filter(restaurant__in=restaurants),
+                    MenuSection.objects.filter(
+                        menu__restaurant__in=restaurants),
+                    MenuItem.objects.filter(
+                        menusection__menu__restaurant__in=restaurants)]:
+                index_objects(queryset, replace=False)
+
+            for model, objs in [(Restaurant, restaurants), (Menu, menus),
+                                (MenuSection, menusections),
+                                (MenuItem, menuitems)]:
+                counts[model] += len(objs)
+            self.stdout.write(
+                f"{counts[Restaurant]}/{options['restaurants']} "
+                f"restaurants...")
+        return counts
+
+    def generate_children(self, factory_class, parent_field, size, parents):
+        """
+        Build and save `size` children with unique slugs for each parent.
+        """
+        model = factory_class._meta.model
+        children = []
+        for parent in parents:
+            used_slugs = set()
+            for child in factory_class.build_batch(
+                    size, **{parent_field: parent}):
+                child.name = get_unique_name(child.name, used_slugs)
+                child.slug = slugify(child.name)
+                children.append(child)
+        model.objects.bulk_create(children, batch_size=self.batch_size)
+        return children
+
+
+def get_unique_name(name, used_slugs):
+    """
+    Return the name, numbered if its slug is already used or is a reserved
+    keyword, and add its slug to used_slugs.
+    """
+    unique_name = name
+    for i in itertools.count(2):
+        slug = slugify(unique_name)
+        if slug not in used_slugs and slug not in c.RESERVED_KEYWORDS:
+            break
+        unique_name = f'{name} {i}'
+    used_slugs.add(slug)
+    return unique_name
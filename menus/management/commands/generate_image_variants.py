@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+
+from menus.models import ImageJob
+from menus_project.image_jobs import enqueue_image_job
+from menus_project.images import get_image_models
+
+
+class Command(BaseCommand):
+    help = "Queue the generation of the resized variants of the images " \
+        "that do not have any yet (e.g. images uploaded before variants " \
+        "were introduced). The variants are generated by " \
+        "process_image_jobs, which also strips the images' metadata and " \
+        "marks the restaurant's cached pages as stale."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help="Also regenerate existing variants (e.g. after changing "
+                 "IMAGE_VARIANT_WIDTHS or IMAGE_VARIANT_FORMATS). Variants "
+                 "whose content changes are saved under new names, and the "
+                 "old ones are served until then. The old files are "
+                 "deleted by cleanup_media.")
+
+    def handle(self, *args, **options):
+        for model in get_image_models():
+            objs = model._default_manager.exclude(image='') \
+                .exclude(image=None)
+            if not options['all']:
+                objs = objs.filter(image_variant_widths=[])
+            queued_pks = set(ImageJob.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                status__in=[ImageJob.PENDING, ImageJob.RUNNING])
+                .values_list('object_id', flat=True))
+
+            count = 0
+            for obj in objs.iterator(
+                    chunk_size=settings.DATABASE_ITERATOR_CHUNK_SIZE):
+                # e.g. a new upload, whose job is yet to run
+                if obj.pk in queued_pks:
+                    continue
+                enqueue_image_job(obj)
+                count += 1
+            self.stdout.write(
+                f"Queued the variants of {count} "
+                f"{model._meta.verbose_name} images.")
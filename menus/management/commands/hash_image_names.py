@@ -0,0 +1,44 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from menus_project.image_jobs import enqueue_image_job
+from menus_project.images import get_image_models
+from menus_project.storage import is_content_addressed
+
+
+class Command(BaseCommand):
+    help = "Store the images uploaded before they were named by the hash " \
+        "of their content under such a name, so that browsers can keep " \
+        "them for a year, and queue the generation of their variants. " \
+        "The old files are deleted by cleanup_media."
+
+    def handle(self, *args, **options):
+        for model in get_image_models():
+            objs = model._default_manager.exclude(image='') \
+                .exclude(image=None)
+            count = 0
+            for obj in objs.iterator(
+                    chunk_size=settings.DATABASE_ITERATOR_CHUNK_SIZE):
+                if is_content_addressed(obj.image.name):
+                    continue
+                if not obj.image.storage.exists(obj.image.name):
+                    self.stderr.write(
+                        f"{obj.image.name} ({model._meta.verbose_name} "
+                        f"{obj.pk}) does not exist.")
+                    continue
+
+                with obj.image.open('rb'):
+                    obj.image = obj.image.storage.save(
+                        obj.image.field.generate_filename(
+                            obj, os.path.basename(obj.image.name)),
+                        obj.image)
+                obj.image_variant_widths = []
+                # also marks the restaurant's cached pages as stale
+                obj.save(update_fields=['image', 'image_variant_widths',
+                                        'updated_at'])
+                enqueue_image_job(obj)
+                count += 1
+            self.stdout.write(
+                f"Renamed {count} {model._meta.verbose_name} images.")
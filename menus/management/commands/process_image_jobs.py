@@ -0,0 +1,73 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from menus_project.image_jobs import (
+    claim_image_job, get_image_job_stats, run_image_job)
+
+
+class Command(BaseCommand):
+    help = "Run the queued image jobs (see menus_project.image_jobs): " \
+        "strip the metadata of uploaded images and generate their " \
+        "variants. Waits for new jobs until it is stopped, unless --burst " \
+        "is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst', action='store_true',
+            help="Exit when there are no more queued jobs")
+        parser.add_argument('--max-jobs', type=int,
+                            help="Exit after running this many jobs")
+        parser.add_argument('--poll-interval', type=float, default=1,
+                            help="Seconds to wait for new jobs when the "
+                                 "queue is empty")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        previous_handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in [signal.SIGINT, signal.SIGTERM]}
+        try:
+            count, seconds = self.run(options)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        stats = get_image_job_stats()
+        rate = count / seconds if seconds else 0
+        self.stdout.write(
+            f"Ran {count} image jobs in {seconds:.1f} seconds "
+            f"({rate:.2f} jobs/second). {stats['jobs']['pending']} jobs "
+            f"pending, {stats['jobs']['failed']} failed.")
+
+    def stop(self, signum, frame):
+        # finish the current job first
+        self.stopping = True
+
+    def run(self, options):
+        count = 0
+        start = time.perf_counter()
+        while not self.stopping:
+            if options['max_jobs'] is not None \
+                    and count >= options['max_jobs']:
+                break
+            # a long running worker must not keep a broken or expired
+            # connection
+            close_old_connections()
+            job = claim_image_job()
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            job_start = time.perf_counter()
+            run_image_job(job)
+            count += 1
+            if options['verbosity'] >= 2:
+                self.stdout.write(
+                    f"{job.image_name}: {job.status} in "
+                    f"{time.perf_counter() - job_start:.2f} seconds")
+        return count, time.perf_counter() - start
@@ -0,0 +1,186 @@
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve
+
+from menus_project import benchmarks
+
+UNRESOLVED_VIEW_NAME = '(unresolved)'
+
+
+class Command(BaseCommand):
+    help = "Replay a request log against a running server and report the " \
+        "throughput, error rate and latency histogram of each URL name " \
+        "as JSON. The log is a JSON lines file with a 'method' and a " \
+        "'path' on each line (optionally with a 'view', 'content_type' " \
+        "and 'body'), as written by RequestRecorderMiddleware. Requests " \
+        "are made without cookies, so use --header to authenticate."
+
+    def add_arguments(self, parser):
+        parser.add_argument('log_path')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Requests in flight at once")
+        parser.add_argument('--rate', type=float, default=0,
+                            help="Requests started per second (0 for as "
+                                 "fast as possible)")
+        parser.add_argument('--limit', type=int,
+                            help="Replay only the first LIMIT requests")
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--header', action='append', default=[],
+                            help="Add a header to every request, e.g. "
+                                 "'Authorization: Token abc'")
+        parser.add_argument('--output', help="Write the report to a file")
+
+    def handle(self, *args, **options):
+        entries = self.read_log(options['log_path'], options['limit'])
+        if not entries:
+            raise CommandError(f"{options['log_path']} has no requests.")
+
+        base_url = urlsplit(options['base_url'])
+        if base_url.scheme not in ('http', 'https'):
+            raise CommandError(f"Invalid base URL: {options['base_url']}")
+        self.base_url = base_url
+        self.timeout = options['timeout']
+        self.headers = self.parse_headers(options['header'])
+        self.local = threading.local()
+
+        self.stderr.write(
+            f"Replaying {len(entries)} requests against "
+            f"{options['base_url']}...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(
+                lambda args: self.replay(*args, start, options['rate']),
+                enumerate(entries)))
+        duration = time.perf_counter() - start
+
+        report = json.dumps(
+            self.get_report(entries, results, duration), indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    def read_log(self, path, limit):
+        entries = []
+        try:
+            with open(path) as f:
+                for line_number, line in enumerate(f, 1):
+                    if limit is not None and len(entries) >= limit:
+                        break
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = None
+                    if not isinstance(entry, dict) \
+                            or 'method' not in entry or 'path' not in entry:
+                        raise CommandError(
+                            f"{path}, line {line_number}: not a request "
+                            f"log entry.")
+                    if not entry.get('view'):
+                        entry['view'] = get_view_name(entry['path'])
+                    entries.append(entry)
+        except OSError as e:
+            raise CommandError(f"Could not read {path}: {e}")
+        return entries
+
+    def parse_headers(self, headers):
+        parsed_headers = {}
+        for header in headers:
+            name, separator, value = header.partition(':')
+            if not separator:
+                raise CommandError(f"Invalid header: {header}")
+            parsed_headers[name.strip()] = value.strip()
+        return parsed_headers
+
+    def get_connection(self):
+        # each worker thread keeps its own connection alive between requests
+        if getattr(self.local, 'connection', None) is None:
+            if self.base_url.scheme == 'https':
+                connection_class = http.client.HTTPSConnection
+            else:
+                connection_class = http.client.HTTPConnection
+            self.local.connection = connection_class(
+                self.base_url.netloc, timeout=self.timeout)
+        return self.local.connection
+
+    def replay(self, index, entry, start, rate):
+        """
+        Make the request of a log entry, and return its status (None if it
+        failed) and latency in milliseconds.
+        """
+        if rate:
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        headers = dict(self.headers)
+        body = entry.get('body')
+        if body is not None:
+            body = body.encode('utf-8')
+            headers['Content-Type'] = \
+                entry.get('content_type', 'application/json')
+
+        connection = self.get_connection()
+        request_start = time.perf_counter()
+        try:
+            connection.request(
+                entry['method'], self.base_url.path.rstrip('/') +
+                entry['path'], body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            status = None
+        return status, (time.perf_counter() - request_start) * 1000
+
+    def get_report(self, entries, results, duration):
+        views = {}
+        for entry, result in zip(entries, results):
+            views.setdefault(entry['view'], []).append(result)
+
+        report = summarize_results(results, duration)
+        report['views'] = {
+            view_name: summarize_results(views[view_name], duration)
+            for view_name in sorted(views)}
+        return report
+
+
+def get_view_name(path):
+    try:
+        return resolve(urlsplit(path).path).view_name
+    except Resolver404:
+        return UNRESOLVED_VIEW_NAME
+
+
+def summarize_results(results, duration):
+    """
+    Summarize a list of (status, latency) results. A request is an error
+    if it failed or the server answered with a 5xx status.
+    """
+    timings = [latency for status, latency in results]
+    errors = len([status for status, latency in results
+                  if status is None or status >= 500])
+    summary = {
+        'requests': len(results),
+        'throughput_rps': round(len(results) / duration, 3),
+        'errors': errors,
+        'error_rate': round(errors / len(results), 4),
+        'client_errors': len([status for status, latency in results
+                              if status and 400 <= status < 500])}
+    for percent in benchmarks.PERCENTILES:
+        summary[f'p{percent}_ms'] = \
+            round(benchmarks.percentile(timings, percent), 3)
+    summary['histogram_ms'] = benchmarks.get_latency_histogram(timings)
+    return summary
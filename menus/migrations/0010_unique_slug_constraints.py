@@ -0,0 +1,57 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def report_duplicate_slugs(apps, schema_editor):
+    """
+    List any existing objects that share a slug within their parent, since
+    the constraints below cannot be added until they are renamed.
+    """
+    duplicates = []
+    for model_name, scope_field in [('Menu', 'restaurant'),
+                                    ('MenuSection', 'menu'),
+                                    ('MenuItem', 'menusection')]:
+        model = apps.get_model('menus', model_name)
+        rows = model.objects.values(scope_field, 'slug') \
+            .annotate(count=Count('pk')).filter(count__gt=1) \
+            .order_by(scope_field, 'slug')
+        for row in rows:
+            duplicates.append(
+                f"{model_name} (slug='{row['slug']}', "
+                f"{scope_field}_id={row[scope_field]}): {row['count']} rows")
+
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add unique slug constraints. Rename these duplicate "
+            "objects and run the migration again:\n  "
+            + "\n  ".join(duplicates))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menus', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            report_duplicate_slugs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='menu',
+            constraint=models.UniqueConstraint(
+                fields=('restaurant', 'slug'),
+                name='unique_menu_slug_per_restaurant'),
+        ),
+        migrations.AddConstraint(
+            model_name='menusection',
+            constraint=models.UniqueConstraint(
+                fields=('menu', 'slug'),
+                name='unique_menusection_slug_per_menu'),
+        ),
+        migrations.AddConstraint(
+            model_name='menuitem',
+            constraint=models.UniqueConstraint(
+                fields=('menusection', 'slug'),
+                name='unique_menuitem_slug_per_menusection'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 21:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menus', '0010_unique_slug_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu',
+            name='image_variant_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='menusection',
+            name='image_variant_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 21:55
+
+from django.db import migrations, models
+import menus_project.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menus', '0012_imagejob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='menu',
+            name='image',
+            field=models.ImageField(blank=True, help_text='An image or logo for this menu (optional)', null=True, storage=menus_project.storage.ContentAddressedStorage(), upload_to=menus_project.storage.image_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='menusection',
+            name='image',
+            field=models.ImageField(blank=True, help_text='An image or logo for this section (optional)', null=True, storage=menus_project.storage.ContentAddressedStorage(), upload_to=menus_project.storage.image_upload_to),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menus', '0013_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu',
+            name='image_variant_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='menusection',
+            name='image_variant_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+    ]
@@ -1,13 +1,19 @@
 import os
 
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 
 from menus_project import constants
+from menus_project.images import ImageVariantsMixin
+from menus_project.slugs import UniqueSlugModelMixin
+from menus_project.storage import ContentAddressedStorage, image_upload_to
 
 
+# used by old migrations
 def menu_upload_to(instance, filename):
     base, extension = os.path.splitext(filename)
     extension = extension.lower()
@@ -16,7 +22,7 @@ def menu_upload_to(instance, filename):
         f"menu-{instance.pk}-{instance.slug}{extension}"
 
 
-class Menu(models.Model):
+class Menu(ImageVariantsMixin, UniqueSlugModelMixin, models.Model):
 
     THEME_CHOICES = [
         ('default', "Default"),
@@ -30,15 +36,31 @@ class Menu(models.Model):
     slug = models.SlugField(max_length=128)
     image = models.ImageField(
         help_text="An image or logo for this menu (optional)",
-        upload_to=menu_upload_to, blank=True, null=True)
+        upload_to=image_upload_to, storage=ContentAddressedStorage(),
+        blank=True, null=True)
+    image_variant_widths = models.JSONField(
+        default=list, blank=True, editable=False)
+    image_variant_hash = models.CharField(
+        max_length=16, blank=True, default='', editable=False)
     description = models.CharField(max_length=256, blank=True, null=True)
     theme = models.CharField(
         max_length=32,
         choices=THEME_CHOICES,
         default='default')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # do not allow a restaurant to have duplicate menu slugs
+    slug_scope_field = 'restaurant'
+    duplicate_slug_error_string = \
+        "This name is too similar to one of this restaurant's existing " \
+        "menu names."
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['restaurant', 'slug'],
+                name='unique_menu_slug_per_restaurant')]
 
     def __str__(self):
         return f"{self.restaurant.name} - {self.name}"
@@ -48,16 +70,9 @@ class Menu(models.Model):
         if self.slug in constants.RESERVED_KEYWORDS:
             raise ValidationError(constants.RESERVED_KEYWORD_ERROR_STRING)
 
-        # do not allow a restaurant to have duplicate menu slugs
-        menus_with_same_slug = Menu.objects.filter(
-            restaurant=self.restaurant,
-            slug=slugify(self.name))
-        if menus_with_same_slug.count():
-            if menus_with_same_slug.first() != self \
-                    or menus_with_same_slug.last() != self:
-                raise ValidationError(
-                    "This name is too similar to one of this restaurant's "
-                    "existing menu names.")
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self.restaurant.touch()
 
     def get_absolute_url(self):
         return reverse('menus:menu_detail', kwargs={
@@ -69,8 +84,10 @@ class Menu(models.Model):
             self.slug = slugify(self.name)
         self.clean()
         super().save(*args, **kwargs)
+        self.restaurant.touch()
 
 
+# used by old migrations
 def menusection_upload_to(instance, filename):
     base, extension = os.path.splitext(filename)
     extension = extension.lower()
@@ -79,18 +96,36 @@ def menusection_upload_to(instance, filename):
         f"menusection-{instance.pk}-{instance.slug}{extension}"
 
 
-class MenuSection(models.Model):
+class MenuSection(ImageVariantsMixin, UniqueSlugModelMixin, models.Model):
 
     menu = models.ForeignKey('Menu', on_delete=models.CASCADE)
     name = models.CharField(max_length=128, default=None, blank=False)
     slug = models.SlugField(max_length=128)
     image = models.ImageField(
         help_text="An image or logo for this section (optional)",
-        upload_to=menusection_upload_to, blank=True, null=True)
+        upload_to=image_upload_to, storage=ContentAddressedStorage(),
+        blank=True, null=True)
+    image_variant_widths = models.JSONField(
+        default=list, blank=True, editable=False)
+    image_variant_hash = models.CharField(
+        max_length=16, blank=True, default='', editable=False)
     note = models.CharField(
             help_text="An optional note about this section (e.g."
                       "'Drinks come with complimentary refills.')",
             max_length=256, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # do not allow a menu to have duplicate section slugs
+    slug_scope_field = 'menu'
+    duplicate_slug_error_string = \
+        "This name is too similar to one of this menu's existing section " \
+        "names."
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['menu', 'slug'],
+                name='unique_menusection_slug_per_menu')]
 
     def __str__(self):
         return f"{self.menu.restaurant.name}: {self.menu.name} - {self.name}"
@@ -100,16 +135,9 @@ class MenuSection(models.Model):
         if self.slug in constants.RESERVED_KEYWORDS:
             raise ValidationError(constants.RESERVED_KEYWORD_ERROR_STRING)
 
-        # do not allow a menu to have duplicate section slugs
-        menusections_with_same_slug = MenuSection.objects.filter(
-            menu=self.menu,
-            slug=slugify(self.name))
-        if menusections_with_same_slug.count():
-            if menusections_with_same_slug.first() != self \
-                    or menusections_with_same_slug.last() != self:
-                raise ValidationError(
-                    "This name is too similar to one of this menu's "
-                    "existing section names.")
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self.menu.restaurant.touch()
 
     def get_absolute_url(self):
         return reverse('menus:menusection_detail', kwargs={
@@ -122,9 +150,10 @@ class MenuSection(models.Model):
             self.slug = slugify(self.name)
         self.clean()
         super().save(*args, **kwargs)
+        self.menu.restaurant.touch()
 
 
-class MenuItem(models.Model):
+class MenuItem(UniqueSlugModelMixin, models.Model):
     menusection = models.ForeignKey('MenuSection', on_delete=models.CASCADE)
     name = models.CharField(max_length=128, default=None, blank=False)
     slug = models.SlugField(max_length=128)
@@ -132,6 +161,18 @@ class MenuItem(models.Model):
         help_text="Enter the price in cents (e.g. $5.00 = 500 cents)",
         blank=True, null=True)
     description = models.CharField(max_length=1024, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # do not allow a menusection to have duplicate menuitem slugs
+    slug_scope_field = 'menusection'
+    duplicate_slug_error_string = \
+        "This name is too similar to one of this menu's existing item names."
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['menusection', 'slug'],
+                name='unique_menuitem_slug_per_menusection')]
 
     def __str__(self):
         return f"{self.menusection.menu.restaurant.name}: "\
@@ -143,16 +184,9 @@ class MenuItem(models.Model):
         if self.slug in constants.RESERVED_KEYWORDS:
             raise ValidationError(constants.RESERVED_KEYWORD_ERROR_STRING)
 
-        # do not allow a menusection to have duplicate menuitem slugs
-        menuitems_with_same_slug = MenuItem.objects.filter(
-            menusection=self.menusection,
-            slug=slugify(self.name))
-        if menuitems_with_same_slug.count():
-            if menuitems_with_same_slug.first() != self \
-                    or menuitems_with_same_slug.last() != self:
-                raise ValidationError(
-                    "This name is too similar to one of this menu's "
-                    "existing item names.")
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self.menusection.menu.restaurant.touch()
 
     def get_absolute_url(self):
         return reverse('menus:menuitem_detail', kwargs={
@@ -172,3 +206,46 @@ class MenuItem(models.Model):
             self.slug = slugify(self.name)
         self.clean()
         super().save(*args, **kwargs)
+        self.menusection.menu.restaurant.touch()
+
+
+class ImageJob(models.Model):
+    """
+    The processing of an uploaded image of a restaurant, menu or section,
+    queued when the image is saved, and run by the image job worker (see
+    menus_project.image_jobs).
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    # the image was replaced, or its object deleted, before the job ran
+    SKIPPED = 'skipped'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (SKIPPED, "Skipped"),
+        (FAILED, "Failed")]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    obj = GenericForeignKey('content_type', 'object_id')
+    image_name = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at', 'pk']
+        indexes = [
+            models.Index(fields=['status', 'created_at'],
+                         name='imagejob_status_created_at')]
+
+    def __str__(self):
+        return f"{self.image_name} ({self.status})"
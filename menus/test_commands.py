@@ -0,0 +1,469 @@
+import json
+import os
+import time
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase
+from django.utils.text import slugify
+
+from menus.models import ImageJob, Menu, MenuItem, MenuSection
+from menus_project import constants as c
+from menus_project import factories as f
+from menus_project import image_jobs
+from menus_project.images import VARIANT_FORMATS, get_variant_name
+from menus_project.storage import (
+    ContentAddressedStorage, is_content_addressed)
+from menus_project.test_images import ImageVariantsTestMixin, get_image_file
+from restaurants.models import Restaurant
+
+UserModel = get_user_model()
+
+
+class BenchmarkSlugLookupsTest(TestCase):
+
+    def setUp(self):
+        self.stdout = StringIO()
+        call_command(
+            'benchmark_slug_lookups', restaurants=2, menus=2, sections=2,
+            items=3, lookups=5, stdout=self.stdout)
+        self.output = self.stdout.getvalue()
+
+    def test_seeds_and_times_lookups(self):
+        self.assertIn(
+            "Seeded 2 restaurants, 4 menus, 8 sections and 24 items",
+            self.output)
+        self.assertIn("5 lookups: mean", self.output)
+
+    def test_seeded_objects_are_rolled_back(self):
+        self.assertEqual(Restaurant.objects.count(), 0)
+        self.assertEqual(MenuItem.objects.count(), 0)
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite query plan")
+    def test_lookup_uses_composite_slug_indexes(self):
+        for columns in ['restaurant_id=? AND slug=?', 'menu_id=? AND slug=?',
+                        'menusection_id=? AND slug=?']:
+            self.assertIn(columns, self.output)
+
+
+class GenerateDatasetTest(TestCase):
+
+    def generate(self, **options):
+        options = {'users': 2, 'restaurants': 3, 'menus': 2, 'sections': 2,
+                   'items': 3, **options}
+        stdout = StringIO()
+        call_command('generate_dataset', stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def get_menuitems(self):
+        return list(MenuItem.objects.order_by('pk').values_list(
+            'menusection__menu__restaurant__slug', 'menusection__menu__slug',
+            'menusection__slug', 'slug', 'price', 'description'))
+
+    def test_generates_requested_counts(self):
+        output = self.generate()
+        self.assertIn(
+            "Generated 2 users, 3 restaurants, 6 menus, 12 sections and 36 "
+            "items", output)
+        self.assertEqual(UserModel.objects.count(), 2)
+        self.assertEqual(Restaurant.objects.count(), 3)
+        self.assertEqual(MenuItem.objects.count(), 36)
+
+    def test_objects_are_valid(self):
+        self.generate()
+        for menuitem in MenuItem.objects.all():
+            self.assertEqual(menuitem.slug, slugify(menuitem.name))
+            self.assertGreater(menuitem.price, 0)
+            self.assertTrue(menuitem.description)
+        for restaurant in Restaurant.objects.all():
+            self.assertEqual(restaurant.admin_users.count(), 1)
+
+    def test_users_can_log_in(self):
+        self.generate()
+        user = UserModel.objects.first()
+        self.assertTrue(self.client.login(
+            username=user.username, password=c.TEST_USER_PASSWORD))
+
+    def test_same_seed_generates_same_dataset(self):
+        self.generate(seed=1)
+        menuitems = self.get_menuitems()
+        Restaurant.objects.all().delete()
+
+        self.generate(seed=1)
+        self.assertEqual(self.get_menuitems(), menuitems)
+
+    def test_repeated_runs_do_not_reuse_slugs_or_usernames(self):
+        self.generate()
+        self.generate()
+        self.assertEqual(UserModel.objects.count(), 4)
+        self.assertEqual(Restaurant.objects.count(), 6)
+
+    def test_duplicate_names_are_numbered(self):
+        # there are fewer menu names than menus, so some names repeat
+        self.generate(restaurants=1, menus=20, sections=0, items=0)
+        slugs = list(Menu.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), 20)
+        self.assertEqual(len(set(slugs)), 20)
+
+
+class BenchmarkHotPathsTest(TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.output_path = os.path.join(self.tempdir, 'results.json')
+
+    def benchmark(self, stderr=None, **options):
+        call_command(
+            'benchmark_hot_paths', restaurants=2, menus=1, sections=2,
+            items=2, requests=3, warmup=1, bulk_size=2,
+            output=self.output_path, stderr=stderr or StringIO(), **options)
+        with open(self.output_path) as f:
+            return json.load(f)
+
+    def test_reports_latency_and_queries_of_each_path(self):
+        report = self.benchmark()
+        self.assertEqual(report['dataset']['restaurants'], 2)
+        for name in ['html:restaurant_list', 'html:menuitem_detail',
+                     'api:restaurant_list', 'api:restaurant_tree',
+                     'api:menuitem_detail', 'api:menuitem_bulk']:
+            summary = report['results'][name]
+            self.assertEqual(summary['requests'], 3)
+            self.assertLessEqual(summary['p50_ms'], summary['p99_ms'])
+            self.assertGreater(summary['queries'], 0)
+
+    def test_dataset_is_rolled_back(self):
+        self.benchmark()
+        self.assertEqual(Restaurant.objects.count(), 0)
+        self.assertEqual(MenuItem.objects.count(), 0)
+
+    def test_baseline_with_fewer_queries_is_a_regression(self):
+        report = self.benchmark()
+        report['results']['html:menu_detail']['queries'] -= 1
+        baseline_path = os.path.join(self.tempdir, 'baseline.json')
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f)
+
+        with self.assertRaisesMessage(CommandError, 'html:menu_detail'):
+            self.benchmark(baseline=baseline_path, tolerance=100)
+
+    def test_slower_baseline_is_a_warning(self):
+        report = self.benchmark()
+        for summary in report['results'].values():
+            summary['p50_ms'] /= 10
+        baseline_path = os.path.join(self.tempdir, 'baseline.json')
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f)
+
+        stderr = StringIO()
+        self.benchmark(baseline=baseline_path, stderr=stderr)
+        self.assertIn('SLOWER (warning)', stderr.getvalue())
+
+    def test_missing_baseline_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, 'Could not read'):
+            self.benchmark(
+                baseline=os.path.join(self.tempdir, 'missing.json'))
+
+
+class ReplayRequestsTest(LiveServerTestCase):
+
+    def setUp(self):
+        self.test_menuitem = f.MenuItemFactory()
+        self.test_menu = self.test_menuitem.menusection.menu
+
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.log_path = os.path.join(tempdir, 'requests.jsonl')
+        self.output_path = os.path.join(tempdir, 'report.json')
+
+    def write_log(self, entries):
+        with open(self.log_path, 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+
+    def replay(self, **options):
+        call_command(
+            'replay_requests', self.log_path, base_url=self.live_server_url,
+            output=self.output_path, stderr=StringIO(), **options)
+        with open(self.output_path) as f:
+            return json.load(f)
+
+    def test_reports_each_url_name(self):
+        self.write_log(
+            [{'method': 'GET', 'path': self.test_menu.get_absolute_url()}] * 3
+            + [{'method': 'GET', 'path': self.test_menuitem.get_absolute_url(),
+                'view': 'menus:menuitem_detail'},
+               {'method': 'GET', 'path': '/bad-url/'},
+               {'method': 'POST', 'path': '/api/v1/restaurants/',
+                'content_type': 'application/json', 'body': '{}'}])
+
+        report = self.replay(concurrency=2)
+        self.assertEqual(report['requests'], 6)
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['client_errors'], 2)
+        self.assertGreater(report['throughput_rps'], 0)
+
+        menu_detail = report['views']['menus:menu_detail']
+        self.assertEqual(menu_detail['requests'], 3)
+        self.assertEqual(menu_detail['error_rate'], 0)
+        self.assertEqual(sum(menu_detail['histogram_ms'].values()), 3)
+        self.assertLessEqual(menu_detail['p50_ms'], menu_detail['p99_ms'])
+        self.assertEqual(
+            report['views']['menus:menuitem_detail']['requests'], 1)
+        self.assertEqual(report['views']['(unresolved)']['client_errors'], 1)
+        self.assertEqual(
+            report['views']['api:restaurant_list']['client_errors'], 1)
+
+    def test_limit_and_rate(self):
+        self.write_log(
+            [{'method': 'GET', 'path': self.test_menu.get_absolute_url()}] * 5)
+        # the third request starts 0.2 seconds after the first
+        report = self.replay(limit=3, rate=10)
+        self.assertEqual(report['requests'], 3)
+        self.assertLessEqual(report['throughput_rps'], 15)
+
+    def test_connection_errors_are_counted(self):
+        self.write_log([{'method': 'GET', 'path': '/'}])
+        call_command(
+            'replay_requests', self.log_path, base_url='http://127.0.0.1:9',
+            output=self.output_path, stderr=StringIO())
+        with open(self.output_path) as f:
+            report = json.load(f)
+        self.assertEqual(report['errors'], 1)
+        self.assertEqual(report['error_rate'], 1)
+
+    def test_invalid_log_is_an_error(self):
+        with open(self.log_path, 'w') as f:
+            f.write('{"method": "GET"}\n')
+        with self.assertRaisesMessage(CommandError, 'line 1'):
+            self.replay()
+
+
+class BenchmarkStartupTest(TestCase):
+
+    def test_reports_startup_with_and_without_preload(self):
+        stdout = StringIO()
+        call_command('benchmark_startup', models=['sync'], workers=1, runs=1,
+                     stdout=stdout, stderr=StringIO())
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report['workers'], 1)
+        self.assertEqual(
+            set(report['results']['sync']), {'preload_ms', 'no_preload_ms'})
+        for milliseconds in report['results']['sync'].values():
+            self.assertGreater(milliseconds, 0)
+
+    def test_server_that_does_not_start_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, 'exited with code'), \
+                mock.patch.dict(os.environ, {
+                    'DJANGO_SETTINGS_MODULE':
+                        'menus_project.no_such_settings'}):
+            call_command('benchmark_startup', models=['sync'], runs=1,
+                         stdout=StringIO(), stderr=StringIO())
+
+
+class GenerateImageVariantsTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_menu = f.MenuFactory(image=get_image_file('photo.jpg'))
+        self.test_restaurant = self.test_menu.restaurant
+        # an image uploaded before variants were introduced
+        ImageJob.objects.all().delete()
+
+    def generate(self, **options):
+        stdout = StringIO()
+        call_command('generate_image_variants', stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def get_variant_names(self):
+        self.test_menu.refresh_from_db()
+        return [get_variant_name(
+            self.test_menu.image.name, width, format,
+            self.test_menu.image_variant_hash)
+            for width in self.test_menu.image_variant_widths
+            for format in ['webp', 'jpeg']]
+
+    def test_queues_missing_variants(self):
+        updated_at = self.test_restaurant.updated_at
+        output = self.generate()
+        self.assertIn("Queued the variants of 1 menu images.", output)
+        self.assertIn("Queued the variants of 0 restaurant images.", output)
+
+        image_jobs.process_image_jobs()
+        self.test_menu.refresh_from_db()
+        self.assertEqual(
+            self.test_menu.image_variant_widths, [320, 640, 1280])
+        for name in self.get_variant_names():
+            self.assertTrue(default_storage.exists(name), name)
+        # the cached pages of the restaurant are stale
+        self.test_restaurant.refresh_from_db()
+        self.assertGreater(self.test_restaurant.updated_at, updated_at)
+
+    def test_queued_images_are_skipped(self):
+        self.generate()
+        self.assertIn(
+            "Queued the variants of 0 menu images.", self.generate())
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+    def test_all(self):
+        self.generate()
+        image_jobs.process_image_jobs()
+        old_names = self.get_variant_names()
+        self.assertIn(
+            "Queued the variants of 0 menu images.", self.generate())
+        self.assertIn(
+            "Queued the variants of 1 menu images.", self.generate(all=True))
+
+        with mock.patch.dict(VARIANT_FORMATS['webp']['options'],
+                             {'quality': 50}):
+            image_jobs.process_image_jobs()
+        new_names = self.get_variant_names()
+        # the variants are saved under new names, and the files that
+        # browsers may keep are not changed
+        self.assertFalse(set(old_names) & set(new_names))
+        for name in old_names + new_names:
+            self.assertTrue(default_storage.exists(name), name)
+            self.assertTrue(is_content_addressed(name), name)
+
+
+class ProcessImageJobsTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_menus = [f.MenuFactory(image=get_image_file('photo.jpg'))
+                           for i in range(2)]
+        # like the test client, keep the connection of the test case's
+        # transaction open
+        patcher = mock.patch('menus.management.commands.process_image_jobs'
+                             '.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst(self):
+        stdout = StringIO()
+        call_command('process_image_jobs', burst=True, verbosity=2,
+                     stdout=stdout)
+        self.assertFalse(
+            ImageJob.objects.exclude(status=ImageJob.DONE).exists())
+        self.assertIn(f"{self.test_menus[0].image.name}: done in",
+                      stdout.getvalue())
+        self.assertIn("Ran 2 image jobs in", stdout.getvalue())
+        self.assertIn("0 jobs pending, 0 failed.", stdout.getvalue())
+
+    def test_max_jobs(self):
+        stdout = StringIO()
+        call_command('process_image_jobs', max_jobs=1, stdout=stdout)
+        self.assertIn("Ran 1 image jobs in", stdout.getvalue())
+        self.assertIn("1 jobs pending, 0 failed.", stdout.getvalue())
+
+
+class CleanupMediaTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_menu = f.MenuFactory(image=get_image_file('photo.jpg'))
+        self.replaced_image = self.test_menu.image.name
+        self.test_menu.image = get_image_file('other.jpg', color='blue')
+        self.test_menu.save()
+        image_jobs.process_image_jobs()
+        self.test_menu.refresh_from_db()
+        f.MenuSectionFactory(image=self.test_menu.image.name)
+
+        self.old_orphan = default_storage.save(
+            'img/restaurants/1_TTe0t2B.jpg', ContentFile(b'old'))
+        self.new_orphan = default_storage.save(
+            'img/restaurants/2.jpg', ContentFile(b'new'))
+        an_hour_ago = time.time() - 3601
+        for name in default_storage.listdir('img')[0]:
+            for path in walk_paths(default_storage.path(f'img/{name}')):
+                os.utime(path, (an_hour_ago, an_hour_ago))
+        os.utime(default_storage.path(self.new_orphan))
+
+    def get_used_names(self):
+        image = self.test_menu.image
+        return [image.name] + [
+            get_variant_name(
+                image.name, width, format, self.test_menu.image_variant_hash)
+            for width in [320, 640, 1280] for format in ['webp', 'jpeg']]
+
+    def test_deletes_unused_files(self):
+        stdout = StringIO()
+        call_command('cleanup_media', stdout=stdout)
+        self.assertFalse(default_storage.exists(self.old_orphan))
+        self.assertFalse(default_storage.exists(self.replaced_image))
+        self.assertTrue(default_storage.exists(self.new_orphan))
+        for name in self.get_used_names():
+            self.assertTrue(default_storage.exists(name), name)
+        self.assertIn("Deleted 2 unused files", stdout.getvalue())
+        self.assertIn("1 images are in use, 1 of them by more than one "
+                      "object.", stdout.getvalue())
+
+    def test_keeps_an_unused_file_that_is_uploaded_again(self):
+        # e.g. uploaded for an object that is not saved yet
+        with default_storage.open(self.replaced_image) as image_file:
+            content = image_file.read()
+        self.assertEqual(
+            ContentAddressedStorage().save(
+                'img/photo.jpg', ContentFile(content)),
+            self.replaced_image)
+
+        call_command('cleanup_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(self.replaced_image))
+
+    def test_dry_run(self):
+        stdout = StringIO()
+        call_command('cleanup_media', dry_run=True, stdout=stdout)
+        self.assertTrue(default_storage.exists(self.old_orphan))
+        self.assertIn(self.old_orphan, stdout.getvalue())
+        self.assertIn("Would delete 2 unused files", stdout.getvalue())
+
+
+def walk_paths(path):
+    for directory, directories, files in os.walk(path):
+        for name in files:
+            yield os.path.join(directory, name)
+
+
+class HashImageNamesTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_menusection = f.MenuSectionFactory()
+        # an image uploaded before images were named by their content
+        self.old_name = default_storage.save(
+            'img/restaurants/1-chez-nic/menusection-46-drinks.jpg',
+            get_image_file('drinks.jpg'))
+        MenuSection.objects.update(
+            image=self.old_name, image_variant_widths=[320])
+
+    def test_renames_images(self):
+        stdout = StringIO()
+        call_command('hash_image_names', stdout=stdout)
+        self.assertIn("Renamed 1 menu section images.", stdout.getvalue())
+        self.test_menusection.refresh_from_db()
+        self.assertTrue(
+            is_content_addressed(self.test_menusection.image.name))
+        self.assertEqual(self.test_menusection.image_variant_widths, [])
+
+        image_jobs.process_image_jobs()
+        self.test_menusection.refresh_from_db()
+        self.assertEqual(
+            self.test_menusection.image_variant_widths, [320, 640, 1280])
+
+        call_command('hash_image_names', stdout=stdout)
+        self.assertIn("Renamed 0 menu section images.", stdout.getvalue())
+
+    def test_missing_image(self):
+        default_storage.delete(self.old_name)
+        stderr = StringIO()
+        call_command('hash_image_names', stdout=StringIO(), stderr=stderr)
+        self.assertIn(f"{self.old_name} (menu section "
+                      f"{self.test_menusection.pk}) does not exist.",
+                      stderr.getvalue())
@@ -0,0 +1,75 @@
+from django.http import Http404
+from django.test import TestCase
+
+from menus_project import factories as f
+from . import loaders
+
+
+class GetMenuTreeTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menu = f.MenuFactory(admin_users=[cls.restaurant_admin_user])
+        for i in range(2):
+            test_menusection = f.MenuSectionFactory(menu=cls.test_menu)
+            for j in range(2):
+                f.MenuItemFactory(menusection=test_menusection)
+
+    def test_returns_correct_menu(self):
+        menu = loaders.get_menu_tree(
+            self.test_menu.restaurant.slug, self.test_menu.slug)
+        self.assertEqual(menu, self.test_menu)
+
+    def test_tree_is_loaded_in_fixed_number_of_queries(self):
+        with self.assertNumQueries(3):
+            menu = loaders.get_menu_tree(
+                self.test_menu.restaurant.slug, self.test_menu.slug)
+
+        # walking the loaded tree does not run any more queries
+        with self.assertNumQueries(0):
+            menu.restaurant.name
+            self.assertEqual(menu.menusection_set.count(), 2)
+            for menusection in menu.menusection_set.all():
+                self.assertEqual(menusection.menuitem_set.count(), 2)
+                for menuitem in menusection.menuitem_set.all():
+                    menuitem.name
+
+    def test_bad_slug_raises_404(self):
+        with self.assertRaises(Http404):
+            loaders.get_menu_tree(self.test_menu.restaurant.slug, 'bad-slug')
+
+
+class GetMenuSectionTreeTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menusection = \
+            f.MenuSectionFactory(admin_users=[cls.restaurant_admin_user])
+        for i in range(2):
+            f.MenuItemFactory(menusection=cls.test_menusection)
+
+    def get_menusection_tree(self, menusection_slug=None):
+        return loaders.get_menusection_tree(
+            self.test_menusection.menu.restaurant.slug,
+            self.test_menusection.menu.slug,
+            menusection_slug or self.test_menusection.slug)
+
+    def test_returns_correct_menusection(self):
+        self.assertEqual(self.get_menusection_tree(), self.test_menusection)
+
+    def test_tree_is_loaded_in_fixed_number_of_queries(self):
+        with self.assertNumQueries(2):
+            menusection = self.get_menusection_tree()
+
+        # walking the loaded tree does not run any more queries
+        with self.assertNumQueries(0):
+            menusection.menu.restaurant.name
+            self.assertEqual(menusection.menuitem_set.count(), 2)
+            for menuitem in menusection.menuitem_set.all():
+                menuitem.name
+
+    def test_bad_slug_raises_404(self):
+        with self.assertRaises(Http404):
+            self.get_menusection_tree('bad-slug')
@@ -95,7 +95,10 @@ class MenuCreateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(self.view.model.__name__, 'Menu')
@@ -351,6 +354,24 @@ class MenuDetailViewTest(TestCase):
         for i in range(len(test_menusections)):
             self.assertIn(test_menusections[i].name, self.html)
 
+    # query count
+    def test_query_count_does_not_grow_with_menu_size(self):
+        f.MenuItemFactory(
+            menusection=f.MenuSectionFactory(menu=self.test_menu))
+
+        # restaurant.updated_at, menu + restaurant, sections, items
+        with self.assertNumQueries(4):
+            self.client.get(self.current_test_url)
+
+        for i in range(3):
+            test_menusection = f.MenuSectionFactory(menu=self.test_menu)
+            for j in range(3):
+                f.MenuItemFactory(menusection=test_menusection)
+
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
     # bad kwargs
     def test_bad_kwargs(self):
         for i in range(len(self.view.kwargs)):
@@ -400,7 +421,10 @@ class MenuUpdateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(self.view.model.__name__, 'Menu')
@@ -597,6 +621,13 @@ class MenuUpdateViewTest(TestCase):
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
 
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
 
 class MenuDeleteViewTest(TestCase):
 
@@ -794,6 +825,13 @@ class MenuDeleteViewTest(TestCase):
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
 
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
 
 class MenuSectionCreateViewTest(TestCase):
 
@@ -832,7 +870,10 @@ class MenuSectionCreateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(
@@ -1073,6 +1114,21 @@ class MenuSectionDetailViewTest(TestCase):
     def test_template_authorized_user_can_view_auth_links(self):
         self.assertIn('auth-links', self.html)
 
+    # query count
+    def test_query_count_does_not_grow_with_menusection_size(self):
+        self.client.logout()
+
+        # restaurant.updated_at, menusection + menu + restaurant, items
+        with self.assertNumQueries(3):
+            self.client.get(self.current_test_url)
+
+        for i in range(3):
+            f.MenuItemFactory(menusection=self.test_menusection)
+
+        with self.assertNumQueries(3):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
     # bad kwargs
     def test_bad_kwargs(self):
         for i in range(len(self.view.kwargs)):
@@ -1129,7 +1185,10 @@ class MenuSectionUpdateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(
@@ -1341,6 +1400,13 @@ class MenuSectionUpdateViewTest(TestCase):
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
 
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
 
 class MenuSectionDeleteViewTest(TestCase):
 
@@ -1548,6 +1614,13 @@ class MenuSectionDeleteViewTest(TestCase):
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
 
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
 
 class MenuItemCreateViewTest(TestCase):
 
@@ -1588,7 +1661,10 @@ class MenuItemCreateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(
@@ -1901,7 +1977,10 @@ class MenuItemUpdateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(self.view.model.__name__, 'MenuItem')
@@ -2140,6 +2219,13 @@ class MenuItemUpdateViewTest(TestCase):
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
 
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
 
 class MenuItemDeleteViewTest(TestCase):
 
@@ -2350,3 +2436,10 @@ class MenuItemDeleteViewTest(TestCase):
                     self.test_menuitem.slug if i != 3 else 'bad-slug'})
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
+
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
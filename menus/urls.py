@@ -1,5 +1,6 @@
 from django.urls import path
 
+from menus_project.async_views import async_read_view
 from . import views
 
 app_name = 'menus'
@@ -12,7 +13,7 @@ urlpatterns = [
          views.MenuCreateView.as_view(),
          name='menu_create'),
     path('<slug:menu_slug>/',
-         views.MenuDetailView.as_view(),
+         async_read_view(views.MenuDetailView.as_view()),
          name='menu_detail'),
     path('<slug:menu_slug>/edit/',
          views.MenuUpdateView.as_view(),
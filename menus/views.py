@@ -6,12 +6,47 @@ from django.urls import reverse
 from django.views.generic import CreateView, DetailView, DeleteView
 from django.views.generic.edit import UpdateView
 
-from menus_project.permissions import UserHasRestaurantPermissionsMixin
+from menus_project.cache import RenderedPageCacheMixin
+from menus_project.conditional import RestaurantPageConditionalGetMixin
+from menus_project.permissions import (
+    RestaurantAdminContextMixin, UserHasRestaurantPermissionsMixin)
+from menus_project.slugs import SlugValidationErrorMixin
+from menus_project.views import CachedObjectMixin
 from .forms import MenuForm, MenuSectionForm, MenuItemForm
+from .loaders import get_menu_tree, get_menusection_tree
 from .models import Menu, MenuSection, MenuItem
 from restaurants.models import Restaurant
 
 
+class MenuObjectMixin(CachedObjectMixin):
+    slug_url_kwarg = 'menu_slug'
+
+    def get_queryset(self):
+        return Menu.objects.select_related('restaurant').filter(
+            restaurant__slug=self.kwargs['restaurant_slug'])
+
+
+class MenuSectionObjectMixin(CachedObjectMixin):
+    slug_url_kwarg = 'menusection_slug'
+
+    def get_queryset(self):
+        return MenuSection.objects.select_related('menu__restaurant').filter(
+            menu__restaurant__slug=self.kwargs['restaurant_slug'],
+            menu__slug=self.kwargs['menu_slug'])
+
+
+class MenuItemObjectMixin(CachedObjectMixin):
+    slug_url_kwarg = 'menuitem_slug'
+
+    def get_queryset(self):
+        return MenuItem.objects \
+            .select_related('menusection__menu__restaurant').filter(
+                menusection__menu__restaurant__slug=(
+                    self.kwargs['restaurant_slug']),
+                menusection__menu__slug=self.kwargs['menu_slug'],
+                menusection__slug=self.kwargs['menusection_slug'])
+
+
 def menus_root(request, restaurant_slug):
     return HttpResponseRedirect(
         reverse('restaurants:restaurant_detail', kwargs={
@@ -19,7 +54,8 @@ def menus_root(request, restaurant_slug):
 
 
 class MenuCreateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, CreateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, CreateView):
     model = Menu
     form_class = MenuForm
     success_message = "Menu Created: %(name)s"
@@ -39,18 +75,19 @@ class MenuCreateView(
         return {'restaurant': self.restaurant}
 
 
-class MenuDetailView(DetailView):
+class MenuDetailView(
+        RestaurantPageConditionalGetMixin, RenderedPageCacheMixin,
+        RestaurantAdminContextMixin, DetailView):
     model = Menu
 
     def get_object(self):
-        return get_object_or_404(
-            Menu,
-            restaurant__slug=self.kwargs['restaurant_slug'],
-            slug=self.kwargs['menu_slug'])
+        return get_menu_tree(
+            self.kwargs['restaurant_slug'], self.kwargs['menu_slug'])
 
 
 class MenuUpdateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, UpdateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, MenuObjectMixin, UpdateView):
     model = Menu
     form_class = MenuForm
     success_message = "Menu Successfully Updated: %(name)s"
@@ -66,14 +103,9 @@ class MenuUpdateView(
         return {'restaurant': self.get_object().restaurant,
                 'name': self.get_object().name}
 
-    def get_object(self):
-        return get_object_or_404(
-            Menu,
-            restaurant__slug=self.kwargs['restaurant_slug'],
-            slug=self.kwargs['menu_slug'])
-
 
-class MenuDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
+class MenuDeleteView(
+        UserHasRestaurantPermissionsMixin, MenuObjectMixin, DeleteView):
     model = Menu
     success_message = "The '%(name)s' menu has been deleted."
 
@@ -82,18 +114,13 @@ class MenuDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
         messages.success(self.request, self.success_message % obj.__dict__)
         return super().delete(request, *args, **kwargs)
 
-    def get_object(self):
-        return get_object_or_404(
-            Menu,
-            restaurant__slug=self.kwargs['restaurant_slug'],
-            slug=self.kwargs['menu_slug'])
-
     def get_success_url(self):
         return self.object.restaurant.get_absolute_url()
 
 
 class MenuSectionCreateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, CreateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, CreateView):
     model = MenuSection
     form_class = MenuSectionForm
     success_message = "Menu Section Created: %(name)s"
@@ -115,19 +142,21 @@ class MenuSectionCreateView(
         return {'menu': self.menu}
 
 
-class MenuSectionDetailView(DetailView):
+class MenuSectionDetailView(
+        RestaurantPageConditionalGetMixin, RenderedPageCacheMixin,
+        RestaurantAdminContextMixin, DetailView):
     model = MenuSection
 
     def get_object(self):
-        return get_object_or_404(
-            MenuSection,
-            menu__restaurant__slug=self.kwargs['restaurant_slug'],
-            menu__slug=self.kwargs['menu_slug'],
-            slug=self.kwargs['menusection_slug'])
+        return get_menusection_tree(
+            self.kwargs['restaurant_slug'],
+            self.kwargs['menu_slug'],
+            self.kwargs['menusection_slug'])
 
 
 class MenuSectionUpdateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, UpdateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, MenuSectionObjectMixin, UpdateView):
     model = MenuSection
     form_class = MenuSectionForm
     success_message = "Menu Section Successfully Updated: %(name)s"
@@ -143,15 +172,9 @@ class MenuSectionUpdateView(
         return {'menu': self.get_object().menu,
                 'name': self.get_object().name}
 
-    def get_object(self):
-        return get_object_or_404(
-            MenuSection,
-            menu__restaurant__slug=self.kwargs['restaurant_slug'],
-            menu__slug=self.kwargs['menu_slug'],
-            slug=self.kwargs['menusection_slug'])
 
-
-class MenuSectionDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
+class MenuSectionDeleteView(
+        UserHasRestaurantPermissionsMixin, MenuSectionObjectMixin, DeleteView):
     model = MenuSection
     success_message = "'%(name)s' has been deleted from the menu."
 
@@ -160,19 +183,13 @@ class MenuSectionDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
         messages.success(self.request, self.success_message % obj.__dict__)
         return super().delete(request, *args, **kwargs)
 
-    def get_object(self):
-        return get_object_or_404(
-            MenuSection,
-            menu__restaurant__slug=self.kwargs['restaurant_slug'],
-            menu__slug=self.kwargs['menu_slug'],
-            slug=self.kwargs['menusection_slug'])
-
     def get_success_url(self):
         return self.object.menu.get_absolute_url()
 
 
 class MenuItemCreateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, CreateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, CreateView):
     model = MenuItem
     form_class = MenuItemForm
     success_message = "Menu Item Created: %(name)s"
@@ -198,20 +215,14 @@ class MenuItemCreateView(
         return self.object.menusection.get_absolute_url()
 
 
-class MenuItemDetailView(DetailView):
+class MenuItemDetailView(
+        RestaurantAdminContextMixin, MenuItemObjectMixin, DetailView):
     model = MenuItem
 
-    def get_object(self):
-        return get_object_or_404(
-            MenuItem,
-            menusection__menu__restaurant__slug=self.kwargs['restaurant_slug'],
-            menusection__menu__slug=self.kwargs['menu_slug'],
-            menusection__slug=self.kwargs['menusection_slug'],
-            slug=self.kwargs['menuitem_slug'])
-
 
 class MenuItemUpdateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, UpdateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, MenuItemObjectMixin, UpdateView):
     model = MenuItem
     form_class = MenuItemForm
     success_message = "Menu Item Successfully Updated: %(name)s"
@@ -228,16 +239,9 @@ class MenuItemUpdateView(
                 'name': self.get_object().name,
                 'description': self.get_object().description}
 
-    def get_object(self):
-        return get_object_or_404(
-            MenuItem,
-            menusection__menu__restaurant__slug=self.kwargs['restaurant_slug'],
-            menusection__menu__slug=self.kwargs['menu_slug'],
-            menusection__slug=self.kwargs['menusection_slug'],
-            slug=self.kwargs['menuitem_slug'])
-
 
-class MenuItemDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
+class MenuItemDeleteView(
+        UserHasRestaurantPermissionsMixin, MenuItemObjectMixin, DeleteView):
     model = MenuItem
     success_message = "'%(name)s' has been deleted from the menu."
 
@@ -246,13 +250,5 @@ class MenuItemDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
         messages.success(self.request, self.success_message % obj.__dict__)
         return super().delete(request, *args, **kwargs)
 
-    def get_object(self):
-        return get_object_or_404(
-            MenuItem,
-            menusection__menu__restaurant__slug=self.kwargs['restaurant_slug'],
-            menusection__menu__slug=self.kwargs['menu_slug'],
-            menusection__slug=self.kwargs['menusection_slug'],
-            slug=self.kwargs['menuitem_slug'])
-
     def get_success_url(self):
         return self.object.menusection.get_absolute_url()
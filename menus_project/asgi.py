@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'menus_project.settings')
+# serve the read views as async views, see menus_project.async_views
+os.environ.setdefault('MENUS_ASYNC_READ_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,96 @@
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+
+from menus_project import instrumentation
+
+_orm_executor = None
+_orm_executor_lock = threading.Lock()
+
+
+def get_orm_executor():
+    """
+    Return the thread pool that runs the ORM work of async views. Its size
+    (settings.ASYNC_ORM_MAX_THREADS) bounds the number of database
+    connections that the async views of one worker process use at once.
+    """
+    global _orm_executor
+    with _orm_executor_lock:
+        if _orm_executor is None:
+            _orm_executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_ORM_MAX_THREADS,
+                thread_name_prefix='orm')
+        return _orm_executor
+
+
+@receiver(setting_changed)
+def reset_orm_executor(setting, **kwargs):
+    global _orm_executor
+    if setting == 'ASYNC_ORM_MAX_THREADS':
+        with _orm_executor_lock:
+            if _orm_executor is not None:
+                _orm_executor.shutdown(wait=False)
+            _orm_executor = None
+
+
+def _run_orm_job(func, *args, **kwargs):
+    # the pool's threads are not request threads, so their connections are
+    # managed the way Django manages them around every request
+    close_old_connections()
+    instrumentation.install_query_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_orm_pool(func, *args, **kwargs):
+    """
+    Run a sync function that uses the ORM in the ORM thread pool, without
+    blocking the event loop.
+    """
+    return await sync_to_async(
+        _run_orm_job, thread_sensitive=False,
+        executor=get_orm_executor())(func, *args, **kwargs)
+
+
+def _get_rendered_response(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    # render in the same thread, since templates may still run queries
+    if hasattr(response, 'render') and callable(response.render):
+        start = time.perf_counter()
+        response.render()
+        instrumentation.add_render_time(time.perf_counter() - start)
+    return response
+
+
+def async_read_view(view):
+    """
+    Turn a sync view function into an async one whose GET and HEAD
+    requests are handled in the ORM thread pool when the project is served
+    over ASGI, so that concurrent readers do not wait for each other.
+
+    Other requests, and all requests served over WSGI, are handled in the
+    request's own thread, as a sync view would be. The view is returned
+    unchanged unless settings.ASYNC_READ_VIEWS is on.
+    """
+    if not settings.ASYNC_READ_VIEWS:
+        return view
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if isinstance(request, ASGIRequest) \
+                and request.method in ('GET', 'HEAD'):
+            return await run_in_orm_pool(
+                _get_rendered_response, view, request, *args, **kwargs)
+        return await sync_to_async(_get_rendered_response)(
+            view, request, *args, **kwargs)
+    return wrapper
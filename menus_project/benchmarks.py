@@ -0,0 +1,84 @@
+import math
+import statistics
+
+PERCENTILES = [50, 95, 99]
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percentile of a non-empty list of values.
+    """
+    values = sorted(values)
+    rank = max(1, math.ceil(len(values) * percent / 100))
+    return values[rank - 1]
+
+
+def summarize(timings, query_counts):
+    """
+    Summarize the latencies (in milliseconds) and query counts of the
+    requests made to one path.
+    """
+    summary = {'requests': len(timings),
+               'mean_ms': round(statistics.mean(timings), 3)}
+    for percent in PERCENTILES:
+        summary[f'p{percent}_ms'] = round(percentile(timings, percent), 3)
+    summary['queries'] = max(query_counts)
+    return summary
+
+
+def get_latency_histogram(timings):
+    """
+    Count the latencies (in milliseconds) that fall into each bucket of
+    LATENCY_BUCKETS_MS, keyed by the bucket's upper bound ('inf' for the
+    latencies above the last bound).
+    """
+    histogram = dict.fromkeys(
+        [str(bound) for bound in LATENCY_BUCKETS_MS] + ['inf'], 0)
+    for timing in timings:
+        bucket = next(
+            (str(bound) for bound in LATENCY_BUCKETS_MS if timing <= bound),
+            'inf')
+        histogram[bucket] += 1
+    return histogram
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare benchmark results to baseline results of the same shape.
+
+    Return a list of (name, message, is_regression, is_slower) tuples. A
+    path regresses if it runs more queries than in the baseline. It is
+    slower if its median latency is more than `tolerance` (e.g. 0.25 for
+    25%) above the baseline's, which is only worth a warning: latencies
+    depend on the machine and its load, while query counts do not.
+    """
+    comparison = []
+    for name, summary in results.items():
+        if name not in baseline:
+            comparison.append((name, "not in baseline", False, False))
+            continue
+        baseline_summary = baseline[name]
+
+        messages = []
+        is_slower = False
+        for percent in PERCENTILES:
+            key = f'p{percent}_ms'
+            change = get_relative_change(summary[key], baseline_summary[key])
+            messages.append(f"{key} {summary[key]:.3f} ({change:+.0%})")
+            if percent == 50 and change > tolerance:
+                is_slower = True
+
+        query_change = summary['queries'] - baseline_summary['queries']
+        messages.append(f"queries {summary['queries']} ({query_change:+d})")
+
+        comparison.append(
+            (name, ", ".join(messages), query_change > 0, is_slower))
+    return comparison
+
+
+def get_relative_change(value, baseline_value):
+    if not baseline_value:
+        return 0 if not value else math.inf
+    return value / baseline_value - 1
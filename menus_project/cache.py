@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.http import urlencode
+
+CACHE_ALIAS = 'menus'
+RENDERED_PAGE_KEY = 'rendered-page:%s:%s:%s:%s'
+RENDERED_PAGE_HITS_KEY = 'rendered-page-hits'
+RENDERED_PAGE_MISSES_KEY = 'rendered-page-misses'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_restaurant_page_version(restaurant):
+    """
+    Return the version that a restaurant's pages are cached under. It is
+    read from the database (the restaurant's updated_at, which changes
+    whenever the restaurant or one of its menus, sections or items is saved
+    or deleted), so a change made by any process stops the pages cached by
+    every other process from being served, even when each process has its
+    own cache.
+    """
+    return int(restaurant.updated_at.timestamp() * 1000000)
+
+
+def _increment_counter(key):
+    cache = get_cache()
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_rendered_page_cache_stats():
+    cache = get_cache()
+    return {'hits': cache.get(RENDERED_PAGE_HITS_KEY, 0),
+            'misses': cache.get(RENDERED_PAGE_MISSES_KEY, 0)}
+
+
+def is_cacheable_request(request):
+    # only anonymous users see the public version of a page, and any
+    # pending messages are rendered into the page
+    return request.method == 'GET' \
+        and not request.user.is_authenticated \
+        and not len(get_messages(request))
+
+
+class RenderedPageCacheMixin:
+    """
+    Serve anonymous GET requests for a restaurant's pages from the rendered
+    page cache. Entries are stored under the restaurant's version (see
+    get_restaurant_page_version()), so they stop being served as soon as
+    anything in the restaurant changes, and under
+    settings.RENDERED_PAGE_VERSION, so they stop being served after a deploy
+    that changes how pages are rendered.
+
+    Only the query parameters of cached_query_params (a dict of the values
+    that each one may have) are part of the cache key. Requests with any
+    other query parameter or value (e.g. ?next=, which is rendered into the
+    login links) are not served from the cache, so that they cannot fill it
+    with copies of the same page.
+    """
+    cached_query_params = {}
+
+    def get(self, request, *args, **kwargs):
+        if not is_cacheable_request(request) \
+                or not self.is_cacheable_query(request):
+            return super().get(request, *args, **kwargs)
+
+        restaurant = self.get_page_cache_restaurant()
+        if restaurant is None:
+            return super().get(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = RENDERED_PAGE_KEY % (
+            settings.RENDERED_PAGE_VERSION, restaurant.pk,
+            get_restaurant_page_version(restaurant),
+            request.path + '?' + urlencode(sorted(request.GET.items())))
+
+        page = cache.get(key)
+        if page is not None:
+            _increment_counter(RENDERED_PAGE_HITS_KEY)
+            response = HttpResponse(page['content'])
+            for header, value in page['headers']:
+                response[header] = value
+            return response
+
+        _increment_counter(RENDERED_PAGE_MISSES_KEY)
+        response = super().get(request, *args, **kwargs)
+        response.render()
+        if response.status_code == 200:
+            cache.set(key, {'content': response.content,
+                            'headers': list(response.items())})
+        return response
+
+    def is_cacheable_query(self, request):
+        for name, values in request.GET.lists():
+            if len(values) != 1 \
+                    or values[0] not in self.cached_query_params.get(name, ()):
+                return False
+        return True
+
+    def get_page_cache_restaurant(self):
+        """
+        Return the restaurant of the requested page, with its updated_at, or
+        None if there is no such restaurant. The restaurant loaded by
+        RestaurantPageConditionalGetMixin is reused.
+        """
+        if hasattr(self, 'conditional_restaurant'):
+            return self.conditional_restaurant
+        from menus_project.conditional import get_validating_restaurant
+        return get_validating_restaurant(slug=self.kwargs['restaurant_slug'])
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.utils.cache import get_conditional_response, quote_etag
+
+from menus_project.cache import is_cacheable_request
+from restaurants.models import Restaurant
+
+
+def get_validating_restaurant(**lookup):
+    """
+    Load only the fields of a restaurant needed to validate a conditional
+    request, or return None if there is no matching restaurant.
+    """
+    try:
+        return Restaurant.objects.only('updated_at').get(**lookup)
+    except Restaurant.DoesNotExist:
+        return None
+
+
+def get_restaurant_etag(restaurant, *extra):
+    # changes with the restaurant, and with a deploy that changes how pages
+    # are rendered (see RenderedPageCacheMixin)
+    timestamp = int(restaurant.updated_at.timestamp() * 1000000)
+    return quote_etag('-'.join(
+        str(value) for value in
+        (settings.RENDERED_PAGE_VERSION, restaurant.pk, timestamp) + extra))
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match with a 304 response, using the updated_at of the
+    restaurant that the requested object belongs to.
+
+    No Last-Modified header is sent: it only has a precision of one second,
+    so an If-Modified-Since request could get a 304 after a change made in
+    the same second as the client's copy.
+
+    The check runs before the view's own get(), so no object tree is
+    loaded and no template is rendered for a 304 response.
+    """
+
+    def get(self, request, *args, **kwargs):
+        restaurant = self.get_conditional_restaurant()
+        # also used by RenderedPageCacheMixin
+        self.conditional_restaurant = restaurant
+        if restaurant is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_conditional_etag(restaurant)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304) \
+                and not response.has_header('ETag'):
+            response['ETag'] = etag
+        return response
+
+    def get_conditional_etag(self, restaurant):
+        return get_restaurant_etag(restaurant)
+
+    def get_conditional_restaurant(self):
+        """
+        Return the restaurant whose updated_at validates the response, or
+        None to skip conditional handling for this request.
+        """
+        raise NotImplementedError
+
+
+class RestaurantPageConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for the HTML pages of a restaurant. Only anonymous
+    requests are handled, since the markup for authenticated users depends
+    on who they are.
+    """
+
+    def get_conditional_restaurant(self):
+        if not is_cacheable_request(self.request):
+            return None
+        return get_validating_restaurant(slug=self.kwargs['restaurant_slug'])
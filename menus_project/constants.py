@@ -43,6 +43,13 @@ MAX_RESTAURANTS_PER_USER_ERROR_STRING = "You cannot register more than "\
 RESTAURANT_DUPLICATE_SLUG_ERROR_STRING = \
     "This name is too similar to an existing restaurant name."
 
+# api
+API_BULK_NOT_A_LIST_ERROR_STRING = "Expected a list of objects."
+API_BULK_TOO_MANY_OBJECTS_ERROR_STRING = \
+    "You cannot submit more than {max_size} objects at once."
+API_BULK_DUPLICATE_SLUG_ERROR_STRING = \
+    "This name is too similar to another name in this request."
+
 # users - registration
 USER_REGISTER_ALREADY_AUTHENTICATED_MESSAGE = "You are already logged in, "\
     "so we redirected you here from the registration page."
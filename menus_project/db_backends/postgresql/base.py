@@ -0,0 +1,131 @@
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+Database = base.Database
+
+# OPTIONS of this backend that are not arguments of psycopg2.connect()
+BACKEND_OPTIONS = ['pool']
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    The connections to one database, shared by the threads of a process.
+    At most max_size connections are open at once. A thread that needs a
+    connection while all of them are in use waits up to timeout seconds
+    for another thread to return one.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_connections = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_size)
+
+    def getconn(self, connect):
+        """
+        Return an idle connection, or a new one from connect() if there is
+        no idle connection.
+        """
+        if not self.slots.acquire(timeout=self.timeout):
+            raise Database.OperationalError(
+                f"All {self.max_size} connections of the pool have been in "
+                f"use for {self.timeout} seconds.")
+        try:
+            with self.lock:
+                while self.idle_connections:
+                    connection = self.idle_connections.pop()
+                    if not connection.closed:
+                        return connection
+            return connect()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def putconn(self, connection):
+        """
+        Return a connection to the pool, or close it if it is broken.
+        """
+        try:
+            if connection.closed:
+                return
+            status = connection.info.transaction_status
+            if status in (extensions.TRANSACTION_STATUS_INTRANS,
+                          extensions.TRANSACTION_STATUS_INERROR):
+                connection.rollback()
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.close()
+                return
+            with self.lock:
+                self.idle_connections.append(connection)
+        except Database.Error:
+            connection.close()
+        finally:
+            self.slots.release()
+
+    def close_idle_connections(self):
+        with self.lock:
+            idle_connections = self.idle_connections
+            self.idle_connections = []
+        for connection in idle_connections:
+            connection.close()
+
+
+def get_pool(alias, max_size, timeout):
+    # a forked worker process must not use the connections of its parent
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(max_size, timeout)
+        return _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The PostgreSQL backend, with one more option:
+
+    OPTIONS['pool'] = {'max_size': 10, 'timeout': 10} shares at most
+    max_size connections between the threads of each process. Closing a
+    connection (e.g. at the end of a request, with CONN_MAX_AGE = 0)
+    returns it to the pool instead.
+    """
+
+    def get_pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if options is None:
+            return None
+        return get_pool(
+            self.alias, options.get('max_size', 10),
+            options.get('timeout', 10))
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        for option in BACKEND_OPTIONS:
+            conn_params.pop(option, None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params))
+        # set by get_new_connection() for a new connection
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
@@ -0,0 +1,37 @@
+from django.db.backends.sqlite3 import base
+
+# OPTIONS of this backend that are not arguments of sqlite3.connect()
+BACKEND_OPTIONS = ['pragmas', 'transaction_mode']
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The SQLite backend, with two more OPTIONS:
+
+    'pragmas' is a dict of PRAGMA statements to run on every new connection,
+    e.g. {'journal_mode': 'WAL', 'busy_timeout': 5000}.
+
+    'transaction_mode' is the kind of transaction that transaction.atomic()
+    starts: 'DEFERRED' (SQLite's default), 'IMMEDIATE' or 'EXCLUSIVE'. An
+    IMMEDIATE transaction takes the write lock when it starts, and waits
+    for it (up to busy_timeout), instead of failing with "database is
+    locked" when another connection wrote to the database after it read.
+    """
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for option in BACKEND_OPTIONS:
+            kwargs.pop(option, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict['OPTIONS'].get('pragmas', {})
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        transaction_mode = \
+            self.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED')
+        self.cursor().execute(f'BEGIN {transaction_mode}')
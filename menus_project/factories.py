@@ -1,4 +1,7 @@
+from functools import lru_cache
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 
 import factory
 
@@ -129,3 +132,55 @@ class MenuItemFactory(factory.django.DjangoModelFactory):
         if extracted:
             for user in extracted:
                 self.menusection.menu.restaurant.admin_users.add(user)
+
+
+# random factories for generated datasets (see 'manage.py generate_dataset')
+MENU_NAMES = [
+    'Breakfast', 'Brunch', 'Lunch', 'Dinner', 'Drinks', 'Desserts',
+    'Happy Hour', 'Late Night', 'Kids', 'Specials', 'Catering', 'Takeout']
+MENUSECTION_NAMES = [
+    'Appetizers', 'Starters', 'Soups', 'Salads', 'Sandwiches', 'Burgers',
+    'Pasta', 'Pizza', 'Mains', 'Grill', 'Seafood', 'Sides', 'Desserts',
+    'Hot Drinks', 'Cold Drinks', 'Beer', 'Wine', 'Cocktails']
+MENUITEM_ADJECTIVES = [
+    'Grilled', 'Roasted', 'Smoked', 'Crispy', 'Spicy', 'Braised', 'Pan-Fried',
+    'Steamed', 'Baked', 'Classic', 'Garlic', 'Honey', 'Lemon', 'Herb',
+    'Chipotle', 'Teriyaki', 'Buttermilk', 'Wood-Fired', 'Stuffed', 'House']
+MENUITEM_DISHES = [
+    'Chicken', 'Salmon', 'Steak', 'Pork Chop', 'Shrimp', 'Tofu', 'Burger',
+    'Tacos', 'Wings', 'Meatballs', 'Risotto', 'Ravioli', 'Flatbread',
+    'Quesadilla', 'Mushrooms', 'Cauliflower', 'Potatoes', 'Calamari',
+    'Scallops', 'Lamb Shank', 'Ribs', 'Halibut', 'Noodles', 'Dumplings',
+    'Cheesecake', 'Brownie', 'Lemonade', 'Iced Tea']
+
+
+@lru_cache(maxsize=None)
+def get_test_password_hash():
+    return make_password(c.TEST_USER_PASSWORD)
+
+
+class RandomUserFactory(UserFactory):
+    """
+    UserFactory with realistic names. The test password is only hashed
+    once, so that many users can be built quickly.
+    """
+    username = factory.LazyAttributeSequence(
+        lambda obj, n: f'{obj.first_name}.{obj.last_name}.{n+1}'.lower())
+    password = factory.LazyFunction(get_test_password_hash)
+
+
+class RandomMenuFactory(MenuFactory):
+    name = factory.Faker('random_element', elements=MENU_NAMES)
+
+
+class RandomMenuSectionFactory(MenuSectionFactory):
+    name = factory.Faker('random_element', elements=MENUSECTION_NAMES)
+
+
+class RandomMenuItemFactory(MenuItemFactory):
+    name = factory.LazyFunction(lambda: ' '.join([
+        factory.random.randgen.choice(MENUITEM_ADJECTIVES),
+        factory.random.randgen.choice(MENUITEM_DISHES)]))
+    price = factory.Faker(
+        'pyint', min_value=200, max_value=4500, step=25)
+    description = factory.Faker('sentence', nb_words=10)
@@ -0,0 +1,118 @@
+"""
+gunicorn configuration for menus_project, used by gunicorn-start and
+gunicorn-start-asgi:
+
+    gunicorn -c python:menus_project.gunicorn_conf
+
+Each setting is read from an environment variable, then from
+server_config, then falls back to a default:
+
+    GUNICORN_WORKER_MODEL    'sync', 'threaded', 'gevent' or 'asgi'
+    GUNICORN_WORKERS         default: from the number of CPUs
+    GUNICORN_THREADS         threads per 'threaded' worker (default: 4)
+    GUNICORN_BIND            default: '0.0.0.0:8003'
+    GUNICORN_PRELOAD         '1' to import the project before forking
+                             (default), '0' to import it in each worker
+    GUNICORN_MAX_REQUESTS    restart a worker after this many requests
+                             (default: 1000, 0 to never restart)
+    GUNICORN_MAX_REQUESTS_JITTER
+                             add up to this many requests at random, so
+                             that workers do not restart all at once
+                             (default: 100)
+
+The 'gevent' model requires gevent to be installed.
+
+A warning is logged at startup when several workers would each keep their
+own rendered page cache (MENUS_CACHE_BACKEND is process-local).
+"""
+import os
+
+try:
+    import server_config
+except ImportError:
+    server_config = None
+
+
+def get_setting(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        value = getattr(server_config, name, default)
+    return type(default)(value)
+
+
+def get_cpu_count():
+    # the CPUs this process may run on, which may be fewer than the
+    # machine's (e.g. in a container)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+WORKER_MODELS = ['sync', 'threaded', 'gevent', 'asgi']
+# cache backends whose entries are only seen by the process that set them
+PROCESS_LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache']
+
+worker_model = get_setting('GUNICORN_WORKER_MODEL', 'sync')
+if worker_model not in WORKER_MODELS:
+    raise ValueError(
+        f"Invalid GUNICORN_WORKER_MODEL '{worker_model}', expected one of "
+        f"{', '.join(WORKER_MODELS)}.")
+
+cpu_count = get_cpu_count()
+if worker_model == 'sync':
+    # each worker handles one request at a time, and waits on the database
+    # for part of it
+    default_workers = cpu_count * 2 + 1
+else:
+    # each worker handles many requests at a time
+    default_workers = cpu_count + 1
+
+workers = get_setting('GUNICORN_WORKERS', default_workers)
+bind = get_setting('GUNICORN_BIND', '0.0.0.0:8003')
+wsgi_app = 'menus_project.wsgi:application'
+
+if worker_model == 'sync':
+    worker_class = 'sync'
+elif worker_model == 'threaded':
+    worker_class = 'gthread'
+    threads = get_setting('GUNICORN_THREADS', 4)
+elif worker_model == 'gevent':
+    # patch the standard library before the project is preloaded, so that
+    # the project's imports get the cooperative versions
+    from gevent import monkey
+    monkey.patch_all()
+    worker_class = 'gevent'
+    worker_connections = 1000
+elif worker_model == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornH11Worker'
+    wsgi_app = 'menus_project.asgi:application'
+
+# import Django, DRF and the project once in the master process, so that
+# workers start quickly and share the imported code's memory
+preload_app = get_setting('GUNICORN_PRELOAD', '1') == '1'
+
+max_requests = get_setting('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = get_setting('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+
+def get_page_cache_warning():
+    # the same default as the 'menus' cache in settings
+    backend = getattr(
+        server_config, 'MENUS_CACHE_BACKEND',
+        'django.core.cache.backends.locmem.LocMemCache')
+    if workers > 1 and backend in PROCESS_LOCAL_CACHE_BACKENDS:
+        return (
+            f"Each of the {workers} workers keeps its own rendered page "
+            f"cache, since MENUS_CACHE_BACKEND is {backend}. Set "
+            "MENUS_CACHE_BACKEND in server_config to a shared cache (e.g. "
+            "FileBasedCache) so that a page rendered by one worker is "
+            "served by all of them.")
+    return None
+
+
+def on_starting(server):
+    warning = get_page_cache_warning()
+    if warning:
+        server.log.warning(warning)
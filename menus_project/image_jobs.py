@@ -0,0 +1,215 @@
+"""
+A queue of image processing jobs, stored in the database.
+
+Saving a new upload of a restaurant, menu or section image queues a job
+(see images.ImageVariantsMixin), so that the request that uploaded it is
+answered without decoding or resizing it. The worker:
+
+    ./manage.py process_image_jobs
+
+then claims each job, strips the image's metadata (transcoding it if
+browsers cannot display it), generates its variants, and saves their
+widths. Templates serve the original image until then.
+
+Several workers can run at once: a job is claimed by a conditional update,
+which only one of them can make. A job whose worker stopped while running it
+is claimed again after settings.IMAGE_JOB_TIMEOUT seconds, and a job is
+attempted at most settings.IMAGE_JOB_MAX_ATTEMPTS times.
+"""
+import datetime
+import logging
+import traceback
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import (
+    Count, DurationField, ExpressionWrapper, F, Min, Q, Sum)
+from django.utils import timezone
+
+from menus.models import ImageJob
+
+from .images import (
+    clean_original_image, delete_image_variants, delete_unreferenced_image,
+    generate_image_variants)
+
+logger = logging.getLogger(__name__)
+
+# jobs read at once when looking for one to claim
+CLAIM_BATCH_SIZE = 10
+# the period that the throughput metric is averaged over
+THROUGHPUT_WINDOW = datetime.timedelta(minutes=5)
+METRIC_PREFIX = 'menus_'
+
+
+def enqueue_image_job(obj):
+    """Queue the processing of the image of a saved object."""
+    return ImageJob.objects.create(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk, image_name=obj.image.name)
+
+
+def claim_image_job():
+    """
+    Mark the oldest job that is waiting to run (or whose worker stopped
+    while running it) as running, and return it, or None if there is none.
+    """
+    now = timezone.now()
+    abandoned = Q(
+        status=ImageJob.RUNNING,
+        started_at__lt=now - datetime.timedelta(
+            seconds=settings.IMAGE_JOB_TIMEOUT))
+    ImageJob.objects \
+        .filter(abandoned, attempts__gte=settings.IMAGE_JOB_MAX_ATTEMPTS) \
+        .update(status=ImageJob.FAILED, finished_at=now,
+                error="The worker stopped before the job finished.")
+
+    claimable = ImageJob.objects.filter(Q(status=ImageJob.PENDING) | abandoned)
+    while True:
+        candidates = list(claimable.values_list('pk', 'status', 'attempts')
+                          [:CLAIM_BATCH_SIZE])
+        if not candidates:
+            return None
+        for pk, status, attempts in candidates:
+            # another worker may have claimed the job since it was read
+            claimed = ImageJob.objects \
+                .filter(pk=pk, status=status, attempts=attempts) \
+                .update(status=ImageJob.RUNNING, started_at=now,
+                        attempts=attempts + 1)
+            if claimed:
+                return ImageJob.objects.get(pk=pk)
+
+
+def process_image(job):
+    """
+    Clean up the image of a job and generate its variants. Return the job's
+    new status and error message.
+    """
+    model = job.content_type.model_class()
+    obj = model.objects.filter(pk=job.object_id, image=job.image_name) \
+        .first()
+    if obj is None:
+        return ImageJob.SKIPPED, ''
+
+    obj.image = clean_original_image(obj.image)
+    widths, variant_hash = generate_image_variants(obj.image)
+    if not widths:
+        return ImageJob.FAILED, "The image cannot be read."
+
+    with transaction.atomic():
+        # the image may have been replaced while it was being processed
+        if not model.objects.select_for_update() \
+                .filter(pk=obj.pk, image=job.image_name).exists():
+            delete_image_variants(obj.image, widths, variant_hash)
+            return ImageJob.SKIPPED, ''
+        obj.image_variant_widths = widths
+        obj.image_variant_hash = variant_hash
+        # also changes the restaurant's updated_at, which the cached pages
+        # are keyed on, so no process serves the pages without the variants
+        obj.save(update_fields=['image', 'image_variant_widths',
+                                'image_variant_hash', 'updated_at'])
+    if obj.image.name != job.image_name:
+        # the upload, with its metadata
+        delete_unreferenced_image(obj.image.storage, job.image_name)
+    return ImageJob.DONE, ''
+
+
+def run_image_job(job):
+    """
+    Run a claimed job, and record its result. A job that raises an error is
+    queued again, until it has been attempted settings.IMAGE_JOB_MAX_ATTEMPTS
+    times.
+    """
+    try:
+        status, error = process_image(job)
+    except Exception:
+        logger.exception("Image job %s (%s) failed", job.pk, job.image_name)
+        status = ImageJob.FAILED \
+            if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS \
+            else ImageJob.PENDING
+        error = traceback.format_exc()
+
+    job.status = status
+    job.error = error
+    job.finished_at = None if status == ImageJob.PENDING else timezone.now()
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=job.status, error=job.error, finished_at=job.finished_at)
+    return job
+
+
+def process_image_jobs(max_jobs=None):
+    """
+    Run queued jobs until there are none left (or max_jobs have been run),
+    and return the number of jobs run.
+    """
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        job = claim_image_job()
+        if job is None:
+            break
+        run_image_job(job)
+        count += 1
+    return count
+
+
+def get_image_job_stats():
+    """
+    Return the number of jobs of each status, the age of the oldest pending
+    job, the time spent running the finished jobs, and the number of jobs
+    finished per minute lately.
+    """
+    now = timezone.now()
+    counts = dict(ImageJob.objects.order_by().values_list('status')
+                  .annotate(Count('pk')))
+    oldest_pending = ImageJob.objects.filter(status=ImageJob.PENDING) \
+        .aggregate(created_at=Min('created_at'))['created_at']
+    processing_time = ImageJob.objects \
+        .filter(finished_at__isnull=False, started_at__isnull=False) \
+        .aggregate(total=Sum(ExpressionWrapper(
+            F('finished_at') - F('started_at'),
+            output_field=DurationField())))['total']
+    recently_finished = ImageJob.objects \
+        .filter(finished_at__gte=now - THROUGHPUT_WINDOW).count()
+
+    return {
+        'jobs': {status: counts.get(status, 0)
+                 for status, _label in ImageJob.STATUS_CHOICES},
+        'oldest_pending_age_seconds':
+            (now - oldest_pending).total_seconds() if oldest_pending else 0,
+        'processing_seconds_total':
+            processing_time.total_seconds() if processing_time else 0,
+        'finished_per_minute':
+            recently_finished * 60 / THROUGHPUT_WINDOW.total_seconds(),
+    }
+
+
+def render_image_job_metrics():
+    """
+    Render get_image_job_stats() in the Prometheus text exposition format.
+    The numbers come from the database, so they are the same in every
+    worker process.
+    """
+    stats = get_image_job_stats()
+    window_minutes = int(THROUGHPUT_WINDOW.total_seconds() // 60)
+    metrics = [
+        ('image_jobs', 'gauge', "Image jobs, by status.",
+         [(f'{{status="{status}"}}', count)
+          for status, count in stats['jobs'].items()]),
+        ('image_job_oldest_pending_age_seconds', 'gauge',
+         "Time the oldest pending image job has waited.",
+         [('', stats['oldest_pending_age_seconds'])]),
+        ('image_job_processing_seconds_total', 'counter',
+         "Time spent running the finished image jobs.",
+         [('', stats['processing_seconds_total'])]),
+        ('image_jobs_finished_per_minute', 'gauge',
+         f"Image jobs finished per minute over the last {window_minutes} "
+         f"minutes.",
+         [('', stats['finished_per_minute'])]),
+    ]
+    lines = []
+    for name, metric_type, help_text, samples in metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} {metric_type}")
+        for labels, value in samples:
+            lines.append(f"{METRIC_PREFIX}{name}{labels} {value}")
+    return '\n'.join(lines) + '\n'
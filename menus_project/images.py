@@ -0,0 +1,277 @@
+import functools
+import hashlib
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import class_prepared, post_delete
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# the formats that variants can be saved in
+VARIANT_FORMATS = {
+    'avif': {
+        'pillow_format': 'AVIF', 'extension': 'avif',
+        'mime_type': 'image/avif', 'options': {'quality': 60}},
+    'webp': {
+        'pillow_format': 'WEBP', 'extension': 'webp',
+        'mime_type': 'image/webp', 'options': {'quality': 80}},
+    'jpeg': {
+        'pillow_format': 'JPEG', 'extension': 'jpg',
+        'mime_type': 'image/jpeg',
+        'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+# the formats of uploads that are kept when they are cleaned up (see
+# clean_original_image())
+ORIGINAL_FORMATS = {
+    'JPEG': {'extension': '.jpg', 'options': {'quality': 90}},
+    'PNG': {'extension': '.png', 'options': {'optimize': True}},
+    'WEBP': {'extension': '.webp', 'options': {'quality': 90}},
+}
+
+UNREADABLE_IMAGE_ERRORS = (OSError, Image.DecompressionBombError)
+
+
+@functools.lru_cache()
+def get_variant_formats():
+    """
+    Return the formats of settings.IMAGE_VARIANT_FORMATS that the installed
+    Pillow can write (e.g. AVIF needs a recent Pillow), most preferred
+    first.
+    """
+    Image.init()
+    return [format for format in settings.IMAGE_VARIANT_FORMATS
+            if VARIANT_FORMATS[format]['pillow_format'] in Image.SAVE]
+
+
+def get_variant_name(name, width, format, variant_hash=''):
+    """
+    Return the name of a variant of an image, in the same directory, e.g.
+    'img/restaurants/1.png' -> 'img/restaurants/1-640w.webp', or
+    'img/restaurants/1-0c1f...9e-640w.webp' with the hash of the variants'
+    content (see generate_image_variants()).
+    """
+    base, extension = os.path.splitext(name)
+    if variant_hash:
+        base = f"{base}-{variant_hash}"
+    return f"{base}-{width}w.{VARIANT_FORMATS[format]['extension']}"
+
+
+def get_variant_widths(image_width):
+    """
+    Return the widths of the variants of an image: every width of
+    settings.IMAGE_VARIANT_WIDTHS that is smaller than the image, and the
+    image's own width if it is not larger than all of them (images are not
+    enlarged).
+    """
+    widths = [width for width in settings.IMAGE_VARIANT_WIDTHS
+              if width < image_width]
+    if image_width <= max(settings.IMAGE_VARIANT_WIDTHS):
+        widths.append(image_width)
+    return widths
+
+
+def has_transparency(image):
+    return image.mode in ('RGBA', 'LA', 'PA') \
+        or 'transparency' in image.info
+
+
+def encode_variant(variant, format):
+    variant_format = VARIANT_FORMATS[format]
+    if variant_format['pillow_format'] == 'JPEG' and variant.mode == 'RGBA':
+        # JPEG has no transparency
+        background = Image.new('RGB', variant.size, 'white')
+        background.paste(variant, mask=variant.getchannel('A'))
+        variant = background
+
+    data = io.BytesIO()
+    # the upload's metadata (e.g. the EXIF GPS position of a photo) is not
+    # copied to the variant
+    variant.save(data, variant_format['pillow_format'],
+                 **variant_format['options'])
+    return data.getvalue()
+
+
+def clean_original_image(image):
+    """
+    Rewrite a stored upload without its metadata (e.g. the EXIF GPS
+    position of a photo), rotated as its EXIF orientation says, and
+    transcode it to JPEG (or PNG, if it has transparency) if browsers cannot
+    display its format. Return the name of the cleaned image, which is saved
+    as a new file (the upload may be used by other objects). Animations and
+    unreadable images are left as they are.
+    """
+    try:
+        with image.open('rb'), Image.open(image) as original:
+            if original.format == 'GIF' \
+                    or getattr(original, 'is_animated', False):
+                return image.name
+            format = original.format
+            icc_profile = original.info.get('icc_profile')
+            cleaned = ImageOps.exif_transpose(original)
+            cleaned.load()
+    except UNREADABLE_IMAGE_ERRORS:
+        return image.name
+
+    name = os.path.basename(image.name)
+    if format not in ORIGINAL_FORMATS:
+        format = 'PNG' if has_transparency(cleaned) else 'JPEG'
+        name = os.path.splitext(name)[0] \
+            + ORIGINAL_FORMATS[format]['extension']
+    # the name is built like an upload's (see the field's upload_to)
+    name = image.field.generate_filename(image.instance, name)
+    if format == 'JPEG' and cleaned.mode not in ('RGB', 'L', 'CMYK'):
+        cleaned = cleaned.convert('RGB')
+
+    data = io.BytesIO()
+    options = dict(ORIGINAL_FORMATS[format]['options'])
+    if icc_profile:
+        # keep the colors of photos from wide gamut cameras
+        options['icc_profile'] = icc_profile
+    cleaned.save(data, format, **options)
+    return image.storage.save(name, ContentFile(data.getvalue()))
+
+
+def generate_image_variants(image):
+    """
+    Save resized copies of a stored image next to it, in every format of
+    get_variant_formats(), and return their widths and the hash of their
+    content. If the image cannot be read, no variants are saved, and the
+    original image is served instead.
+
+    The variants are named after their image and the hash (see
+    get_variant_name()), so that variants encoded differently (e.g. after
+    IMAGE_VARIANT_FORMATS or the encoder options change) get new names, and
+    the files that browsers keep for a year never change.
+    """
+    try:
+        with image.open('rb'), Image.open(image) as original:
+            # rotate photos as their camera's EXIF orientation says
+            original = ImageOps.exif_transpose(original)
+            original.load()
+    except UNREADABLE_IMAGE_ERRORS:
+        logger.exception("Cannot generate the variants of %s", image.name)
+        return [], ''
+
+    original = original.convert(
+        'RGBA' if has_transparency(original) else 'RGB')
+
+    widths = get_variant_widths(original.width)
+    variants = {}
+    sha256 = hashlib.sha256()
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        variant = original.resize((width, height), Image.LANCZOS)
+        for format in get_variant_formats():
+            data = encode_variant(variant, format)
+            sha256.update(data)
+            variants[width, format] = data
+    variant_hash = sha256.hexdigest()[:16]
+
+    for (width, format), data in variants.items():
+        name = get_variant_name(image.name, width, format, variant_hash)
+        # the same content, e.g. generated again by another job
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(data))
+    return widths, variant_hash
+
+
+def delete_image_variants(image, widths, variant_hash=''):
+    for width in widths:
+        for format in VARIANT_FORMATS:
+            default_storage.delete(
+                get_variant_name(image.name, width, format, variant_hash))
+
+
+def get_srcset(image, widths, format, variant_hash=''):
+    return ', '.join(
+        '%s %sw' % (default_storage.url(
+            get_variant_name(image.name, width, format, variant_hash)), width)
+        for width in widths)
+
+
+class ImageVariantsMixin:
+    """
+    For models with an 'image' field, and 'image_variant_widths' and
+    'image_variant_hash' fields.
+    A new upload is saved as it is, and queued for the image job worker
+    (see menus_project.image_jobs), which cleans it up, generates its
+    variants and stores their widths and hash. Templates use them to build
+    srcset attributes without touching the storage.
+    """
+
+    def save(self, *args, **kwargs):
+        new_upload = bool(self.image) and not self.image._committed
+        if new_upload or not self.image:
+            # templates serve the original image until the new variants are
+            # ready
+            self.image_variant_widths = []
+            self.image_variant_hash = ''
+        super().save(*args, **kwargs)
+
+        if new_upload:
+            # imported here, as the job model's app imports this module
+            from .image_jobs import enqueue_image_job
+            enqueue_image_job(self)
+
+    def delete_image(self):
+        """
+        Delete the image file and its variants, unless another object uses
+        the same file.
+        """
+        if count_image_references(self.image.name, exclude=self):
+            return
+        delete_image_variants(
+            self.image, self.image_variant_widths, self.image_variant_hash)
+        self.image.delete(save=False)
+
+
+def get_image_models():
+    return [model for model in apps.get_models()
+            if issubclass(model, ImageVariantsMixin)]
+
+
+def count_image_references(name, exclude=None):
+    """
+    Return the number of objects whose image is the file with this name
+    (other than exclude).
+    """
+    count = 0
+    for model in get_image_models():
+        objs = model._default_manager.filter(image=name)
+        if isinstance(exclude, model):
+            objs = objs.exclude(pk=exclude.pk)
+        count += objs.count()
+    return count
+
+
+def delete_unreferenced_image(storage, name):
+    """
+    Delete an image file that has no variants, if no object uses it (e.g.
+    an upload that has been replaced by its cleaned up copy).
+    """
+    if not count_image_references(name):
+        storage.delete(name)
+
+
+def delete_image_on_delete(sender, instance, **kwargs):
+    # also called for the menus and sections deleted along with their
+    # restaurant or menu, which are not deleted by their delete() method
+    if instance.image:
+        transaction.on_commit(instance.delete_image)
+
+
+@receiver(class_prepared)
+def connect_delete_image_on_delete(sender, **kwargs):
+    # only for these models, as a post_delete receiver makes Django fetch
+    # the objects of a cascading delete
+    if issubclass(sender, ImageVariantsMixin):
+        post_delete.connect(delete_image_on_delete, sender=sender)
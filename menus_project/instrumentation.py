@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+METRICS = [
+    ('requests_total', 'counter', "Requests handled."),
+    ('queries_total', 'counter', "SQL queries run."),
+    ('sql_seconds_total', 'counter', "Time spent running SQL queries."),
+    ('render_seconds_total', 'counter', "Time spent rendering responses."),
+    ('latency_seconds_total', 'counter', "Time spent handling requests."),
+    ('query_budget_exceeded_total', 'counter',
+     "Requests that ran more queries than their view's query budget."),
+]
+METRIC_PREFIX = 'menus_view_'
+# URL kwargs that grant access to an account (account activation, password
+# reset and email confirmation links), which must not be written to logs
+SECRET_URL_KWARGS = {'uidb64', 'token', 'key'}
+
+_view_stats = {}
+_view_stats_lock = threading.Lock()
+
+# the timings of the request being handled. A context variable follows the
+# request into the threads that run its sync code and ORM queries.
+_current_timings = ContextVar('request_timings', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def get_view_stats():
+    """
+    Return the totals recorded for each view by this process, keyed by the
+    view's URL name (e.g. 'menus:menu_detail').
+    """
+    with _view_stats_lock:
+        return {view_name: dict(stats)
+                for view_name, stats in _view_stats.items()}
+
+
+def reset_view_stats():
+    with _view_stats_lock:
+        _view_stats.clear()
+
+
+def record_view_stats(view_name, timings, latency, over_budget):
+    with _view_stats_lock:
+        stats = _view_stats.setdefault(
+            view_name, {name: 0 for name, _type, _help in METRICS})
+        stats['requests_total'] += 1
+        stats['queries_total'] += timings.queries
+        stats['sql_seconds_total'] += timings.sql_time
+        stats['render_seconds_total'] += timings.render_time
+        stats['latency_seconds_total'] += latency
+        stats['query_budget_exceeded_total'] += int(over_budget)
+
+
+def render_prometheus_metrics():
+    """
+    Render the recorded totals in the Prometheus text exposition format.
+
+    Each worker process keeps its own totals, so a scrape only returns the
+    totals of the worker that handled it, and a restarted worker starts
+    again from zero. The samples are labelled with the worker's pid, so that
+    each worker is its own series (which Prometheus's rate() handles
+    correctly across restarts); add them up with e.g.
+    'sum without (pid) (rate(menus_view_requests_total[5m]))'.
+    """
+    view_stats = get_view_stats()
+    pid = os.getpid()
+    lines = []
+    for name, metric_type, help_text in METRICS:
+        lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}{name} {metric_type}")
+        for view_name in sorted(view_stats):
+            value = view_stats[view_name][name]
+            lines.append(
+                f'{METRIC_PREFIX}{name}{{view="{view_name}",pid="{pid}"}} '
+                f'{value}')
+    return '\n'.join(lines) + '\n'
+
+
+def get_loggable_path(request):
+    """
+    Return the path of a request, or its URL pattern (e.g.
+    'users/login/<uidb64>/<token>/') if its URL holds a secret, so that
+    anyone who can read the logs cannot use it.
+    """
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match and SECRET_URL_KWARGS.intersection(
+            resolver_match.kwargs):
+        return '/' + resolver_match.route
+    return request.path
+
+
+def get_query_budget(view_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0
+        self.render_time = 0
+
+
+def count_query(execute, sql, params, many, context):
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.sql_time += time.perf_counter() - start
+
+
+def install_query_counter(**kwargs):
+    """
+    Count the queries of the current thread's database connections towards
+    the current request. Called at the start of every request, and by every
+    job of the ORM thread pool.
+    """
+    for connection in connections.all():
+        if count_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(count_query)
+
+
+request_started.connect(install_query_counter)
+
+
+def add_render_time(seconds):
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.render_time += seconds
+
+
+class InstrumentationMiddleware:
+    """
+    Record the number of SQL queries, the SQL time, the render time and the
+    total latency of each request, by the URL name of its view.
+
+    The numbers are logged as one JSON line per request, added to the
+    response as headers when DEBUG is on, and served by the metrics view.
+    A request that runs more queries than settings.QUERY_BUDGETS allows
+    its view is logged as a warning, or raises QueryBudgetExceeded if
+    settings.QUERY_BUDGETS_STRICT is on (as it is in the test suite).
+
+    This middleware should come first in settings.MIDDLEWARE, so that the
+    queries of the other middleware are counted too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # let Django call this middleware without a thread switch
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        timings = request.instrumentation_timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            install_query_counter()
+            response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.process_timings(
+            request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = request.instrumentation_timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.process_timings(
+            request, response, timings, time.perf_counter() - start)
+
+    def process_timings(self, request, response, timings, latency):
+        resolver_match = getattr(request, 'resolver_match', None)
+        view_name = resolver_match.view_name if resolver_match else None
+        query_budget = get_query_budget(view_name)
+        over_budget = \
+            query_budget is not None and timings.queries > query_budget
+
+        if view_name:
+            record_view_stats(view_name, timings, latency, over_budget)
+        self.log(request, response, view_name, timings, latency)
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = timings.queries
+            response['Server-Timing'] = \
+                f"sql;dur={timings.sql_time * 1000:.1f}, " \
+                f"render;dur={timings.render_time * 1000:.1f}, " \
+                f"total;dur={latency * 1000:.1f}"
+
+        if over_budget:
+            message = f"{view_name} ran {timings.queries} queries, which " \
+                f"is over its budget of {query_budget}."
+            if getattr(settings, 'QUERY_BUDGETS_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def log(self, request, response, view_name, timings, latency):
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'path': get_loggable_path(request),
+            'status': response.status_code,
+            'queries': timings.queries,
+            'sql_ms': round(timings.sql_time * 1000, 3),
+            'render_ms': round(timings.render_time * 1000, 3),
+            'total_ms': round(latency * 1000, 3)}))
+
+    def process_template_response(self, request, response):
+        # called just before the response is rendered
+        timings = request.instrumentation_timings
+        start = time.perf_counter()
+
+        def add_render_time(response):
+            timings.render_time += time.perf_counter() - start
+
+        response.add_post_render_callback(add_render_time)
+        return response
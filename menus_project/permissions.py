@@ -2,6 +2,59 @@ from django.contrib.auth.mixins import UserPassesTestMixin
 from restaurants.models import Restaurant
 from menus.models import Menu, MenuSection, MenuItem
 
+ADMINISTERED_RESTAURANT_PKS_ATTR = '_administered_restaurant_pks'
+
+
+def get_administered_restaurant_pks(user):
+    """
+    Return the pks of the restaurants that a user is an admin user of.
+
+    The pks are loaded in one query and kept on the user object, which
+    lasts for a single request, so repeated permission checks during a
+    request do not query the database again.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, ADMINISTERED_RESTAURANT_PKS_ATTR):
+        setattr(user, ADMINISTERED_RESTAURANT_PKS_ATTR, frozenset(
+            Restaurant.admin_users.through.objects
+            .filter(user=user)
+            .values_list('restaurant_id', flat=True)))
+    return getattr(user, ADMINISTERED_RESTAURANT_PKS_ATTR)
+
+
+def get_restaurant_pk(obj):
+    """
+    Return the pk of the restaurant that a Restaurant or related object
+    belongs to, or None if the object is not restaurant-related.
+    """
+    if type(obj) is Restaurant:
+        return obj.pk
+    elif type(obj) is Menu:
+        return obj.restaurant_id
+    elif type(obj) is MenuSection:
+        return obj.menu.restaurant_id
+    elif type(obj) is MenuItem:
+        return obj.menusection.menu.restaurant_id
+    return None
+
+
+def is_restaurant_admin(user, restaurant_pk):
+    return restaurant_pk in get_administered_restaurant_pks(user)
+
+
+class RestaurantAdminContextMixin:
+    """
+    Add 'is_admin' to the context of a detail view, telling the template
+    whether the user is an admin user of the object's restaurant.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['is_admin'] = is_restaurant_admin(
+            self.request.user, get_restaurant_pk(self.object))
+        return context
+
 
 class UserHasRestaurantPermissionsMixin(UserPassesTestMixin):
 
@@ -24,33 +77,12 @@ class UserHasRestaurantPermissionsMixin(UserPassesTestMixin):
         if not obj:
             obj = self.get_object()
 
-        if type(obj) == Restaurant:
-            if self.request.user in obj.admin_users.all() \
-                    or self.request.user.is_staff:
-                return True
-            else:
-                return False
-        elif type(obj) == Menu:
-            if self.request.user in obj.restaurant.admin_users.all() \
-                    or self.request.user.is_staff:
-                return True
-            else:
-                return False
-        elif type(obj) == MenuSection:
-            if self.request.user in obj.menu.restaurant.admin_users.all() \
-                    or self.request.user.is_staff:
-                return True
-            else:
-                return False
-        elif type(obj) == MenuItem:
-            if self.request.user in \
-                    obj.menusection.menu.restaurant.admin_users.all() \
-                    or self.request.user.is_staff:
-                return True
-            else:
-                return False
-
-        raise AttributeError(
-                "This permission needs to be called on a view with a "
-                "Restaurant or related object. "
-                "(e.g. Menu/MenuSection/MenuItem")
+        restaurant_pk = get_restaurant_pk(obj)
+        if restaurant_pk is None:
+            raise AttributeError(
+                    "This permission needs to be called on a view with a "
+                    "Restaurant or related object. "
+                    "(e.g. Menu/MenuSection/MenuItem")
+
+        return self.request.user.is_staff \
+            or is_restaurant_admin(self.request.user, restaurant_pk)
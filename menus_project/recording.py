@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from .instrumentation import get_loggable_path
+
+# request bodies of these content types are recorded (if enabled), since
+# they can be replayed as they are
+REPLAYABLE_CONTENT_TYPES = [
+    'application/json', 'application/x-www-form-urlencoded']
+
+# only these query parameters are recorded. Others (e.g. a login 'next'
+# URL, or a token that a client put in the query string) are dropped.
+RECORDED_QUERY_PARAMS = [
+    'page', 'q', 'cursor', 'page_size', 'view_as_customer', 'format']
+
+_write_lock = threading.Lock()
+
+
+def write_request_log_entry(path, entry):
+    line = json.dumps(entry, separators=(',', ':')) + '\n'
+    with _write_lock, open(path, 'a') as f:
+        f.write(line)
+
+
+class RequestRecorderMiddleware:
+    """
+    Append every request to the JSON lines file at
+    settings.REQUEST_RECORDING_PATH, so that live traffic can be replayed
+    against another build with 'manage.py replay_requests'.
+
+    Each line holds the time, method, path, URL name, response status and
+    duration of a request. Headers and cookies are never recorded. URLs
+    that hold a secret (e.g. a password reset token) are recorded as their
+    URL pattern, and only the query parameters in RECORDED_QUERY_PARAMS
+    are kept.
+    Request bodies are only recorded if settings.REQUEST_RECORDING_BODIES
+    is on, since they may contain passwords or personal details.
+
+    The middleware is disabled when REQUEST_RECORDING_PATH is not set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.path = getattr(settings, 'REQUEST_RECORDING_PATH', None)
+        if not self.path:
+            raise MiddlewareNotUsed
+        self.record_bodies = \
+            getattr(settings, 'REQUEST_RECORDING_BODIES', False)
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # let Django call this middleware without a thread switch
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        # the body must be read before the view parses the request stream
+        body = self.get_replayable_body(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, body, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        body = self.get_replayable_body(request)
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, body, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, body, duration):
+        resolver_match = getattr(request, 'resolver_match', None)
+        entry = {
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': self.get_recorded_path(request),
+            'view': resolver_match.view_name if resolver_match else None,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3)}
+        if body is not None:
+            entry['content_type'] = request.content_type
+            entry['body'] = body
+        write_request_log_entry(self.path, entry)
+
+    def get_recorded_path(self, request):
+        query = urlencode([
+            (key, values) for key, values in request.GET.lists()
+            if key in RECORDED_QUERY_PARAMS], doseq=True)
+        path = get_loggable_path(request)
+        return '%s?%s' % (path, query) if query else path
+
+    def get_replayable_body(self, request):
+        if not self.record_bodies \
+                or request.content_type not in REPLAYABLE_CONTENT_TYPES:
+            return None
+        try:
+            return request.body.decode(request.encoding or 'utf-8')
+        except UnicodeDecodeError:
+            return None
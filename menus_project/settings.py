@@ -4,9 +4,12 @@ Generated by 'django-admin startproject' using Django 3.1.2.
 
 import os
 import sys
+import tempfile
 
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 import secret_key
 import server_config
 
@@ -32,10 +35,12 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
     'menus.apps.MenusConfig',
     'restaurants.apps.RestaurantsConfig',
+    'search.apps.SearchConfig',
     'users.apps.UsersConfig',
     # third-party
     'allauth',
     'allauth.account',
+    'allauth.socialaccount',
     'captcha',
     'corsheaders',
     'crispy_forms',
@@ -48,6 +53,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'menus_project.instrumentation.InstrumentationMiddleware',
+    'menus_project.recording.RequestRecorderMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,6 +80,9 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'menus_project.context_processors.project_name',
             ],
+            'libraries': {
+                'images': 'menus_project.templatetags.images',
+            },
         },
     },
 ]
@@ -88,9 +98,116 @@ DATABASES = {
     }
 }
 
+
+def get_database_setting(name, default):
+    # a MENUS_<name> environment variable overrides server_config, e.g. to
+    # run the tests against PostgreSQL (see test-postgresql)
+    value = os.environ.get(
+        f'MENUS_{name}', getattr(server_config, name, default))
+    return type(default)(value)
+
+
+# 'sqlite_tuned' lets several workers share db.sqlite3: readers are not
+# blocked by writers (WAL mode), writers wait for each other instead of
+# failing with "database is locked", and connections are kept open between
+# requests (see menus_project.db_backends.sqlite3)
+# 'postgresql' uses the PostgreSQL database of the DATABASE_* settings
+DATABASE_PROFILE = get_database_setting('DATABASE_PROFILE', 'default')
+DATABASE_CONN_MAX_AGE = get_database_setting('DATABASE_CONN_MAX_AGE', 600)
+# PostgreSQL only: share at most this many connections between the threads
+# of each worker process, instead of keeping one open per thread (0)
+DATABASE_POOL_SIZE = get_database_setting('DATABASE_POOL_SIZE', 0)
+# rows fetched at a time by the queries that stream large results with
+# QuerySet.iterator() (with a server-side cursor on PostgreSQL)
+DATABASE_ITERATOR_CHUNK_SIZE = 2000
+
+SQLITE_TUNED_DATABASE = {
+    'ENGINE': 'menus_project.db_backends.sqlite3',
+    'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+    'OPTIONS': {
+        'transaction_mode': 'IMMEDIATE',
+        'pragmas': {
+            'journal_mode': 'WAL',
+            # WAL mode is still safe, but the last commits may be lost if
+            # the machine (not the process) crashes
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,  # milliseconds
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,  # negative: in KiB
+        },
+    },
+}
+
+if DATABASE_PROFILE == 'sqlite_tuned':
+    DATABASES['default'].update(SQLITE_TUNED_DATABASE)
+elif DATABASE_PROFILE == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'menus_project.db_backends.postgresql',
+        'NAME': get_database_setting('DATABASE_NAME', 'menus'),
+        'USER': get_database_setting('DATABASE_USER', ''),
+        'PASSWORD': get_database_setting('DATABASE_PASSWORD', ''),
+        'HOST': get_database_setting('DATABASE_HOST', ''),
+        'PORT': get_database_setting('DATABASE_PORT', ''),
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+    }
+    if DATABASE_POOL_SIZE:
+        # connections are returned to the pool at the end of each request
+        DATABASES['default'].update({
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {'pool': {
+                'max_size': DATABASE_POOL_SIZE,
+                'timeout': get_database_setting('DATABASE_POOL_TIMEOUT', 10),
+            }},
+        })
+elif DATABASE_PROFILE != 'default':
+    raise ImproperlyConfigured(
+        f"Invalid DATABASE_PROFILE '{DATABASE_PROFILE}', expected 'default', "
+        f"'sqlite_tuned' or 'postgresql'.")
+
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    # the test database is dropped at the end, so no thread may keep its
+    # connection open
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    # file databases for menus_project.test_db_backends, since WAL mode is
+    # not available for in-memory databases
+    DATABASES['sqlite_tuned'] = {
+        **SQLITE_TUNED_DATABASE,
+        'NAME': str(BASE_DIR / 'db.sqlite3'),
+        'TEST': {'NAME': os.path.join(
+            tempfile.gettempdir(), 'test_menus_sqlite_tuned.sqlite3')}}
+    DATABASES['sqlite_untuned'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(BASE_DIR / 'db.sqlite3'),
+        'TEST': {'NAME': os.path.join(
+            tempfile.gettempdir(), 'test_menus_sqlite_untuned.sqlite3')}}
+
 # allauth
 SITE_ID = 1
 
+# cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # rendered public pages, see menus_project.cache
+    'menus': {
+        'BACKEND': getattr(
+            server_config, 'MENUS_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': getattr(server_config, 'MENUS_CACHE_LOCATION', 'menus'),
+        'TIMEOUT': 60 * 60 * 24,
+    },
+}
+
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    CACHES['menus'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+# part of the rendered page cache keys: change it on a deploy that changes
+# the templates, their context or the static files, so that the pages
+# rendered before it are not served
+RENDERED_PAGE_VERSION = str(
+    getattr(server_config, 'RENDERED_PAGE_VERSION', 1))
+
 # api
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Menu Maker',
@@ -126,6 +243,100 @@ DEFAULT_FROM_EMAIL = SERVER_EMAIL
 # forms
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
+# instrumentation, see menus_project.instrumentation
+# the most SQL queries that a request to each view may run
+QUERY_BUDGETS = {
+    'api:is_email_available': 1,
+    'api:is_username_available': 1,
+    'api:menu_detail': 11,
+    'api:menu_list': 10,
+    'api:menuitem_bulk': 14,
+    'api:menuitem_detail': 12,
+    'api:menuitem_list': 9,
+    'api:menusection_bulk': 14,
+    'api:menusection_detail': 12,
+    'api:menusection_list': 10,
+    'api:restaurant_detail': 10,
+    'api:restaurant_list': 11,
+    'api:restaurant_tree': 7,
+    'api:search': 5,
+    'menus:menu_create': 14,
+    'menus:menu_delete': 8,
+    'menus:menu_detail': 6,
+    'menus:menu_update': 15,
+    'menus:menuitem_create': 16,
+    'menus:menuitem_delete': 7,
+    'menus:menuitem_detail': 4,
+    'menus:menuitem_update': 17,
+    'menus:menus_root': 0,
+    'menus:menusection_create': 15,
+    'menus:menusection_delete': 8,
+    'menus:menusection_detail': 5,
+    'menus:menusection_update': 16,
+    'restaurants:restaurant_create': 12,
+    'restaurants:restaurant_delete': 8,
+    'restaurants:restaurant_detail': 6,
+    'restaurants:restaurant_list': 3,
+    'restaurants:restaurant_update': 14,
+    'search:search': 5,
+    'users:login': 11,
+    'users:logout': 4,
+    'users:password_change': 2,
+    'users:password_reset': 1,
+    'users:register': 5,
+    'users:user_activation': 13,
+    'users:user_delete': 10,
+    'users:user_detail': 4,
+    'users:user_update': 3,
+}
+# raise an error instead of logging a warning when a budget is exceeded
+QUERY_BUDGETS_STRICT = False
+# sent by a scraper as 'Authorization: Bearer <token>' to read the metrics
+# view (staff users always can; None for staff users only)
+METRICS_TOKEN = getattr(server_config, 'METRICS_TOKEN', None)
+
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    QUERY_BUDGETS_STRICT = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'menus_project.instrumentation': {
+            'handlers': ['console'],
+            'level': getattr(
+                server_config, 'INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    LOGGING['loggers']['menus_project.instrumentation']['level'] = 'ERROR'
+
+# async views, see menus_project.async_views
+# serve the read views as async views (set by menus_project.asgi, since
+# async views are slower than sync views when served over WSGI)
+ASYNC_READ_VIEWS = os.environ.get('MENUS_ASYNC_READ_VIEWS') == '1'
+# the threads that run the ORM work of async views in each worker process
+ASYNC_ORM_MAX_THREADS = getattr(server_config, 'ASYNC_ORM_MAX_THREADS', 8)
+
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    ASYNC_READ_VIEWS = True
+
+# request recording, see menus_project.recording
+# a JSON lines file to append every request to, or None to not record
+REQUEST_RECORDING_PATH = getattr(server_config, 'REQUEST_RECORDING_PATH', None)
+# also record JSON and form request bodies (they may hold passwords)
+REQUEST_RECORDING_BODIES = \
+    getattr(server_config, 'REQUEST_RECORDING_BODIES', False)
+
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    REQUEST_RECORDING_PATH = None
+
 # internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -145,12 +356,46 @@ AUTH_PASSWORD_VALIDATORS = [
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# resized copies of uploaded images, see menus_project.images
+IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+# most preferred first; browsers that support none of the others get the
+# last one (formats that Pillow cannot write are skipped)
+IMAGE_VARIANT_FORMATS = ['avif', 'webp', 'jpeg']
+# image jobs (see menus_project.image_jobs): the seconds after which a
+# running job is assumed to have lost its worker, and the attempts of a job
+# that keeps failing
+IMAGE_JOB_TIMEOUT = 600
+IMAGE_JOB_MAX_ATTEMPTS = 3
+
 # static files
 STATIC_URL = server_config.STATIC_URL
 STATICFILES_DIRS = server_config.STATICFILES_DIRS
 STATIC_ROOT = server_config.STATIC_ROOT
+# name the collected static files after the hash of their content (e.g.
+# 'css/base.55e7cbef.css'), from the manifest written by collectstatic
+STATIC_MANIFEST = getattr(server_config, 'STATIC_MANIFEST', not DEBUG)
+if 'test' in sys.argv or 'test_coverage' in sys.argv:
+    # the tests do not run collectstatic
+    STATIC_MANIFEST = False
+if STATIC_MANIFEST:
+    STATICFILES_STORAGE = \
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+# serve the static and media files from Django (when no web server serves
+# them), and let browsers keep the hashed ones for a year (see
+# menus_project.views.serve_static())
+SERVE_FILES = getattr(
+    server_config, 'SERVE_FILES', server_config.SERVER_NAME == 'dev')
+
+# restaurants on each page of the HTML restaurant list
+RESTAURANT_LIST_PAGE_SIZE = 50
+
+# search, see search.backends
+SEARCH_PAGE_SIZE = 20
 
 # rest framework
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+API_MAX_BULK_SIZE = 1000
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
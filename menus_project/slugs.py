@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+
+class UniqueSlugModelMixin:
+    """
+    Turn the IntegrityError raised by a model's unique slug constraint into
+    a ValidationError, so that a duplicate name is reported like any other
+    invalid value without querying for duplicates before every save.
+    """
+    # the field that slugs must be unique within (None for a global slug)
+    slug_scope_field = None
+    duplicate_slug_error_string = None
+
+    def has_duplicate_slug(self):
+        lookup = {'slug': self.slug}
+        if self.slug_scope_field:
+            lookup[self.slug_scope_field] = \
+                getattr(self, self.slug_scope_field)
+        return type(self)._default_manager.filter(**lookup) \
+            .exclude(pk=self.pk).exists()
+
+    def save(self, *args, **kwargs):
+        try:
+            # the savepoint keeps an outer transaction usable after an error
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            if not self.has_duplicate_slug():
+                raise
+            raise ValidationError(self.duplicate_slug_error_string)
+
+
+class SlugValidationErrorMixin:
+    """
+    Show a ValidationError raised while saving a form's object (e.g. a
+    duplicate slug) as a form error instead of a server error.
+    """
+
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except ValidationError as e:
+            # save() has already replaced the slug of the unsaved object
+            if form.instance.pk:
+                form.instance.refresh_from_db(fields=['slug'])
+            form.add_error(None, e)
+            return self.form_invalid(form)
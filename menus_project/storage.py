@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# the directory that uploaded images are stored in
+IMAGE_UPLOAD_DIRECTORY = 'img'
+# the names of the files of ContentAddressedStorage, and of their variants
+# (see images.get_variant_name())
+CONTENT_ADDRESSED_NAME_RE = re.compile(
+    r'(^|/)(?P<prefix>[0-9a-f]{2})/(?P=prefix)[0-9a-f]{62}'
+    r'(-([0-9a-f]{16}-)?\d+w)?\.\w+$')
+
+
+def image_upload_to(instance, filename):
+    # ContentAddressedStorage replaces the file's name with its hash
+    return os.path.join(IMAGE_UPLOAD_DIRECTORY, filename)
+
+
+def is_content_addressed(name):
+    """
+    Return True if a file is named by the hash of its content, or of its
+    image's content, so that its content never changes.
+    """
+    return CONTENT_ADDRESSED_NAME_RE.search(name) is not None
+
+
+def get_content_hash(content):
+    sha256 = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store each file under the SHA-256 hash of its content, in the directory
+    of the name it is saved as (e.g. 'img/photo.JPG' ->
+    'img/3f/3fa8...e1.jpg'), so that the same image uploaded many times is
+    stored once.
+
+    Since a file can be used by several objects, deleting an object must not
+    delete its file while others still use it (see
+    images.ImageVariantsMixin.delete_image()), and files that no object uses
+    any more are deleted by './manage.py cleanup_media'.
+    """
+
+    def get_content_name(self, name, content):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        content_hash = get_content_hash(content)
+        # spread the files over 256 directories
+        return os.path.join(
+            directory, content_hash[:2], content_hash + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            try:
+                # the file is in use again, so cleanup_media must keep it
+                # for at least its --min-age, like a new file
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                # deleted (e.g. by cleanup_media) since exists()
+                pass
+        return super().save(name, content, max_length)
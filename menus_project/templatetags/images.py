@@ -0,0 +1,32 @@
+from django import template
+
+from menus_project.images import VARIANT_FORMATS, get_srcset, \
+    get_variant_formats, get_variant_name
+
+register = template.Library()
+
+
+@register.inclusion_tag('responsive_image.html')
+def responsive_image(obj, css_class, sizes):
+    """
+    Render obj.image with the srcset of its variants in each format, so
+    that browsers download the smallest file that fills the 'sizes' of the
+    image. An image without variants is rendered as it was uploaded.
+    """
+    image = obj.image
+    widths = obj.image_variant_widths
+    variant_hash = obj.image_variant_hash
+    formats = get_variant_formats()
+    context = {'image': image, 'css_class': css_class, 'sizes': sizes}
+    if widths and formats:
+        *preferred_formats, fallback_format = formats
+        context.update({
+            'sources': [
+                {'mime_type': VARIANT_FORMATS[format]['mime_type'],
+                 'srcset': get_srcset(image, widths, format, variant_hash)}
+                for format in preferred_formats],
+            'src': image.storage.url(get_variant_name(
+                image.name, max(widths), fallback_format, variant_hash)),
+            'srcset': get_srcset(
+                image, widths, fallback_format, variant_hash)})
+    return context
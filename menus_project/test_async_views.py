@@ -0,0 +1,173 @@
+import asyncio
+import http.client
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import uvicorn
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework.authtoken.models import Token
+
+from api.views import RestaurantTree
+from menus_project import factories as f
+from menus_project.asgi import application
+
+# the ORM work of async views runs in other threads, which only see
+# committed data, hence TransactionTestCase
+
+SLOW_VIEW_SECONDS = 0.2
+CONCURRENT_REQUESTS = 8
+
+get_object = RestaurantTree.get_object
+
+
+def slow_get_object(self):
+    time.sleep(SLOW_VIEW_SECONDS)
+    return get_object(self)
+
+
+class AsyncReadViewTest(TransactionTestCase):
+
+    def setUp(self):
+        token = Token.objects.create(user=f.UserFactory())
+        self.api_headers = {'AUTHORIZATION': f'Token {token.key}'}
+        self.test_menuitem = f.MenuItemFactory()
+        self.test_menu = self.test_menuitem.menusection.menu
+        self.test_restaurant = self.test_menu.restaurant
+        self.api_url = reverse(
+            'api:restaurant_tree',
+            kwargs={'restaurant_pk': self.test_restaurant.pk})
+        self.test_urls = [
+            self.test_restaurant.get_absolute_url(),
+            self.test_menu.get_absolute_url(),
+            self.api_url,
+            reverse('api:menuitem_detail', kwargs={
+                'restaurant_pk': self.test_restaurant.pk,
+                'menu_pk': self.test_menu.pk,
+                'menusection_pk': self.test_menuitem.menusection.pk,
+                'menuitem_pk': self.test_menuitem.pk})]
+
+    def test_read_views_are_async(self):
+        for url in self.test_urls:
+            self.assertTrue(
+                asyncio.iscoroutinefunction(resolve(url).func), url)
+
+    async def test_asgi_responses_match_wsgi_responses(self):
+        for url in self.test_urls:
+            response = await self.async_client.get(url, **self.api_headers)
+            self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.test_menuitem.name)
+
+        def get_wsgi_response():
+            try:
+                return self.client.get(
+                    self.api_url,
+                    HTTP_AUTHORIZATION=self.api_headers['AUTHORIZATION'])
+            finally:
+                # the test client leaves the connection of its thread open
+                connections.close_all()
+
+        wsgi_response = await asyncio.get_running_loop().run_in_executor(
+            None, get_wsgi_response)
+        response = await self.async_client.get(
+            self.api_url, **self.api_headers)
+        self.assertEqual(response.json(), wsgi_response.json())
+
+    async def test_missing_object_returns_404(self):
+        response = await self.async_client.get(
+            self.test_menu.get_absolute_url().replace(
+                self.test_menu.slug, 'bad-slug'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(DEBUG=True)
+    async def test_queries_in_orm_pool_are_counted(self):
+        response = await self.async_client.get(
+            self.api_url, **self.api_headers)
+        self.assertGreater(int(response['X-Query-Count']), 0)
+
+    @mock.patch.object(RestaurantTree, 'get_object', slow_get_object)
+    async def test_concurrent_readers_do_not_wait_for_each_other(self):
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            self.async_client.get(self.api_url, **self.api_headers)
+            for i in range(CONCURRENT_REQUESTS)])
+        elapsed = time.perf_counter() - start
+
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+        # one after the other, the requests would take 1.6 seconds
+        self.assertLess(
+            elapsed, SLOW_VIEW_SECONDS * CONCURRENT_REQUESTS / 2)
+
+    @override_settings(ASYNC_ORM_MAX_THREADS=1)
+    @mock.patch.object(RestaurantTree, 'get_object', slow_get_object)
+    async def test_orm_pool_is_bounded(self):
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            self.async_client.get(self.api_url, **self.api_headers)
+            for i in range(3)])
+        self.assertGreaterEqual(
+            time.perf_counter() - start, SLOW_VIEW_SECONDS * 3)
+
+
+class UvicornServerTest(TransactionTestCase):
+    """
+    Serve menus_project.asgi with uvicorn, as the uvicorn workers started
+    by gunicorn-start-asgi do.
+    """
+
+    def setUp(self):
+        token = Token.objects.create(user=f.UserFactory())
+        self.headers = {'Authorization': f'Token {token.key}'}
+        self.test_restaurant = f.MenuItemFactory().menusection.menu.restaurant
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(
+            application, lifespan='off', log_level='warning')
+        self.server = uvicorn.Server(config)
+        # signal handlers can only be installed by the main thread
+        self.server.install_signal_handlers = lambda: None
+        thread = threading.Thread(
+            target=self.server.run, kwargs={'sockets': [sock]})
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(setattr, self.server, 'should_exit', True)
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def get(self, path):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            connection.request('GET', path, headers=self.headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    @mock.patch.object(RestaurantTree, 'get_object', slow_get_object)
+    def test_concurrent_readers(self):
+        url = reverse('api:restaurant_tree',
+                      kwargs={'restaurant_pk': self.test_restaurant.pk})
+        start = time.perf_counter()
+        with ThreadPoolExecutor(CONCURRENT_REQUESTS) as executor:
+            responses = list(executor.map(
+                self.get, [url] * CONCURRENT_REQUESTS))
+        elapsed = time.perf_counter() - start
+
+        for status, content in responses:
+            self.assertEqual(status, 200)
+            self.assertIn(self.test_restaurant.name.encode(), content)
+        self.assertLess(
+            elapsed, SLOW_VIEW_SECONDS * CONCURRENT_REQUESTS / 2)
+
+    def test_html_page(self):
+        status, content = self.get(self.test_restaurant.get_absolute_url())
+        self.assertEqual(status, 200)
+        self.assertIn(self.test_restaurant.name.encode(), content)
@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+
+from menus_project import benchmarks
+
+
+class BenchmarksTest(SimpleTestCase):
+
+    def get_summary(self, p50_ms=5, p95_ms=10, queries=3):
+        return {'p50_ms': p50_ms, 'p95_ms': p95_ms, 'p99_ms': 20,
+                'queries': queries}
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmarks.percentile(values, 50), 50)
+        self.assertEqual(benchmarks.percentile(values, 99), 99)
+        self.assertEqual(benchmarks.percentile([7], 95), 7)
+
+    def test_summarize(self):
+        summary = benchmarks.summarize([4, 1, 3, 2], [5, 6, 5, 5])
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['mean_ms'], 2.5)
+        self.assertEqual(summary['p50_ms'], 2)
+        self.assertEqual(summary['p99_ms'], 4)
+        self.assertEqual(summary['queries'], 6)
+
+    def test_compare_to_baseline(self):
+        baseline = {'same': self.get_summary(),
+                    'slower': self.get_summary(),
+                    'more_queries': self.get_summary()}
+        results = {'same': self.get_summary(p50_ms=6, p95_ms=20),
+                   'slower': self.get_summary(p50_ms=7),
+                   'more_queries': self.get_summary(queries=4),
+                   'new': self.get_summary()}
+
+        comparison = {
+            name: (message, is_regression, is_slower)
+            for name, message, is_regression, is_slower
+            in benchmarks.compare_to_baseline(results, baseline, 0.25)}
+        self.assertEqual(comparison['same'][1:], (False, False))
+        self.assertIn('p50_ms 6.000 (+20%)', comparison['same'][0])
+        self.assertIn('p95_ms 20.000 (+100%)', comparison['same'][0])
+        # a slower path is not a regression
+        self.assertEqual(comparison['slower'][1:], (False, True))
+        self.assertEqual(comparison['more_queries'][1:], (True, False))
+        self.assertIn('queries 4 (+1)', comparison['more_queries'][0])
+        self.assertEqual(
+            comparison['new'], ("not in baseline", False, False))
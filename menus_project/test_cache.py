@@ -0,0 +1,260 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.template.response import SimpleTemplateResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.views import View
+
+from menus_project import cache
+from menus_project import constants as c
+from menus_project import factories as f
+from restaurants.models import Restaurant
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'menus': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+              'LOCATION': 'test-menus'},
+}
+
+
+class RestaurantPageVersionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitem = f.MenuItemFactory()
+        cls.test_menusection = cls.test_menuitem.menusection
+        cls.test_menu = cls.test_menusection.menu
+        cls.test_restaurant = cls.test_menu.restaurant
+
+    def setUp(self):
+        self.version = self.get_version()
+
+    def get_version(self):
+        return cache.get_restaurant_page_version(
+            Restaurant.objects.get(pk=self.test_restaurant.pk))
+
+    def test_version_is_stable_without_changes(self):
+        self.assertEqual(self.get_version(), self.version)
+
+    def test_restaurant_save_changes_version(self):
+        self.test_restaurant.save()
+        self.assertGreater(self.get_version(), self.version)
+
+    def test_menu_save_and_delete_change_version(self):
+        self.test_menu.save()
+        self.assertGreater(self.get_version(), self.version)
+        self.version = self.get_version()
+
+        self.test_menu.delete()
+        self.assertGreater(self.get_version(), self.version)
+
+    def test_menusection_save_and_delete_change_version(self):
+        self.test_menusection.save()
+        self.assertGreater(self.get_version(), self.version)
+        self.version = self.get_version()
+
+        self.test_menusection.delete()
+        self.assertGreater(self.get_version(), self.version)
+
+    def test_menuitem_save_and_delete_change_version(self):
+        self.test_menuitem.save()
+        self.assertGreater(self.get_version(), self.version)
+        self.version = self.get_version()
+
+        self.test_menuitem.delete()
+        self.assertGreater(self.get_version(), self.version)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RenderedPageCacheMixinTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menuitem = f.MenuItemFactory(
+            admin_users=[cls.restaurant_admin_user])
+        cls.test_menusection = cls.test_menuitem.menusection
+        cls.test_menu = cls.test_menusection.menu
+        cls.test_restaurant = cls.test_menu.restaurant
+
+        cls.test_urls = [
+            cls.test_restaurant.get_absolute_url(),
+            cls.test_menu.get_absolute_url(),
+            cls.test_menusection.get_absolute_url()]
+
+    def setUp(self):
+        cache.get_cache().clear()
+
+    def test_second_request_is_served_from_cache(self):
+        for url in self.test_urls:
+            first_response = self.client.get(url)
+
+            # only the restaurant's updated_at is fetched
+            with self.assertNumQueries(1):
+                second_response = self.client.get(url)
+            self.assertEqual(second_response.status_code, 200)
+            self.assertEqual(first_response.content, second_response.content)
+
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(),
+            {'hits': len(self.test_urls), 'misses': len(self.test_urls)})
+
+    def test_changes_are_served_after_save(self):
+        self.client.get(self.test_menu.get_absolute_url())
+
+        self.test_menuitem.name = 'Updated Menu Item'
+        self.test_menuitem.save()
+
+        response = self.client.get(self.test_menu.get_absolute_url())
+        self.assertIn('Updated Menu Item', response.content.decode('utf-8'))
+        self.assertEqual(cache.get_rendered_page_cache_stats()['hits'], 0)
+
+    def test_changes_are_served_after_delete(self):
+        self.client.get(self.test_menusection.get_absolute_url())
+
+        self.test_menuitem.delete()
+
+        response = self.client.get(self.test_menusection.get_absolute_url())
+        self.assertNotIn(
+            self.test_menuitem.name, response.content.decode('utf-8'))
+
+    def test_authenticated_user_is_not_served_from_cache(self):
+        self.client.get(self.test_menu.get_absolute_url())
+        self.client.login(
+            username=self.restaurant_admin_user.username,
+            password=c.TEST_USER_PASSWORD)
+
+        response = self.client.get(self.test_menu.get_absolute_url())
+        self.assertIn('auth-links', response.content.decode('utf-8'))
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 0, 'misses': 1})
+
+    def test_changes_made_by_another_process_are_served(self):
+        self.client.get(self.test_menu.get_absolute_url())
+
+        # e.g. another worker, which has its own process-local cache
+        other_caches = dict(LOCMEM_CACHES, menus={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-menus-other-process'})
+        with override_settings(CACHES=other_caches):
+            self.test_menuitem.name = 'Updated Menu Item'
+            self.test_menuitem.save()
+
+        response = self.client.get(self.test_menu.get_absolute_url())
+        self.assertIn('Updated Menu Item', response.content.decode('utf-8'))
+        self.assertEqual(cache.get_rendered_page_cache_stats()['hits'], 0)
+
+    def test_pages_are_not_served_after_a_deploy(self):
+        url = self.test_menu.get_absolute_url()
+        self.client.get(url)
+        with override_settings(RENDERED_PAGE_VERSION='2'):
+            self.client.get(url)
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 0, 'misses': 2})
+
+    def test_whitelisted_query_is_served_from_cache(self):
+        url = self.test_restaurant.get_absolute_url() + '?view_as_customer=1'
+        first_response = self.client.get(url)
+        second_response = self.client.get(url)
+        self.assertEqual(first_response.content, second_response.content)
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 1, 'misses': 1})
+
+        # and is cached separately from the page without the query
+        self.client.get(self.test_restaurant.get_absolute_url())
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 1, 'misses': 2})
+
+    def test_other_queries_are_not_cached(self):
+        url = self.test_menu.get_absolute_url()
+        for query in ['?next=/', '?view_as_customer=1', '?page=2&page=3']:
+            for i in range(2):
+                self.assertEqual(
+                    self.client.get(url + query).status_code, 200)
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 0, 'misses': 0})
+
+    def test_missing_page_is_not_cached(self):
+        url = reverse('menus:menu_detail', kwargs={
+            'restaurant_slug': self.test_restaurant.slug,
+            'menu_slug': 'bad-slug'})
+        for i in range(2):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(cache.get_rendered_page_cache_stats()['hits'], 0)
+
+
+class FileBasedRenderedPageCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitem = f.MenuItemFactory()
+        cls.test_url = cls.test_menuitem.menusection.menu.get_absolute_url()
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        settings_override = override_settings(CACHES={
+            'default': LOCMEM_CACHES['default'],
+            'menus': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.cache_dir}})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_pages_are_cached_and_invalidated(self):
+        self.client.get(self.test_url)
+        with self.assertNumQueries(1):
+            self.client.get(self.test_url)
+
+        self.test_menuitem.name = 'Updated Menu Item'
+        self.test_menuitem.save()
+
+        response = self.client.get(self.test_url)
+        self.assertIn('Updated Menu Item', response.content.decode('utf-8'))
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 1, 'misses': 2})
+
+
+class PageView(View):
+
+    def get(self, request, *args, **kwargs):
+        response = SimpleTemplateResponse(
+            engines['django'].from_string('Page'))
+        response['Content-Language'] = 'fr'
+        return response
+
+
+class CachedPageView(cache.RenderedPageCacheMixin, PageView):
+    pass
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedResponseHeadersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_restaurant = f.RestaurantFactory()
+
+    def setUp(self):
+        cache.get_cache().clear()
+
+    def get_response(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        return CachedPageView.as_view()(
+            request, restaurant_slug=self.test_restaurant.slug)
+
+    def test_headers_are_served_from_cache(self):
+        first_response = self.get_response()
+        second_response = self.get_response()
+        self.assertEqual(
+            cache.get_rendered_page_cache_stats(), {'hits': 1, 'misses': 1})
+        self.assertEqual(second_response.content, b'Page')
+        self.assertEqual(second_response['Content-Language'], 'fr')
+        self.assertEqual(
+            second_response['Content-Type'], first_response['Content-Type'])
@@ -0,0 +1,130 @@
+from django.test import TestCase, override_settings
+
+from menus_project import constants as c
+from menus_project import factories as f
+from restaurants.models import Restaurant
+
+
+class RestaurantUpdatedAtTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitem = f.MenuItemFactory()
+        cls.test_menusection = cls.test_menuitem.menusection
+        cls.test_menu = cls.test_menusection.menu
+        cls.test_restaurant = cls.test_menu.restaurant
+
+    def setUp(self):
+        self.updated_at = self.get_updated_at()
+
+    def get_updated_at(self):
+        return Restaurant.objects.get(pk=self.test_restaurant.pk).updated_at
+
+    def test_menu_save_and_delete_update_restaurant(self):
+        self.test_menu.save()
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+        self.updated_at = self.get_updated_at()
+
+        self.test_menu.delete()
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+
+    def test_menusection_save_and_delete_update_restaurant(self):
+        self.test_menusection.save()
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+        self.updated_at = self.get_updated_at()
+
+        self.test_menusection.delete()
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+
+    def test_menuitem_save_and_delete_update_restaurant(self):
+        self.test_menuitem.save()
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+        self.updated_at = self.get_updated_at()
+
+        self.test_menuitem.delete()
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+
+    def test_admin_users_change_updates_restaurant(self):
+        test_user = f.UserFactory()
+        self.test_restaurant.admin_users.add(test_user)
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+        self.updated_at = self.get_updated_at()
+
+        test_user.restaurant_set.remove(self.test_restaurant)
+        self.assertGreater(self.get_updated_at(), self.updated_at)
+
+
+class RestaurantPageConditionalGetMixinTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menuitem = \
+            f.MenuItemFactory(admin_users=[cls.restaurant_admin_user])
+        cls.test_menusection = cls.test_menuitem.menusection
+        cls.test_menu = cls.test_menusection.menu
+        cls.test_restaurant = cls.test_menu.restaurant
+
+        cls.test_urls = [
+            cls.test_restaurant.get_absolute_url(),
+            cls.test_menu.get_absolute_url(),
+            cls.test_menusection.get_absolute_url()]
+
+    def test_response_has_validators(self):
+        for url in self.test_urls:
+            response = self.client.get(url)
+            self.assertTrue(response.has_header('ETag'))
+            self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_if_none_match_returns_304_without_loading_tree(self):
+        for url in self.test_urls:
+            etag = self.client.get(url)['ETag']
+
+            # only the restaurant's updated_at is fetched
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_is_ignored(self):
+        # a change in the same second would not be seen
+        for url in self.test_urls:
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+            self.assertEqual(response.status_code, 200)
+
+    def test_deploy_invalidates_etag(self):
+        url = self.test_menu.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        with override_settings(RENDERED_PAGE_VERSION='2'):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_invalidate_etag(self):
+        url = self.test_menu.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+
+        self.test_menuitem.name = 'Updated Menu Item'
+        self.test_menuitem.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Updated Menu Item', response.content.decode('utf-8'))
+
+    def test_authenticated_user_is_not_sent_validators(self):
+        url = self.test_menu.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        self.client.login(
+            username=self.restaurant_admin_user.username,
+            password=c.TEST_USER_PASSWORD)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_missing_restaurant_returns_404(self):
+        response = self.client.get(
+            self.test_menu.get_absolute_url().replace(
+                self.test_restaurant.slug, 'bad-slug'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,271 @@
+import sqlite3
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from psycopg2 import extensions
+
+from menus.models import Menu, MenuItem, MenuSection
+from menus_project.db_backends.postgresql.base import (
+    ConnectionPool, Database, DatabaseWrapper)
+from restaurants.models import Restaurant
+
+# the 'sqlite_tuned' and 'sqlite_untuned' test databases are files (see
+# settings.DATABASES), and their connections are opened by several threads,
+# hence TransactionTestCase
+
+# how long the slow reader holds its read transaction open
+SLOW_READ_SECONDS = 0.5
+# how long a menu edit holds its write transaction open
+EDIT_SECONDS = 0.3
+STRESS_SECONDS = 1.5
+STRESS_READERS = 4
+STRESS_WRITERS = 2
+
+
+def create_menuitems(alias, count):
+    restaurant = Restaurant.objects.using(alias).create(
+        name='Test Restaurant', slug='test-restaurant')
+    menu = Menu.objects.using(alias).create(
+        restaurant=restaurant, name='Test Menu', slug='test-menu')
+    menusection = MenuSection.objects.using(alias).create(
+        menu=menu, name='Test Menu Section', slug='test-menu-section')
+    return MenuItem.objects.using(alias).bulk_create([
+        MenuItem(menusection=menusection, name=f'Test Menu Item {i}',
+                 slug=f'test-menu-item-{i}', price=1000)
+        for i in range(count)])
+
+
+def read_menu(alias):
+    """Read a menu's items, as the menu detail view does."""
+    return list(MenuItem.objects.using(alias).filter(
+        menusection__menu__slug='test-menu').values_list('name', 'price'))
+
+
+def edit_menu(alias, delay=0):
+    with transaction.atomic(using=alias):
+        items = MenuItem.objects.using(alias).filter(
+            menusection__menu__slug='test-menu')
+        items.update(price=items[0].price + 25)
+        time.sleep(delay)
+        items.update(description='Edited')
+
+
+def run_in_thread(func, *args):
+    """Start func in a thread with its own connections, and return the
+    thread and a dict that will hold its result or error and duration."""
+    result = {}
+
+    def run():
+        start = time.perf_counter()
+        try:
+            result['value'] = func(*args)
+        except Exception as e:
+            result['error'] = e
+        finally:
+            result['duration'] = time.perf_counter() - start
+            connections.close_all()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+class SqliteTunedBackendTest(TransactionTestCase):
+    databases = {'default', 'sqlite_tuned', 'sqlite_untuned'}
+
+    def get_pragma(self, alias, name):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_to_every_connection(self):
+        pragmas = connections['sqlite_tuned'].settings_dict[
+            'OPTIONS']['pragmas']
+        for alias in ['sqlite_tuned', 'sqlite_untuned']:
+            connections[alias].close()
+        self.assertEqual(self.get_pragma('sqlite_tuned', 'journal_mode'),
+                         'wal')
+        self.assertEqual(self.get_pragma('sqlite_tuned', 'synchronous'), 1)
+        for name in ['busy_timeout', 'mmap_size', 'cache_size']:
+            self.assertEqual(
+                self.get_pragma('sqlite_tuned', name), pragmas[name])
+        self.assertEqual(self.get_pragma('sqlite_untuned', 'journal_mode'),
+                         'delete')
+
+    def test_atomic_takes_the_write_lock_when_it_starts(self):
+        path = connections['sqlite_tuned'].settings_dict['NAME']
+        other_connection = sqlite3.connect(path, timeout=0)
+        self.addCleanup(other_connection.close)
+        with transaction.atomic(using='sqlite_tuned'):
+            with self.assertRaisesMessage(sqlite3.OperationalError,
+                                          'database is locked'):
+                other_connection.execute('BEGIN IMMEDIATE')
+
+    def get_read_duration_during_edit(self, alias):
+        """
+        Return how long a read of a menu waits when it starts while the
+        menu is saved, and a slow read of the menu (e.g. an export) is still
+        in progress.
+        """
+        create_menuitems(alias, 10)
+
+        def slow_read():
+            with transaction.atomic(using=alias):
+                read_menu(alias)
+                time.sleep(SLOW_READ_SECONDS)
+
+        slow_reader, slow_result = run_in_thread(slow_read)
+        time.sleep(SLOW_READ_SECONDS / 5)
+        writer, writer_result = run_in_thread(edit_menu, alias)
+        time.sleep(SLOW_READ_SECONDS / 5)
+        reader, reader_result = run_in_thread(read_menu, alias)
+        for thread in [slow_reader, writer, reader]:
+            thread.join()
+
+        for result in [slow_result, writer_result, reader_result]:
+            self.assertNotIn('error', result)
+        self.assertEqual(len(reader_result['value']), 10)
+        return reader_result['duration']
+
+    def test_readers_are_blocked_during_menu_edits_without_tuning(self):
+        # the edit waits for the slow reader to finish before committing,
+        # and new readers wait for the edit
+        self.assertGreater(
+            self.get_read_duration_during_edit('sqlite_untuned'),
+            SLOW_READ_SECONDS / 2)
+
+    def test_readers_are_not_blocked_during_menu_edits(self):
+        self.assertLess(
+            self.get_read_duration_during_edit('sqlite_tuned'),
+            SLOW_READ_SECONDS / 5)
+
+    def test_concurrent_readers_and_writers(self):
+        create_menuitems('sqlite_tuned', 100)
+        read_durations = []
+        edit_count = []
+        stop = time.perf_counter() + STRESS_SECONDS
+
+        def read_until_stop():
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                read_menu('sqlite_tuned')
+                read_durations.append(time.perf_counter() - start)
+
+        def edit_until_stop():
+            while time.perf_counter() < stop:
+                edit_menu('sqlite_tuned', delay=EDIT_SECONDS)
+                edit_count.append(1)
+
+        threads = \
+            [run_in_thread(read_until_stop) for i in range(STRESS_READERS)] \
+            + [run_in_thread(edit_until_stop) for i in range(STRESS_WRITERS)]
+        for thread, result in threads:
+            thread.join()
+
+        for thread, result in threads:
+            self.assertNotIn('error', result)
+        self.assertGreater(len(edit_count), STRESS_WRITERS)
+        # a read never waits for an edit to be committed
+        self.assertLess(max(read_durations), EDIT_SECONDS)
+        price = MenuItem.objects.using('sqlite_tuned').first().price
+        self.assertEqual(price, 1000 + 25 * len(edit_count))
+
+
+def get_mock_connection():
+    return mock.Mock(
+        closed=0, info=mock.Mock(
+            transaction_status=extensions.TRANSACTION_STATUS_IDLE))
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2, timeout=0.1)
+
+    def test_returned_connections_are_reused(self):
+        connection = self.pool.getconn(get_mock_connection)
+        self.pool.putconn(connection)
+        self.assertIs(self.pool.getconn(get_mock_connection), connection)
+
+    def test_waits_for_a_connection_when_all_are_in_use(self):
+        in_use = [self.pool.getconn(get_mock_connection) for i in range(2)]
+        with self.assertRaisesMessage(Database.OperationalError,
+                                      'All 2 connections of the pool'):
+            self.pool.getconn(get_mock_connection)
+
+        threading.Timer(0.05, self.pool.putconn, [in_use[0]]).start()
+        self.assertIs(self.pool.getconn(get_mock_connection), in_use[0])
+
+    def test_open_transaction_is_rolled_back(self):
+        connection = self.pool.getconn(get_mock_connection)
+        connection.info.transaction_status = \
+            extensions.TRANSACTION_STATUS_INERROR
+        self.pool.putconn(connection)
+        connection.rollback.assert_called_once()
+        self.assertIs(self.pool.getconn(get_mock_connection), connection)
+
+    def test_broken_connections_are_not_reused(self):
+        connection = self.pool.getconn(get_mock_connection)
+        connection.info.transaction_status = \
+            extensions.TRANSACTION_STATUS_UNKNOWN
+        self.pool.putconn(connection)
+        connection.close.assert_called_once()
+
+        closed_connection = self.pool.getconn(get_mock_connection)
+        closed_connection.closed = 1
+        self.pool.putconn(closed_connection)
+        self.assertIsNot(
+            self.pool.getconn(get_mock_connection), closed_connection)
+        # both slots are free again
+        self.pool.getconn(get_mock_connection)
+
+    def test_failed_connect_frees_its_slot(self):
+        for i in range(3):
+            with self.assertRaises(Database.OperationalError):
+                self.pool.getconn(mock.Mock(
+                    side_effect=Database.OperationalError))
+
+
+@skipUnless(connection.vendor == 'postgresql', "PostgreSQL connection pool")
+class PostgresqlPoolTest(TransactionTestCase):
+
+    def get_wrapper(self):
+        settings_dict = {
+            **connection.settings_dict,
+            'OPTIONS': {'pool': {'max_size': 2, 'timeout': 1}}}
+        wrapper = DatabaseWrapper(settings_dict, alias='pool_test')
+        # the test database cannot be dropped while a connection is open
+        self.addCleanup(wrapper.get_pool().close_idle_connections)
+        return wrapper
+
+    def test_closed_connection_is_reused(self):
+        wrapper = self.get_wrapper()
+        wrapper.ensure_connection()
+        backend_pid = wrapper.connection.get_backend_pid()
+        wrapper.close()
+
+        wrapper = self.get_wrapper()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            self.assertEqual(cursor.fetchone()[0], backend_pid)
+        wrapper.close()
+
+    def test_iterator_uses_a_server_side_cursor(self):
+        Restaurant.objects.create(name='Test Restaurant')
+        chunked_cursor = connection.chunked_cursor
+        cursors = []
+
+        def record_chunked_cursor():
+            cursors.append(chunked_cursor())
+            return cursors[-1]
+
+        with mock.patch.object(
+                connection, 'chunked_cursor', record_chunked_cursor):
+            slugs = list(Restaurant.objects.values_list('slug', flat=True)
+                         .iterator(chunk_size=1))
+        self.assertEqual(slugs, ['test-restaurant'])
+        # psycopg2 cursors with a name are server-side cursors
+        self.assertTrue(cursors[0].cursor.name)
@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.http import Http404
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from menus_project import factories as f
+from menus_project import views
+from menus_project.test_images import ImageVariantsTestMixin, get_image_file
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class ServeMediaTest(ImageVariantsTestMixin, TestCase):
+
+    def get(self, name):
+        request = RequestFactory().get(default_storage.url(name))
+        return views.serve_media(request, name)
+
+    def test_content_addressed_image_is_immutable(self):
+        menu = f.MenuFactory(image=get_image_file('photo.jpg'))
+        response = self.get(menu.image.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+
+    def test_other_file_is_revalidated(self):
+        name = default_storage.save(
+            'img/restaurants/1.jpg', ContentFile(b'image'))
+        self.assertEqual(self.get(name)['Cache-Control'], 'no-cache')
+
+    def test_missing_file(self):
+        with self.assertRaises(Http404):
+            self.get('img/restaurants/missing.jpg')
+
+
+class ServeStaticTest(TestCase):
+
+    def get(self, path):
+        request = RequestFactory().get(f'/static/{path}')
+        return views.serve_static(request, path)
+
+    def test_files_are_revalidated_without_a_manifest(self):
+        response = self.get('css/base.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_hashed_files_are_immutable(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        settings_override = override_settings(
+            STATIC_ROOT=static_root, STATICFILES_STORAGE='django.contrib.'
+            'staticfiles.storage.ManifestStaticFilesStorage')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        url = Template("{% load static %}{% static 'css/base.css' %}") \
+            .render(Context())
+        self.assertRegex(url, r'^/static/css/base\.[0-9a-f]{12}\.css$')
+        hashed_path = url[len('/static/'):]
+        self.assertEqual(
+            hashed_path, staticfiles_storage.stored_name('css/base.css'))
+        self.assertEqual(self.get(hashed_path)['Cache-Control'], IMMUTABLE)
+        self.assertEqual(
+            self.get('css/base.css')['Cache-Control'], 'no-cache')
@@ -0,0 +1,74 @@
+import importlib
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from menus_project import gunicorn_conf
+
+
+class GunicornConfTest(SimpleTestCase):
+
+    def load(self, **environ):
+        with mock.patch.dict(os.environ, environ):
+            return importlib.reload(gunicorn_conf)
+
+    def tearDown(self):
+        importlib.reload(gunicorn_conf)
+
+    def test_sync_workers(self):
+        conf = self.load(GUNICORN_WORKER_MODEL='sync')
+        self.assertEqual(conf.wsgi_app, 'menus_project.wsgi:application')
+        self.assertEqual(conf.worker_class, 'sync')
+        self.assertEqual(conf.workers, conf.get_cpu_count() * 2 + 1)
+        self.assertTrue(conf.preload_app)
+        self.assertEqual(conf.max_requests, 1000)
+
+    def test_threaded_workers(self):
+        conf = self.load(
+            GUNICORN_WORKER_MODEL='threaded', GUNICORN_THREADS='8')
+        self.assertEqual(conf.worker_class, 'gthread')
+        self.assertEqual(conf.threads, 8)
+        self.assertEqual(conf.workers, conf.get_cpu_count() + 1)
+
+    def test_asgi_workers(self):
+        conf = self.load(GUNICORN_WORKER_MODEL='asgi')
+        self.assertEqual(conf.wsgi_app, 'menus_project.asgi:application')
+        self.assertEqual(
+            conf.worker_class, 'uvicorn.workers.UvicornH11Worker')
+
+    def test_environment_overrides(self):
+        conf = self.load(
+            GUNICORN_WORKERS='3', GUNICORN_BIND='127.0.0.1:9000',
+            GUNICORN_PRELOAD='0', GUNICORN_MAX_REQUESTS='0')
+        self.assertEqual(conf.workers, 3)
+        self.assertEqual(conf.bind, '127.0.0.1:9000')
+        self.assertFalse(conf.preload_app)
+        self.assertEqual(conf.max_requests, 0)
+
+    def test_invalid_worker_model(self):
+        with self.assertRaisesMessage(ValueError, 'GUNICORN_WORKER_MODEL'):
+            self.load(GUNICORN_WORKER_MODEL='eventlet')
+
+    def test_process_local_page_cache_warning(self):
+        server = mock.Mock()
+        conf = self.load(GUNICORN_WORKERS='3')
+        with mock.patch.object(conf, 'server_config', None):
+            conf.on_starting(server)
+        server.log.warning.assert_called_once()
+        self.assertIn(
+            'MENUS_CACHE_BACKEND', server.log.warning.call_args[0][0])
+
+    def test_no_page_cache_warning(self):
+        server = mock.Mock()
+        shared_cache_config = mock.Mock(
+            MENUS_CACHE_BACKEND='django.core.cache.backends.filebased.'
+                                'FileBasedCache')
+        conf = self.load(GUNICORN_WORKERS='3')
+        with mock.patch.object(conf, 'server_config', shared_cache_config):
+            conf.on_starting(server)
+
+        conf = self.load(GUNICORN_WORKERS='1')
+        with mock.patch.object(conf, 'server_config', None):
+            conf.on_starting(server)
+        server.log.warning.assert_not_called()
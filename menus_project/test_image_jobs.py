@@ -0,0 +1,178 @@
+import datetime
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from menus.models import ImageJob
+from menus_project import cache, image_jobs
+from menus_project import factories as f
+from menus_project.images import get_variant_name
+from menus_project.test_cache import LOCMEM_CACHES
+from menus_project.test_images import ImageVariantsTestMixin, get_image_file
+from restaurants.models import Restaurant
+
+
+class ImageJobQueueTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_menu = f.MenuFactory(image=get_image_file('photo.jpg'))
+        self.test_job = ImageJob.objects.get()
+
+    def test_new_upload_is_queued(self):
+        self.assertEqual(self.test_job.obj, self.test_menu)
+        self.assertEqual(self.test_job.image_name, self.test_menu.image.name)
+        self.assertEqual(self.test_job.status, ImageJob.PENDING)
+        # the upload is saved as it is
+        self.assertTrue(self.test_menu.image.storage.exists(
+            self.test_menu.image.name))
+
+        # saving the object without a new upload queues nothing
+        self.test_menu.save()
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+    def test_job_generates_variants(self):
+        self.assertEqual(image_jobs.process_image_jobs(), 1)
+        self.test_job.refresh_from_db()
+        self.assertEqual(self.test_job.status, ImageJob.DONE)
+        self.assertEqual(self.test_job.attempts, 1)
+        self.assertIsNotNone(self.test_job.finished_at)
+        self.test_menu.refresh_from_db()
+        self.assertEqual(
+            self.test_menu.image_variant_widths, [320, 640, 1280])
+        self.assertEqual(image_jobs.process_image_jobs(), 0)
+
+    def test_job_marks_the_restaurant_pages_as_changed(self):
+        restaurant = self.test_menu.restaurant
+        updated_at = Restaurant.objects.get(pk=restaurant.pk).updated_at
+        image_jobs.process_image_jobs()
+        self.assertGreater(
+            Restaurant.objects.get(pk=restaurant.pk).updated_at, updated_at)
+
+    def test_job_invalidates_the_pages_cached_by_another_process(self):
+        restaurant = f.RestaurantFactory(image=get_image_file('photo.jpg'))
+        url = restaurant.get_absolute_url()
+        with override_settings(CACHES=LOCMEM_CACHES):
+            cache.get_cache().clear()
+            self.assertNotContains(self.client.get(url), 'srcset=')
+
+        # the worker does not share the web server's process-local cache
+        worker_caches = dict(LOCMEM_CACHES, menus={
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-menus-image-worker'})
+        with override_settings(CACHES=worker_caches):
+            image_jobs.process_image_jobs()
+
+        with override_settings(CACHES=LOCMEM_CACHES):
+            self.assertContains(self.client.get(url), 'srcset=')
+            self.assertEqual(
+                cache.get_rendered_page_cache_stats(),
+                {'hits': 0, 'misses': 2})
+
+    def test_claimed_job_is_not_claimed_again(self):
+        self.assertEqual(image_jobs.claim_image_job(), self.test_job)
+        self.assertIsNone(image_jobs.claim_image_job())
+
+    def test_jobs_are_claimed_oldest_first(self):
+        menusection = f.MenuSectionFactory(image=get_image_file('photo.jpg'))
+        self.assertEqual(image_jobs.claim_image_job().obj, self.test_menu)
+        self.assertEqual(image_jobs.claim_image_job().obj, menusection)
+
+    @override_settings(IMAGE_JOB_TIMEOUT=60, IMAGE_JOB_MAX_ATTEMPTS=2)
+    def test_abandoned_job_is_claimed_again(self):
+        image_jobs.claim_image_job()
+        # the worker stopped while running the job
+        ImageJob.objects.update(
+            started_at=timezone.now() - datetime.timedelta(seconds=61))
+        job = image_jobs.claim_image_job()
+        self.assertEqual(job, self.test_job)
+        self.assertEqual(job.attempts, 2)
+
+        ImageJob.objects.update(
+            started_at=timezone.now() - datetime.timedelta(seconds=61))
+        self.assertIsNone(image_jobs.claim_image_job())
+        self.test_job.refresh_from_db()
+        self.assertEqual(self.test_job.status, ImageJob.FAILED)
+
+    @override_settings(IMAGE_JOB_MAX_ATTEMPTS=2)
+    def test_failed_job_is_retried(self):
+        with mock.patch('menus_project.image_jobs.generate_image_variants',
+                        side_effect=OSError("Disk full")), \
+                self.assertLogs('menus_project.image_jobs', 'ERROR'):
+            self.assertEqual(image_jobs.process_image_jobs(), 2)
+        self.test_job.refresh_from_db()
+        self.assertEqual(self.test_job.status, ImageJob.FAILED)
+        self.assertEqual(self.test_job.attempts, 2)
+        self.assertIn("Disk full", self.test_job.error)
+
+    def test_unreadable_image_fails(self):
+        self.test_menu.image.save('broken.jpg', ContentFile(b'not an image'))
+        ImageJob.objects.update(image_name=self.test_menu.image.name)
+        with self.assertLogs('menus_project.images', 'ERROR'):
+            image_jobs.process_image_jobs()
+        self.test_job.refresh_from_db()
+        self.assertEqual(self.test_job.status, ImageJob.FAILED)
+        self.assertEqual(self.test_job.error, "The image cannot be read.")
+
+    def test_replaced_image_is_skipped(self):
+        self.test_menu.image = get_image_file('other.jpg', color='blue')
+        self.test_menu.save()
+        image_jobs.process_image_jobs()
+        self.test_job.refresh_from_db()
+        self.assertEqual(self.test_job.status, ImageJob.SKIPPED)
+        self.assertFalse(self.test_menu.image.storage.exists(
+            get_variant_name(self.test_job.image_name, 320, 'webp')))
+
+        # the new image is processed by its own job
+        self.test_menu.refresh_from_db()
+        self.assertEqual(
+            self.test_menu.image_variant_widths, [320, 640, 1280])
+
+    def test_deleted_object_is_skipped(self):
+        self.test_menu.delete()
+        image_jobs.process_image_jobs()
+        self.test_job.refresh_from_db()
+        self.assertEqual(self.test_job.status, ImageJob.SKIPPED)
+
+    def test_image_that_browsers_cannot_display_is_transcoded(self):
+        restaurant = f.RestaurantFactory(
+            image=get_image_file('scan.bmp', format='BMP'))
+        old_name = restaurant.image.name
+        self.process_image_jobs(restaurant)
+        self.assertTrue(restaurant.image.name.endswith('.jpg'))
+        self.assertFalse(restaurant.image.storage.exists(old_name))
+        with restaurant.image.open('rb'), \
+                Image.open(restaurant.image) as image:
+            self.assertEqual(image.format, 'JPEG')
+        self.assertEqual(restaurant.image_variant_widths, [320, 640, 1280])
+
+
+class ImageJobMetricsTest(ImageVariantsTestMixin, TestCase):
+
+    def test_stats(self):
+        for i in range(3):
+            f.MenuFactory(image=get_image_file('photo.jpg'))
+        ImageJob.objects.update(
+            created_at=timezone.now() - datetime.timedelta(seconds=30))
+        image_jobs.process_image_jobs(max_jobs=2)
+
+        stats = image_jobs.get_image_job_stats()
+        self.assertEqual(stats['jobs'], {
+            'pending': 1, 'running': 0, 'done': 2, 'skipped': 0,
+            'failed': 0})
+        self.assertGreaterEqual(stats['oldest_pending_age_seconds'], 30)
+        self.assertGreater(stats['processing_seconds_total'], 0)
+        self.assertEqual(stats['finished_per_minute'], 2 / 5)
+
+    def test_metrics_view(self):
+        f.MenuFactory(image=get_image_file('photo.jpg'))
+        self.client.force_login(f.UserFactory(is_staff=True))
+        response = self.client.get(reverse('metrics'))
+        content = response.content.decode('utf-8')
+        self.assertIn('# TYPE menus_image_jobs gauge', content)
+        self.assertIn('menus_image_jobs{status="pending"} 1', content)
+        self.assertIn('menus_image_jobs_finished_per_minute 0.0', content)
@@ -0,0 +1,185 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from menus_project import factories as f
+from menus_project import image_jobs, images
+
+
+def get_image_file(name, size=(2000, 1000), mode='RGB', color='red',
+                   format='JPEG', **save_options):
+    data = io.BytesIO()
+    Image.new(mode, size, color).save(data, format, **save_options)
+    return SimpleUploadedFile(name, data.getvalue())
+
+
+class ImageVariantsTestMixin:
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, IMAGE_VARIANT_WIDTHS=[320, 640, 1280],
+            IMAGE_VARIANT_FORMATS=['webp', 'jpeg'])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        images.get_variant_formats.cache_clear()
+        self.addCleanup(images.get_variant_formats.cache_clear)
+
+    def process_image_jobs(self, obj):
+        image_jobs.process_image_jobs()
+        obj.refresh_from_db()
+        return obj
+
+    def open_variant(self, obj, width, format):
+        return Image.open(obj.image.storage.path(images.get_variant_name(
+            obj.image.name, width, format, obj.image_variant_hash)))
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320, 640, 1280])
+class GetVariantWidthsTest(TestCase):
+
+    def test_large_image(self):
+        self.assertEqual(images.get_variant_widths(4000), [320, 640, 1280])
+
+    def test_small_image_is_not_enlarged(self):
+        self.assertEqual(images.get_variant_widths(500), [320, 500])
+        self.assertEqual(images.get_variant_widths(200), [200])
+
+
+class ImageVariantsTest(ImageVariantsTestMixin, TestCase):
+
+    def test_get_variant_name(self):
+        self.assertEqual(
+            images.get_variant_name('img/restaurants/1.PNG', 640, 'webp'),
+            'img/restaurants/1-640w.webp')
+        self.assertEqual(
+            images.get_variant_name(
+                'img/restaurants/1.PNG', 640, 'webp', '0c1f2e3d4c5b6a79'),
+            'img/restaurants/1-0c1f2e3d4c5b6a79-640w.webp')
+
+    def test_unsupported_formats_are_skipped(self):
+        Image.init()
+        with mock.patch.dict(Image.SAVE):
+            del Image.SAVE['WEBP']
+            images.get_variant_formats.cache_clear()
+            self.assertEqual(images.get_variant_formats(), ['jpeg'])
+
+    def test_upload_generates_variants(self):
+        restaurant = f.RestaurantFactory(
+            image=get_image_file('Photo.JPG', size=(2000, 1000)))
+        # the variants are generated by the image job worker
+        self.assertEqual(restaurant.image_variant_widths, [])
+        self.process_image_jobs(restaurant)
+        self.assertEqual(restaurant.image_variant_widths, [320, 640, 1280])
+
+        for width in [320, 640, 1280]:
+            for format, pillow_format in [('webp', 'WEBP'), ('jpeg', 'JPEG')]:
+                with self.open_variant(restaurant, width,
+                                       format) as variant:
+                    self.assertEqual(variant.format, pillow_format)
+                    self.assertEqual(variant.size, (width, width // 2))
+
+    def test_images_are_rotated_and_have_no_metadata(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # orientation: rotated 90 degrees
+        menu = self.process_image_jobs(f.MenuFactory(image=get_image_file(
+            'photo.jpg', size=(400, 200), exif=exif.tobytes())))
+        # the photo is 200 pixels wide once it is rotated
+        self.assertEqual(menu.image_variant_widths, [200])
+        with self.open_variant(menu, 200, 'jpeg') as variant:
+            self.assertEqual(variant.size, (200, 400))
+            self.assertNotIn(0x0112, variant.getexif())
+        with menu.image.open('rb'), Image.open(menu.image) as original:
+            self.assertEqual(original.size, (200, 400))
+            self.assertNotIn(0x0112, original.getexif())
+
+    def test_transparent_image(self):
+        menusection = self.process_image_jobs(f.MenuSectionFactory(
+            image=get_image_file(
+                'logo.png', size=(100, 100), mode='RGBA',
+                color=(255, 0, 0, 128), format='PNG')))
+        with self.open_variant(menusection, 100, 'webp') as variant:
+            self.assertEqual(variant.mode, 'RGBA')
+        with self.open_variant(menusection, 100, 'jpeg') as variant:
+            self.assertEqual(variant.mode, 'RGB')
+
+    def test_invalid_image_has_no_variants(self):
+        restaurant = f.RestaurantFactory()
+        restaurant.image.save('broken.jpg', ContentFile(b'not an image'))
+        with self.assertLogs('menus_project.images', 'ERROR'):
+            self.assertEqual(
+                images.generate_image_variants(restaurant.image), ([], ''))
+
+    def test_clearing_the_image_clears_the_variant_widths(self):
+        menu = f.MenuFactory(image=get_image_file('photo.jpg'))
+        menu.image = None
+        menu.save()
+        menu.refresh_from_db()
+        self.assertEqual(menu.image_variant_widths, [])
+
+    def test_restaurant_delete_deletes_variants(self):
+        restaurant = self.process_image_jobs(
+            f.RestaurantFactory(image=get_image_file('photo.jpg')))
+        storage = restaurant.image.storage
+        names = [restaurant.image.name] + [
+            images.get_variant_name(restaurant.image.name, width, format,
+                                    restaurant.image_variant_hash)
+            for width in restaurant.image_variant_widths
+            for format in ['webp', 'jpeg']]
+        # the files are deleted once the deletion is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            restaurant.delete()
+        for name in names:
+            self.assertFalse(storage.exists(name), name)
+
+
+class ResponsiveImageTagTest(ImageVariantsTestMixin, TestCase):
+    template = Template(
+        "{% load images %}"
+        "{% responsive_image menu 'restaurant-menu-img' '100vw' %}")
+
+    def test_image_with_variants(self):
+        menu = self.process_image_jobs(
+            f.MenuFactory(image=get_image_file('photo.jpg')))
+        html = self.template.render(Context({'menu': menu}))
+        url = menu.image.url
+        base = f'{os.path.splitext(url)[0]}-{menu.image_variant_hash}'
+        self.assertInHTML(
+            f'<picture>'
+            f'<source type="image/webp" sizes="100vw" srcset="'
+            f'{base}-320w.webp 320w, {base}-640w.webp 640w, '
+            f'{base}-1280w.webp 1280w">'
+            f'<img src="{base}-1280w.jpg" sizes="100vw" '
+            f'class="restaurant-menu-img" srcset="'
+            f'{base}-320w.jpg 320w, {base}-640w.jpg 640w, '
+            f'{base}-1280w.jpg 1280w">'
+            f'</picture>', html)
+
+    def test_image_without_variants(self):
+        menu = f.MenuFactory(image=get_image_file('photo.jpg'))
+        menu.image_variant_widths = []
+        html = self.template.render(Context({'menu': menu}))
+        self.assertInHTML(
+            f'<img src="{menu.image.url}" class="restaurant-menu-img">', html)
+
+    def test_restaurant_detail_page(self):
+        restaurant = f.RestaurantFactory(image=get_image_file('photo.jpg'))
+        # the original is served until the variants are ready
+        response = self.client.get(restaurant.get_absolute_url())
+        self.assertNotContains(response, '<picture>')
+        self.assertContains(response, restaurant.image.url)
+
+        self.process_image_jobs(restaurant)
+        response = self.client.get(restaurant.get_absolute_url())
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, 'srcset=')
@@ -0,0 +1,144 @@
+import json
+import os
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from menus_project import factories as f
+from menus_project import instrumentation
+
+LOGGER_NAME = 'menus_project.instrumentation'
+
+
+class InstrumentationMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitem = f.MenuItemFactory()
+        cls.test_menu = cls.test_menuitem.menusection.menu
+        cls.test_url = cls.test_menu.get_absolute_url()
+
+    def setUp(self):
+        instrumentation.reset_view_stats()
+        self.addCleanup(instrumentation.reset_view_stats)
+
+    def test_stats_are_recorded_by_view_name(self):
+        for i in range(2):
+            self.client.get(self.test_url)
+
+        stats = instrumentation.get_view_stats()['menus:menu_detail']
+        self.assertEqual(stats['requests_total'], 2)
+        self.assertGreater(stats['queries_total'], 0)
+        self.assertGreater(stats['render_seconds_total'], 0)
+        self.assertGreater(stats['latency_seconds_total'], 0)
+        self.assertEqual(stats['query_budget_exceeded_total'], 0)
+
+    def test_unresolved_request_is_not_recorded(self):
+        self.client.get('/bad-url/')
+        self.assertEqual(instrumentation.get_view_stats(), {})
+
+    def test_request_is_logged_as_json(self):
+        with self.assertLogs(LOGGER_NAME, 'INFO') as logs:
+            self.client.get(self.test_url)
+
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data['view'], 'menus:menu_detail')
+        self.assertEqual(data['path'], self.test_url)
+        self.assertEqual(data['status'], 200)
+        self.assertGreater(data['queries'], 0)
+        for key in ('sql_ms', 'render_ms', 'total_ms'):
+            self.assertIn(key, data)
+
+    def test_secret_url_is_logged_as_its_pattern(self):
+        url = reverse('users:user_activation', kwargs={
+            'uidb64': 'MQ', 'token': 'secret-token'})
+        with self.assertLogs(LOGGER_NAME, 'INFO') as logs:
+            self.client.get(url)
+
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data['path'], '/users/login/<uidb64>/<token>/')
+        self.assertNotIn('secret-token', logs.output[0])
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self):
+        response = self.client.get(self.test_url)
+        stats = instrumentation.get_view_stats()['menus:menu_detail']
+        self.assertEqual(
+            response['X-Query-Count'], str(stats['queries_total']))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^sql;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_no_debug_headers_without_debug(self):
+        response = self.client.get(self.test_url)
+        self.assertFalse(response.has_header('X-Query-Count'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(QUERY_BUDGETS={'menus:menu_detail': 1})
+    def test_budget_exceeded_raises_in_strict_mode(self):
+        with self.assertRaises(instrumentation.QueryBudgetExceeded):
+            self.client.get(self.test_url)
+
+    @override_settings(
+        QUERY_BUDGETS={'menus:menu_detail': 1}, QUERY_BUDGETS_STRICT=False)
+    def test_budget_exceeded_is_logged_as_warning(self):
+        with self.assertLogs(LOGGER_NAME, 'WARNING') as logs:
+            response = self.client.get(self.test_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('menus:menu_detail ran', logs.output[0])
+        self.assertIn('over its budget of 1', logs.output[0])
+
+        stats = instrumentation.get_view_stats()['menus:menu_detail']
+        self.assertEqual(stats['query_budget_exceeded_total'], 1)
+
+
+@override_settings(METRICS_TOKEN='test-metrics-token')
+class MetricsViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = f.UserFactory()
+        cls.staff_user = f.UserFactory(is_staff=True)
+        cls.test_url = reverse('metrics')
+
+    def setUp(self):
+        instrumentation.reset_view_stats()
+        self.addCleanup(instrumentation.reset_view_stats)
+
+    def test_token_gets_metrics(self):
+        self.client.get(reverse('root'))
+
+        response = self.client.get(
+            self.test_url, HTTP_AUTHORIZATION='Bearer test-metrics-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode('utf-8')
+        self.assertIn('# TYPE menus_view_requests_total counter', content)
+        self.assertIn(
+            f'menus_view_requests_total{{view="root",pid="{os.getpid()}"}} 1',
+            content)
+
+    def test_other_token_is_forbidden(self):
+        self.client.force_login(self.test_user)
+        response = self.client.get(
+            self.test_url, HTTP_AUTHORIZATION='Bearer other-token')
+        self.assertEqual(response.status_code, 403)
+
+    def test_proxied_request_is_forbidden(self):
+        # a proxy on the same host forwards every request from 127.0.0.1
+        response = self.client.get(
+            self.test_url, REMOTE_ADDR='127.0.0.1',
+            HTTP_X_FORWARDED_FOR='203.0.113.1')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_no_token_is_accepted_without_a_token_setting(self):
+        for authorization in ['Bearer ', 'Bearer None']:
+            response = self.client.get(
+                self.test_url, HTTP_AUTHORIZATION=authorization)
+            self.assertEqual(response.status_code, 403)
+
+    def test_staff_user_gets_metrics(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(self.test_url)
+        self.assertEqual(response.status_code, 200)
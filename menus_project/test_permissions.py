@@ -2,7 +2,9 @@ from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase, RequestFactory
 
 import menus_project.factories as f
-from .permissions import UserHasRestaurantPermissionsMixin
+from .permissions import (
+    UserHasRestaurantPermissionsMixin, get_administered_restaurant_pks,
+    get_restaurant_pk, is_restaurant_admin)
 
 
 class UserHasRestaurantPermissionsMixinTest(TestCase):
@@ -132,3 +134,53 @@ class UserHasRestaurantPermissionsMixinTest(TestCase):
         self.test_permission.request = self.request
         with self.assertRaises(AttributeError):
             self.test_permission.test_func(self.test_user)
+
+
+class AdministeredRestaurantPksTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_restaurants = f.RestaurantFactory.create_batch(
+            size=2, admin_users=[cls.restaurant_admin_user])
+        cls.other_restaurant = f.RestaurantFactory()
+        cls.test_menuitem = f.MenuItemFactory(
+            menusection__menu__restaurant=cls.test_restaurants[0])
+
+    def test_get_administered_restaurant_pks(self):
+        self.assertEqual(
+            get_administered_restaurant_pks(self.restaurant_admin_user),
+            {restaurant.pk for restaurant in self.test_restaurants})
+
+    def test_get_administered_restaurant_pks_unauthenticated_user(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_administered_restaurant_pks(AnonymousUser()), set())
+
+    def test_pks_are_loaded_once_per_user_object(self):
+        with self.assertNumQueries(1):
+            for restaurant in self.test_restaurants:
+                self.assertTrue(is_restaurant_admin(
+                    self.restaurant_admin_user, restaurant.pk))
+            self.assertFalse(is_restaurant_admin(
+                self.restaurant_admin_user, self.other_restaurant.pk))
+
+    def test_get_restaurant_pk(self):
+        menusection = self.test_menuitem.menusection
+        for obj in [self.test_restaurants[0], menusection.menu, menusection,
+                    self.test_menuitem]:
+            self.assertEqual(
+                get_restaurant_pk(obj), self.test_restaurants[0].pk)
+        self.assertIsNone(get_restaurant_pk(self.restaurant_admin_user))
+
+    def test_permission_checks_share_one_query(self):
+        request = RequestFactory().get('/')
+        request.user = self.restaurant_admin_user
+        test_permission = UserHasRestaurantPermissionsMixin()
+        test_permission.request = request
+
+        menusection = self.test_menuitem.menusection
+        with self.assertNumQueries(1):
+            for obj in [self.test_restaurants[0], menusection.menu,
+                        menusection, self.test_menuitem]:
+                self.assertTrue(test_permission.test_func(obj))
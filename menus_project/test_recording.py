@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from menus_project import constants as c
+from menus_project import factories as f
+
+
+class RequestRecorderMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        cls.test_menusection = \
+            f.MenuSectionFactory(admin_users=[cls.restaurant_admin_user])
+        cls.test_menu = cls.test_menusection.menu
+        cls.bulk_url = reverse('api:menuitem_bulk', kwargs={
+            'restaurant_pk': cls.test_menu.restaurant.pk,
+            'menu_pk': cls.test_menu.pk,
+            'menusection_pk': cls.test_menusection.pk})
+
+    def setUp(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.log_path = os.path.join(tempdir, 'requests.jsonl')
+
+        settings_override = \
+            override_settings(REQUEST_RECORDING_PATH=self.log_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_entries(self):
+        with open(self.log_path) as f:
+            return [json.loads(line) for line in f]
+
+    def post_bulk(self):
+        self.client.login(
+            username=self.restaurant_admin_user.username,
+            password=c.TEST_USER_PASSWORD)
+        return self.client.post(
+            self.bulk_url, [{'name': 'Garden Salad', 'description': ''}],
+            content_type='application/json')
+
+    def test_requests_are_recorded(self):
+        url = self.test_menu.get_absolute_url() + '?page=2'
+        self.client.get(url)
+        self.client.get('/bad-url/')
+
+        entries = self.get_entries()
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['method'], 'GET')
+        self.assertEqual(entries[0]['path'], url)
+        self.assertEqual(entries[0]['view'], 'menus:menu_detail')
+        self.assertEqual(entries[0]['status'], 200)
+        self.assertIn('duration_ms', entries[0])
+        self.assertIn('time', entries[0])
+        self.assertIsNone(entries[1]['view'])
+        self.assertEqual(entries[1]['status'], 404)
+
+    def test_only_known_query_params_are_recorded(self):
+        url = self.test_menu.get_absolute_url()
+        self.client.get(url + '?page=2&token=abc123&next=/users/')
+        self.assertEqual(self.get_entries()[0]['path'], url + '?page=2')
+
+    def test_secret_url_is_recorded_as_its_pattern(self):
+        self.client.get(reverse('users:user_activation', kwargs={
+            'uidb64': 'MQ', 'token': 'abc123-secret'}))
+        entry = self.get_entries()[0]
+        self.assertEqual(entry['path'], '/users/login/<uidb64>/<token>/')
+        self.assertNotIn('abc123-secret', json.dumps(entry))
+
+    def test_bodies_are_not_recorded_by_default(self):
+        self.assertEqual(self.post_bulk().status_code, 201)
+        entry = self.get_entries()[-1]
+        self.assertEqual(entry['view'], 'api:menuitem_bulk')
+        self.assertNotIn('body', entry)
+
+    @override_settings(REQUEST_RECORDING_BODIES=True)
+    def test_bodies_are_recorded_if_enabled(self):
+        self.assertEqual(self.post_bulk().status_code, 201)
+        entry = self.get_entries()[-1]
+        self.assertEqual(entry['content_type'], 'application/json')
+        self.assertEqual(
+            json.loads(entry['body']),
+            [{'name': 'Garden Salad', 'description': ''}])
+
+    @override_settings(REQUEST_RECORDING_PATH=None)
+    def test_nothing_is_recorded_without_path(self):
+        self.client.get(self.test_menu.get_absolute_url())
+        self.assertFalse(os.path.exists(self.log_path))
@@ -0,0 +1,92 @@
+from html import unescape
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from menus_project import constants as c
+from menus_project import factories as f
+from menus.models import Menu, MenuSection, MenuItem
+from restaurants.models import Restaurant
+
+
+class UniqueSlugModelMixinTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitem = f.MenuItemFactory()
+        cls.test_menusection = cls.test_menuitem.menusection
+        cls.test_menu = cls.test_menusection.menu
+        cls.test_restaurant = cls.test_menu.restaurant
+
+    def get_duplicates(self):
+        return [
+            Restaurant(name=self.test_restaurant.name),
+            Menu(restaurant=self.test_restaurant, name=self.test_menu.name),
+            MenuSection(menu=self.test_menu, name=self.test_menusection.name),
+            MenuItem(menusection=self.test_menusection,
+                     name=self.test_menuitem.name)]
+
+    def test_duplicate_slug_raises_validation_error(self):
+        for obj in self.get_duplicates():
+            with self.assertRaises(ValidationError) as cm:
+                obj.save()
+            self.assertEqual(
+                cm.exception.messages, [obj.duplicate_slug_error_string])
+
+        # the failed saves do not break the surrounding transaction
+        self.assertEqual(MenuItem.objects.count(), 1)
+
+    def test_restaurant_duplicate_slug_error_string(self):
+        self.assertEqual(
+            Restaurant.duplicate_slug_error_string,
+            c.RESTAURANT_DUPLICATE_SLUG_ERROR_STRING)
+
+    def test_same_slug_in_other_parent_is_allowed(self):
+        other_menusection = f.MenuSectionFactory(menu=self.test_menu)
+        MenuItem.objects.create(
+            menusection=other_menusection, name=self.test_menuitem.name)
+        self.assertEqual(
+            MenuItem.objects.filter(slug=self.test_menuitem.slug).count(), 2)
+
+    def test_save_does_not_query_for_duplicate_slugs(self):
+        for obj in [self.test_restaurant, self.test_menu,
+                    self.test_menusection, self.test_menuitem]:
+            with CaptureQueriesContext(connection) as queries:
+                obj.save()
+            table = f'"{obj._meta.db_table}"'
+            self.assertFalse([
+                query for query in queries.captured_queries
+                if query['sql'].startswith('SELECT')
+                and f'FROM {table}' in query['sql']])
+
+
+class SlugValidationErrorMixinTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant_admin_user = f.UserFactory()
+        test_restaurant = \
+            f.RestaurantFactory(admin_users=[cls.restaurant_admin_user])
+        cls.test_menus = \
+            f.MenuFactory.create_batch(size=2, restaurant=test_restaurant)
+
+    def test_duplicate_name_is_shown_as_form_error(self):
+        self.client.login(username=self.restaurant_admin_user.username,
+                          password=c.TEST_USER_PASSWORD)
+        test_menu = self.test_menus[0]
+        response = self.client.post(
+            reverse('menus:menu_update', kwargs={
+                'restaurant_slug': test_menu.restaurant.slug,
+                'menu_slug': test_menu.slug}),
+            {'restaurant': test_menu.restaurant.pk,
+             'name': self.test_menus[1].name})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            Menu.duplicate_slug_error_string,
+            unescape(response.content.decode('utf-8')))
+
+        # the page still links to the menu under its unchanged slug
+        self.assertEqual(response.context['object'].slug, test_menu.slug)
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import time
+
+from django.core.files.base import ContentFile
+from django.test import TestCase
+
+from menus_project import factories as f
+from menus_project import image_jobs
+from menus_project.images import get_variant_name
+from menus_project.storage import ContentAddressedStorage
+from menus_project.test_images import ImageVariantsTestMixin, get_image_file
+
+
+class ContentAddressedStorageTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.storage = ContentAddressedStorage()
+
+    def test_file_is_named_by_its_content(self):
+        content_hash = hashlib.sha256(b'content').hexdigest()
+        name = self.storage.save('img/Photo.JPG', ContentFile(b'content'))
+        self.assertEqual(
+            name, f'img/{content_hash[:2]}/{content_hash}.jpg')
+        with self.storage.open(name) as saved_file:
+            self.assertEqual(saved_file.read(), b'content')
+
+    def test_same_content_is_stored_once(self):
+        name = self.storage.save('img/photo.jpg', ContentFile(b'content'))
+        self.assertEqual(
+            self.storage.save('img/copy.jpg', ContentFile(b'content')), name)
+        self.assertEqual(
+            self.storage.listdir(name.rsplit('/', 1)[0])[1],
+            [name.rsplit('/', 1)[1]])
+        self.assertNotEqual(
+            self.storage.save('img/photo.jpg', ContentFile(b'other')), name)
+
+    def test_saving_the_same_content_again_touches_the_file(self):
+        name = self.storage.save('img/photo.jpg', ContentFile(b'content'))
+        an_hour_ago = time.time() - 3600
+        os.utime(self.storage.path(name), (an_hour_ago, an_hour_ago))
+
+        self.storage.save('img/copy.jpg', ContentFile(b'content'))
+        self.assertGreater(
+            os.path.getmtime(self.storage.path(name)), an_hour_ago + 60)
+
+    def test_same_upload_is_shared_by_several_objects(self):
+        menus = [f.MenuFactory(image=get_image_file('photo.jpg'))
+                 for i in range(2)]
+        self.assertEqual(menus[0].image.name, menus[1].image.name)
+
+
+class SharedImageDeleteTest(ImageVariantsTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.test_menusections = [
+            f.MenuSectionFactory(image=get_image_file('photo.jpg'))
+            for i in range(2)]
+        image_jobs.process_image_jobs()
+        for menusection in self.test_menusections:
+            menusection.refresh_from_db()
+        image = self.test_menusections[0].image
+        variant_hash = self.test_menusections[0].image_variant_hash
+        self.names = [image.name] + [
+            get_variant_name(image.name, width, format, variant_hash)
+            for width in [320, 640, 1280] for format in ['webp', 'jpeg']]
+
+    def assertFilesExist(self, exist):
+        storage = self.test_menusections[0].image.storage
+        for name in self.names:
+            self.assertEqual(storage.exists(name), exist, name)
+
+    def test_image_is_deleted_with_its_last_object(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_menusections[0].delete()
+        self.assertFilesExist(True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_menusections[1].delete()
+        self.assertFilesExist(False)
+
+    def test_images_of_cascade_deleted_objects_are_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for menusection in self.test_menusections:
+                menusection.menu.restaurant.delete()
+        self.assertFilesExist(False)
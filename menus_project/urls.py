@@ -1,16 +1,14 @@
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
-from django.urls import include, path
+from django.urls import include, path, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView
 
-import server_config
-
 from . import views
 from api.views import verify_email_view as api_views_verify_email_view
 
 urlpatterns = [
     path('', views.root, name='root'),
+    path('metrics/', views.metrics, name='metrics'),
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/redoc/',
@@ -25,12 +23,15 @@ urlpatterns = [
     path('captcha/', include('captcha.urls')),
     path('restaurants/', include('restaurants.urls')),
     path('restaurants/<slug:restaurant_slug>/menus/', include('menus.urls')),
+    path('search/', include('search.urls')),
     path('users/', include('users.urls')),
     path('users/', include('django.contrib.auth.urls')),
 ]
 
-if server_config.SERVER_NAME == 'dev':
-    urlpatterns += static(
-        settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+if settings.SERVE_FILES:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'),
+                views.serve_static, name='static'),
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'),
+                views.serve_media, name='media'),
+    ]
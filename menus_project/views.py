@@ -1,5 +1,87 @@
+from django.conf import settings
+from django.contrib.staticfiles import views as staticfiles_views
+from django.contrib.staticfiles.storage import (
+    ManifestFilesMixin, staticfiles_storage)
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.views import static
+
+from .image_jobs import render_image_job_metrics
+from .instrumentation import render_prometheus_metrics
+from .storage import is_content_addressed
+
+# a year, the longest lifetime that caches are asked to keep a response
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
 
 
 def root(request):
     return render(request, 'root.html')
+
+
+def has_metrics_token(request):
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        'Bearer ' + settings.METRICS_TOKEN)
+
+
+def metrics(request):
+    # the client's address is not trusted: behind a proxy on the same host,
+    # every request comes from 127.0.0.1
+    if not request.user.is_staff and not has_metrics_token(request):
+        raise PermissionDenied
+    return HttpResponse(
+        render_prometheus_metrics() + render_image_job_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def add_file_cache_control(response, immutable):
+    """
+    Let browsers and proxies keep a file whose name changes with its content
+    for a year without asking for it again, and make them check any other
+    file before using their copy.
+    """
+    if immutable:
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def is_hashed_static_name(path):
+    # the names listed in the manifest written by collectstatic
+    return isinstance(staticfiles_storage, ManifestFilesMixin) \
+        and path in staticfiles_storage.hashed_files.values()
+
+
+def serve_static(request, path):
+    if settings.STATIC_ROOT:
+        response = static.serve(
+            request, path, document_root=settings.STATIC_ROOT)
+    else:
+        # the files of STATICFILES_DIRS and of the apps, as they are
+        response = staticfiles_views.serve(request, path, insecure=True)
+    return add_file_cache_control(response, is_hashed_static_name(path))
+
+
+def serve_media(request, path):
+    response = static.serve(request, path, document_root=settings.MEDIA_ROOT)
+    return add_file_cache_control(response, is_content_addressed(path))
+
+
+class CachedObjectMixin:
+    """
+    Look up the object of a single-object view once per request, however
+    many times get_object() is called by the permission check, the view
+    and its context.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
@@ -0,0 +1,18 @@
+from .models import Restaurant
+
+
+def restaurant_tree_queryset():
+    """
+    Restaurant queryset that loads every menu and menu section of the
+    restaurant in a fixed number of queries.
+    """
+    return Restaurant.objects.prefetch_related('menu_set__menusection_set')
+
+
+def restaurant_menu_tree_queryset():
+    """
+    Restaurant queryset that loads every menu, section and item of the
+    restaurant in a fixed number of queries.
+    """
+    return Restaurant.objects.prefetch_related(
+        'menu_set__menusection_set__menuitem_set')
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 21:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0003_restaurant_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='image_variant_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 21:55
+
+from django.db import migrations, models
+import menus_project.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0004_restaurant_image_variant_widths'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='restaurant',
+            name='image',
+            field=models.ImageField(blank=True, help_text='An image or logo for your restaurant (optional)', null=True, storage=menus_project.storage.ContentAddressedStorage(), upload_to=menus_project.storage.image_upload_to),
+        ),
+    ]
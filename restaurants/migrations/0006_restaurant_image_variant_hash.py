@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0005_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='image_variant_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+    ]
@@ -3,25 +3,45 @@ import os
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
 from menus_project import constants
+from menus_project.images import ImageVariantsMixin
+from menus_project.slugs import UniqueSlugModelMixin
+from menus_project.storage import ContentAddressedStorage, image_upload_to
 
 
+# used by old migrations
 def upload_to(instance, filename):
     base, extension = os.path.splitext(filename)
     extension = extension.lower()
     return f"img/restaurants/{instance.pk}{extension}"
 
 
-class Restaurant(models.Model):
+class Restaurant(ImageVariantsMixin, UniqueSlugModelMixin, models.Model):
     name = models.CharField(max_length=128, default=None, blank=False)
     slug = models.SlugField(max_length=128, unique=True)
     admin_users = models.ManyToManyField(settings.AUTH_USER_MODEL)
     image = models.ImageField(
-        upload_to=upload_to, blank=True, null=True,
+        upload_to=image_upload_to, storage=ContentAddressedStorage(),
+        blank=True, null=True,
         help_text="An image or logo for your restaurant (optional)")
+    image_variant_widths = models.JSONField(
+        default=list, blank=True, editable=False)
+    image_variant_hash = models.CharField(
+        max_length=16, blank=True, default='', editable=False)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last change to the restaurant or any of its menus, "
+                  "sections or items")
+
+    # do not allow duplicate restaurant slugs
+    duplicate_slug_error_string = \
+        constants.RESTAURANT_DUPLICATE_SLUG_ERROR_STRING
 
     class Meta:
         ordering = ['name']
@@ -34,26 +54,33 @@ class Restaurant(models.Model):
         if self.slug in constants.RESERVED_KEYWORDS:
             raise ValidationError(constants.RESERVED_KEYWORD_ERROR_STRING)
 
-        # do not allow duplicate restaurant slugs
-        restaurants_with_same_slug = \
-            Restaurant.objects.filter(slug=slugify(self.name))
-        if restaurants_with_same_slug.exists() \
-            and restaurants_with_same_slug.first() != self \
-                and restaurants_with_same_slug.last() != self:
-            raise ValidationError(
-                constants.RESTAURANT_DUPLICATE_SLUG_ERROR_STRING)
-
-    def delete(self, *args, **kwargs):
-        if self.image:
-            self.image.delete()
-        super().delete(*args, **kwargs)
-
     def get_absolute_url(self):
         return reverse('restaurants:restaurant_detail', kwargs={
             'restaurant_slug': self.slug})
 
+    def touch(self):
+        """
+        Mark the restaurant as changed after one of its menus, sections or
+        items has been saved or deleted.
+        """
+        self.updated_at = timezone.now()
+        Restaurant.objects.filter(pk=self.pk) \
+            .update(updated_at=self.updated_at)
+
     def save(self, *args, **kwargs):
         if not self.slug == slugify(self.name):
             self.slug = slugify(self.name)
         self.clean()
         super().save(*args, **kwargs)
+
+
+@receiver(m2m_changed, sender=Restaurant.admin_users.through)
+def touch_restaurant_on_admin_users_change(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        instance.touch()
+    elif pk_set:
+        for restaurant in Restaurant.objects.filter(pk__in=pk_set):
+            restaurant.touch()
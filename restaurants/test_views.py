@@ -3,11 +3,13 @@ from django.urls import reverse
 from django.utils.text import slugify
 
 from html import unescape
+from unittest import mock
 from urllib.parse import urlparse
 
 from menus_project import constants as c
 from menus_project import factories as f
 from .models import Restaurant
+from .views import RestaurantListView
 
 
 class RestaurantListViewTest(TestCase):
@@ -38,6 +40,33 @@ class RestaurantListViewTest(TestCase):
     def test_request_get_method_unauthenticated_user(self):
         self.assertEqual(self.response.status_code, 200)
 
+    def test_request_get_method_no_restaurants(self):
+        self.assertContains(
+            self.response, 'There are no restaurants in the database.')
+        self.assertNotContains(self.response, '<ul>')
+
+    def test_request_get_method_lists_every_restaurant(self):
+        restaurants = f.RestaurantFactory.create_batch(3)
+        response = self.client.get(self.current_test_url)
+        for restaurant in restaurants:
+            self.assertContains(response, restaurant.get_absolute_url())
+        self.assertContains(response, '<ul>', count=1)
+
+    @mock.patch.object(RestaurantListView, 'paginate_by', 2)
+    def test_request_get_method_paginated(self):
+        restaurants = sorted(
+            f.RestaurantFactory.create_batch(3),
+            key=lambda restaurant: restaurant.name)
+        response = self.client.get(self.current_test_url)
+        self.assertEqual(
+            list(response.context['restaurants']), restaurants[:2])
+        self.assertContains(response, 'Page 1 of 2')
+        self.assertContains(response, '?page=2')
+
+        response = self.client.get(self.current_test_url, {'page': 2})
+        self.assertEqual(
+            list(response.context['restaurants']), restaurants[2:])
+
 
 class RestaurantCreateViewTest(TestCase):
 
@@ -227,6 +256,48 @@ class RestaurantDetailViewTest(TestCase):
         self.assertNotIn("Edit this menu", self.html)
         self.assertNotIn('auth-links', self.html)
 
+    # get_context_data()
+    def test_context_is_admin_unauthenticated_user(self):
+        self.assertFalse(self.context['is_admin'])
+
+    def test_context_is_admin_authorized_user(self):
+        self.client.login(
+            username=self.restaurant_admin_user.username,
+            password=c.TEST_USER_PASSWORD)
+        self.setUp()
+
+        self.assertTrue(self.context['is_admin'])
+
+    def test_context_view_as_customer(self):
+        self.assertFalse(self.context['view_as_customer'])
+
+        self.current_test_url = self.current_test_url + '?view_as_customer=1'
+        self.setUp()
+        self.assertTrue(self.context['view_as_customer'])
+
+    # query count
+    def test_query_count_does_not_grow_with_restaurant_size(self):
+        self.client.login(
+            username=self.restaurant_admin_user.username,
+            password=c.TEST_USER_PASSWORD)
+        f.MenuSectionFactory(menu=self.test_menu)
+
+        # session, user, restaurant, menus, sections, administered
+        # restaurants
+        with self.assertNumQueries(6):
+            self.client.get(self.current_test_url)
+
+        for i in range(3):
+            test_menu = f.MenuFactory(restaurant=self.test_restaurant)
+            for j in range(3):
+                f.MenuItemFactory(
+                    menusection=f.MenuSectionFactory(menu=test_menu))
+        f.MenuFactory(restaurant=self.test_restaurant)  # empty menu
+
+        with self.assertNumQueries(6):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
     # bad kwargs
     def test_bad_kwargs(self):
         self.response = self.client.get(
@@ -273,7 +344,10 @@ class RestaurantUpdateViewTest(TestCase):
             self.view.__class__.__bases__[0].__name__,
             'UserHasRestaurantPermissionsMixin')
         self.assertEqual(
-            self.view.__class__.__bases__[1].__name__, 'SuccessMessageMixin')
+            self.view.__class__.__bases__[1].__name__,
+            'SlugValidationErrorMixin')
+        self.assertEqual(
+            self.view.__class__.__bases__[2].__name__, 'SuccessMessageMixin')
 
     def test_model_name(self):
         self.assertEqual(self.view.model.__name__, 'Restaurant')
@@ -456,6 +530,14 @@ class RestaurantUpdateViewTest(TestCase):
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
 
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants,
+        # user.restaurant_set.count
+        with self.assertNumQueries(5):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
+
 
 class RestaurantDeleteViewTest(TestCase):
 
@@ -649,3 +731,10 @@ class RestaurantDeleteViewTest(TestCase):
                         self.test_restaurant.slug if i != 0 else 'bad-slug'})
             self.response = self.client.get(self.current_test_url)
             self.assertEqual(self.response.status_code, 404)
+
+    # query count
+    def test_query_count(self):
+        # object, session, user, administered restaurants
+        with self.assertNumQueries(4):
+            self.response = self.client.get(self.current_test_url)
+        self.assertEqual(self.response.status_code, 200)
@@ -1,5 +1,6 @@
 from django.urls import path
 
+from menus_project.async_views import async_read_view
 from . import views
 
 app_name = 'restaurants'
@@ -12,7 +13,7 @@ urlpatterns = [
          views.RestaurantCreateView.as_view(),
          name='restaurant_create'),
     path('<slug:restaurant_slug>/',
-         views.RestaurantDetailView.as_view(),
+         async_read_view(views.RestaurantDetailView.as_view()),
          name='restaurant_detail'),
     path('<slug:restaurant_slug>/edit/',
          views.RestaurantUpdateView.as_view(),
@@ -1,23 +1,34 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.http import HttpResponseRedirect
-from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, DetailView, ListView
 from django.views.generic.edit import UpdateView
 
+from .loaders import restaurant_tree_queryset
 from .models import Restaurant
 from menus_project import constants as c
-from menus_project.permissions import UserHasRestaurantPermissionsMixin
+from menus_project.cache import RenderedPageCacheMixin
+from menus_project.conditional import RestaurantPageConditionalGetMixin
+from menus_project.permissions import (
+    RestaurantAdminContextMixin, UserHasRestaurantPermissionsMixin,
+    get_administered_restaurant_pks)
+from menus_project.slugs import SlugValidationErrorMixin
+from menus_project.views import CachedObjectMixin
 
 
 class RestaurantListView(ListView):
     model = Restaurant
     context_object_name = 'restaurants'
+    paginate_by = settings.RESTAURANT_LIST_PAGE_SIZE
 
+    def get_queryset(self):
+        return super().get_queryset().only('name', 'slug')
 
-class RestaurantCreateView(LoginRequiredMixin, CreateView):
+
+class RestaurantCreateView(
+        LoginRequiredMixin, SlugValidationErrorMixin, CreateView):
     model = Restaurant
     fields = ('name', 'image')
     success_message = "Restaurant Created: %(name)s"
@@ -34,11 +45,12 @@ class RestaurantCreateView(LoginRequiredMixin, CreateView):
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
-        self.object = form.save()
-        self.object.admin_users.add(self.request.user)
-        messages.success(
-            self.request, self.success_message % self.object.__dict__)
-        return HttpResponseRedirect(self.get_success_url())
+        response = super().form_valid(form)
+        if not form.errors:
+            self.object.admin_users.add(self.request.user)
+            messages.success(
+                self.request, self.success_message % self.object.__dict__)
+        return response
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -46,14 +58,31 @@ class RestaurantCreateView(LoginRequiredMixin, CreateView):
         return context
 
 
-class RestaurantDetailView(DetailView):
+class RestaurantDetailView(
+        RestaurantPageConditionalGetMixin, RenderedPageCacheMixin,
+        RestaurantAdminContextMixin, DetailView):
     model = Restaurant
     slug_url_kwarg = 'restaurant_slug'
+    cached_query_params = {'view_as_customer': ['1']}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'has_restaurants':
+                bool(get_administered_restaurant_pks(self.request.user)),
+            'view_as_customer':
+                self.request.GET.get('view_as_customer') == '1'})
+        return context
+
+    def get_queryset(self):
+        return restaurant_tree_queryset()
 
 
 class RestaurantUpdateView(
-        UserHasRestaurantPermissionsMixin, SuccessMessageMixin, UpdateView):
+        UserHasRestaurantPermissionsMixin, SlugValidationErrorMixin,
+        SuccessMessageMixin, CachedObjectMixin, UpdateView):
     model = Restaurant
+    slug_url_kwarg = 'restaurant_slug'
     fields = ('name', 'image')
     success_message = "Restaurant Successfully Updated: %(name)s"
 
@@ -65,13 +94,11 @@ class RestaurantUpdateView(
     def get_initial(self):
         return {'name': self.get_object().name}
 
-    def get_object(self):
-        return get_object_or_404(
-            Restaurant, slug=self.kwargs['restaurant_slug'])
-
 
-class RestaurantDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
+class RestaurantDeleteView(
+        UserHasRestaurantPermissionsMixin, CachedObjectMixin, DeleteView):
     model = Restaurant
+    slug_url_kwarg = 'restaurant_slug'
     success_message = "The '%(name)s' restaurant has been deleted."
     success_url = reverse_lazy('users:user_detail')
 
@@ -79,7 +106,3 @@ class RestaurantDeleteView(UserHasRestaurantPermissionsMixin, DeleteView):
         obj = self.get_object()
         messages.success(self.request, self.success_message % obj.__dict__)
         return super().delete(request, *args, **kwargs)
-
-    def get_object(self):
-        return get_object_or_404(
-            Restaurant, slug=self.kwargs['restaurant_slug'])
@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import SearchEntry
+
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'restaurant', 'object_id')
+    list_filter = ['kind']
+    # the entries are written when their objects are saved
+    readonly_fields = ['kind', 'object_id', 'restaurant', 'menu',
+                       'menusection', 'menuitem', 'name', 'text']
+
+    class Meta:
+        model = SearchEntry
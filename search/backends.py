@@ -0,0 +1,140 @@
+"""
+Full-text search of the search entries (see search.models.SearchEntry).
+
+The index depends on the database (see search/migrations/0002):
+
+    SQLite: an FTS5 table, ranked by BM25
+    PostgreSQL: a weighted tsvector column with a GIN index, ranked by
+        ts_rank()
+
+Both match the entries that contain every word of the query (or a word that
+starts with it, so that results are found while a word is being typed),
+whose names count more than their text. The index only returns the ids of a
+page of entries, which are then read with their ancestors.
+"""
+import re
+
+from django.db import connection
+
+from .models import SearchEntry
+
+QUERY_TERM_RE = re.compile(r'[^\W_]+')
+# shorter words match too many entries to be worth searching for
+MIN_TERM_LENGTH = 2
+MAX_TERMS = 8
+
+
+def get_query_terms(query):
+    """Return the words of a search query that are searched for."""
+    terms = [term.lower() for term in QUERY_TERM_RE.findall(query or '')
+             if len(term) >= MIN_TERM_LENGTH]
+    return terms[:MAX_TERMS]
+
+
+class SQLiteSearchBackend:
+    table = 'search_searchentry_fts'
+
+    def get_match(self, terms):
+        # quoted, since the terms may be FTS5 keywords (e.g. 'and')
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def count(self, terms):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s',
+                [self.get_match(terms)])
+            return cursor.fetchone()[0]
+
+    def search(self, terms, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} '
+                f'WHERE {self.table} MATCH %s '
+                f'ORDER BY rank, rowid LIMIT %s OFFSET %s',
+                [self.get_match(terms), limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+    def optimize(self):
+        # merge the index's segments, after many entries have been written
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')")
+
+
+class PostgreSQLSearchBackend:
+    table = SearchEntry._meta.db_table
+
+    def get_tsquery(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def count(self, terms):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {self.table} "
+                f"WHERE search_vector @@ to_tsquery('english', %s)",
+                [self.get_tsquery(terms)])
+            return cursor.fetchone()[0]
+
+    def search(self, terms, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {self.table}, "
+                f"to_tsquery('english', %s) query "
+                f"WHERE search_vector @@ query "
+                f"ORDER BY ts_rank(search_vector, query) DESC, id "
+                f"LIMIT %s OFFSET %s",
+                [self.get_tsquery(terms), limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+    def optimize(self):
+        pass
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend():
+    return BACKENDS[connection.vendor]()
+
+
+class SearchResults:
+    """
+    The entries that match a search query, best match first. Slicing it
+    runs the search for one page, so it can be paginated like a queryset
+    (e.g. by Paginator).
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.terms = get_query_terms(query)
+        self.backend = get_search_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.terms) if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step is not None:
+            raise TypeError("Search results can only be sliced.")
+        offset = key.start or 0
+        if key.stop is None or not self.terms:
+            limit = self.count() - offset
+        else:
+            limit = key.stop - offset
+        if limit <= 0:
+            return []
+
+        ids = self.backend.search(self.terms, offset, limit)
+        entries = SearchEntry.objects \
+            .select_related('restaurant', 'menu', 'menusection', 'menuitem') \
+            .in_bulk(ids)
+        return [entries[pk] for pk in ids if pk in entries]
@@ -0,0 +1,32 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search.backends import get_search_backend
+from search.models import INDEXED_MODELS, SearchEntry, index_objects
+
+
+class Command(BaseCommand):
+    help = "Replace the search entries of every restaurant, menu, section " \
+        "and item. Saving an object updates its entry, so this is only " \
+        "needed for objects written without save() (e.g. loaded from a " \
+        "fixture) or the objects that existed before the search index."
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        counts = []
+        with transaction.atomic():
+            SearchEntry.objects.all().delete()
+            for label in INDEXED_MODELS:
+                model = apps.get_model(label)
+                count = index_objects(
+                    model._default_manager.all(), replace=False)
+                counts.append(
+                    f"{count} {model._meta.verbose_name_plural}")
+        get_search_backend().optimize()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Indexed {', '.join(counts)} in {elapsed:.1f} seconds.")
@@ -0,0 +1,133 @@
+from django.db import migrations
+
+# the entries of the objects that existed before the search index
+INDEX_EXISTING_OBJECTS = [
+    """
+    INSERT INTO search_searchentry (
+        kind, object_id, restaurant_id, name, text)
+    SELECT 'restaurant', r.id, r.id, r.name, ''
+    FROM restaurants_restaurant r
+    """,
+    """
+    INSERT INTO search_searchentry (
+        kind, object_id, restaurant_id, menu_id, name, text)
+    SELECT 'menu', m.id, m.restaurant_id, m.id, m.name,
+        COALESCE(m.description, '')
+    FROM menus_menu m
+    """,
+    """
+    INSERT INTO search_searchentry (
+        kind, object_id, restaurant_id, menu_id, menusection_id, name, text)
+    SELECT 'menusection', s.id, m.restaurant_id, s.menu_id, s.id, s.name,
+        COALESCE(s.note, '')
+    FROM menus_menusection s
+    JOIN menus_menu m ON m.id = s.menu_id
+    """,
+    """
+    INSERT INTO search_searchentry (
+        kind, object_id, restaurant_id, menu_id, menusection_id,
+        menuitem_id, name, text)
+    SELECT 'menuitem', i.id, m.restaurant_id, s.menu_id, i.menusection_id,
+        i.id, i.name, COALESCE(i.description, '')
+    FROM menus_menuitem i
+    JOIN menus_menusection s ON s.id = i.menusection_id
+    JOIN menus_menu m ON m.id = s.menu_id
+    """,
+]
+
+# an external content FTS5 table: it indexes the entries' names and text
+# without storing a copy of them, and is kept up to date by the triggers
+# (Django remakes a SQLite table to alter most of its fields, which drops
+# its triggers, so a later migration that does so must create them again)
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_searchentry_fts USING fts5(
+        name, text, content='search_searchentry', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')
+    """,
+    # matches in names count more than matches in text (see
+    # search.backends)
+    """
+    INSERT INTO search_searchentry_fts(search_searchentry_fts, rank)
+    VALUES ('rank', 'bm25(10.0, 1.0)')
+    """,
+    """
+    CREATE TRIGGER search_searchentry_ai AFTER INSERT ON search_searchentry
+    BEGIN
+        INSERT INTO search_searchentry_fts(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchentry_ad AFTER DELETE ON search_searchentry
+    BEGIN
+        INSERT INTO search_searchentry_fts(
+            search_searchentry_fts, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchentry_au
+    AFTER UPDATE OF name, text ON search_searchentry
+    BEGIN
+        INSERT INTO search_searchentry_fts(
+            search_searchentry_fts, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+        INSERT INTO search_searchentry_fts(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    """,
+    # index the existing entries
+    """
+    INSERT INTO search_searchentry_fts(search_searchentry_fts)
+    VALUES ('rebuild')
+    """,
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER search_searchentry_au',
+    'DROP TRIGGER search_searchentry_ad',
+    'DROP TRIGGER search_searchentry_ai',
+    'DROP TABLE search_searchentry_fts',
+]
+
+# a generated column, which PostgreSQL computes when an entry is saved
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE search_searchentry ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', name), 'A')
+        || setweight(to_tsvector('english', text), 'B')) STORED
+    """,
+    """
+    CREATE INDEX search_searchentry_search_vector
+    ON search_searchentry USING GIN (search_vector)
+    """,
+]
+POSTGRESQL_BACKWARD = [
+    'ALTER TABLE search_searchentry DROP COLUMN search_vector',
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            INDEX_EXISTING_OBJECTS,
+            'DELETE FROM search_searchentry'),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD,
+                            'postgresql': POSTGRESQL_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_BACKWARD,
+                            'postgresql': POSTGRESQL_BACKWARD})),
+    ]
@@ -0,0 +1,172 @@
+import itertools
+
+from django.conf import settings
+from django.db import models
+from django.db.models.signals import post_save
+from django.urls import reverse
+
+
+class SearchEntry(models.Model):
+    """
+    The searchable text of a restaurant, menu, section or item. The
+    full-text index of the entries (see search.backends) is kept up to date
+    by the database: an FTS5 table and triggers on SQLite, and a tsvector
+    column on PostgreSQL.
+
+    An entry is saved with its object, and deleted with it (or with any of
+    its ancestors) by the foreign keys below.
+    """
+
+    RESTAURANT = 'restaurant'
+    MENU = 'menu'
+    MENUSECTION = 'menusection'
+    MENUITEM = 'menuitem'
+    KIND_CHOICES = [
+        (RESTAURANT, "Restaurant"),
+        (MENU, "Menu"),
+        (MENUSECTION, "Menu Section"),
+        (MENUITEM, "Menu Item")]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    # the object and its ancestors
+    restaurant = models.ForeignKey(
+        'restaurants.Restaurant', on_delete=models.CASCADE,
+        related_name='+')
+    menu = models.ForeignKey(
+        'menus.Menu', on_delete=models.CASCADE, blank=True, null=True,
+        related_name='+')
+    menusection = models.ForeignKey(
+        'menus.MenuSection', on_delete=models.CASCADE, blank=True,
+        null=True, related_name='+')
+    menuitem = models.ForeignKey(
+        'menus.MenuItem', on_delete=models.CASCADE, blank=True, null=True,
+        related_name='+')
+    name = models.CharField(max_length=128)
+    text = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name_plural = 'search entries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'],
+                name='unique_search_entry_per_object')]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.name}"
+
+    def get_absolute_url(self):
+        kwargs = {'restaurant_slug': self.restaurant.slug}
+        if self.kind == self.RESTAURANT:
+            return reverse('restaurants:restaurant_detail', kwargs=kwargs)
+        kwargs['menu_slug'] = self.menu.slug
+        if self.kind == self.MENU:
+            return reverse('menus:menu_detail', kwargs=kwargs)
+        kwargs['menusection_slug'] = self.menusection.slug
+        if self.kind == self.MENUSECTION:
+            return reverse('menus:menusection_detail', kwargs=kwargs)
+        kwargs['menuitem_slug'] = self.menuitem.slug
+        return reverse('menus:menuitem_detail', kwargs=kwargs)
+
+
+# for each searchable model: the kind of its entries, the paths from an
+# object to the ids of the entry's foreign keys, and its text field
+INDEXED_MODELS = {
+    'restaurants.Restaurant': (
+        SearchEntry.RESTAURANT, {'restaurant_id': 'pk'}, None),
+    'menus.Menu': (
+        SearchEntry.MENU,
+        {'restaurant_id': 'restaurant_id', 'menu_id': 'pk'},
+        'description'),
+    'menus.MenuSection': (
+        SearchEntry.MENUSECTION,
+        {'restaurant_id': 'menu__restaurant_id', 'menu_id': 'menu_id',
+         'menusection_id': 'pk'},
+        'note'),
+    'menus.MenuItem': (
+        SearchEntry.MENUITEM,
+        {'restaurant_id': 'menusection__menu__restaurant_id',
+         'menu_id': 'menusection__menu_id',
+         'menusection_id': 'menusection_id', 'menuitem_id': 'pk'},
+        'description'),
+}
+
+
+def get_index_spec(model):
+    return INDEXED_MODELS[model._meta.label]
+
+
+def get_path_value(obj, path):
+    # e.g. 'menusection__menu_id' -> obj.menusection.menu_id, which uses the
+    # related objects that are already loaded
+    for attr in path.split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def build_search_entry(obj):
+    kind, paths, text_field = get_index_spec(type(obj))
+    return SearchEntry(
+        kind=kind, object_id=obj.pk, name=obj.name,
+        text=(getattr(obj, text_field) or '') if text_field else '',
+        **{field: get_path_value(obj, path) for field, path in paths.items()})
+
+
+def index_objects(queryset, replace=True):
+    """
+    Create the search entries of the objects of a queryset of a searchable
+    model, in batches, and return their number. Their existing entries are
+    replaced, unless replace is False (e.g. when the index is rebuilt from
+    scratch). Used for objects saved without their save() method, e.g. by
+    bulk_create().
+    """
+    kind, paths, text_field = get_index_spec(queryset.model)
+    fields = ['pk', 'name'] + list(paths.values())
+    if text_field:
+        fields.append(text_field)
+    rows = queryset.order_by().values(*fields).iterator(
+        chunk_size=settings.DATABASE_ITERATOR_CHUNK_SIZE)
+
+    entries_queryset = SearchEntry.objects.using(queryset.db)
+    count = 0
+    while True:
+        entries = [
+            SearchEntry(
+                kind=kind, object_id=row['pk'], name=row['name'],
+                text=(row[text_field] or '') if text_field else '',
+                **{field: row[path] for field, path in paths.items()})
+            for row in itertools.islice(
+                rows, settings.DATABASE_ITERATOR_CHUNK_SIZE)]
+        if not entries:
+            return count
+        if replace:
+            entries_queryset.filter(
+                kind=kind,
+                object_id__in=[entry.object_id for entry in entries]) \
+                .delete()
+        entries_queryset.bulk_create(entries)
+        count += len(entries)
+
+
+def update_search_entry(sender, instance, created, raw, using, update_fields,
+                        **kwargs):
+    # the objects of a fixture may be loaded before their parents (run
+    # './manage.py rebuild_search_index' after loading a fixture)
+    if raw:
+        return
+    text_field = get_index_spec(sender)[2]
+    if update_fields is not None \
+            and not {'name', text_field} & set(update_fields):
+        return
+    entry = build_search_entry(instance)
+    if not created:
+        updated = SearchEntry.objects.using(using) \
+            .filter(kind=entry.kind, object_id=entry.object_id) \
+            .update(name=entry.name, text=entry.text)
+        if updated:
+            return
+    entry.save(using=using)
+
+
+for model_label in INDEXED_MODELS:
+    post_save.connect(update_search_entry, sender=model_label)
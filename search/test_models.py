@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from menus.models import MenuItem
+from menus_project import factories as f
+from restaurants.models import Restaurant
+from .backends import SearchResults
+from .models import SearchEntry, index_objects
+
+
+def search(query):
+    return [(entry.kind, entry.object_id)
+            for entry in SearchResults(query)[:100]]
+
+
+class SearchEntryTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitem = f.MenuItemFactory(
+            name="Margherita", description="Tomato, basil and mozzarella")
+        cls.test_menusection = cls.test_menuitem.menusection
+        cls.test_menu = cls.test_menusection.menu
+        cls.test_restaurant = cls.test_menu.restaurant
+
+    def test_saving_an_object_creates_its_entry(self):
+        entry = SearchEntry.objects.get(
+            kind=SearchEntry.MENUITEM, object_id=self.test_menuitem.pk)
+        self.assertEqual(entry.name, "Margherita")
+        self.assertEqual(entry.text, "Tomato, basil and mozzarella")
+        self.assertEqual(entry.restaurant, self.test_restaurant)
+        self.assertEqual(entry.menu, self.test_menu)
+        self.assertEqual(entry.menusection, self.test_menusection)
+        self.assertEqual(entry.menuitem, self.test_menuitem)
+        self.assertEqual(
+            entry.get_absolute_url(), self.test_menuitem.get_absolute_url())
+
+        entry = SearchEntry.objects.get(
+            kind=SearchEntry.RESTAURANT, object_id=self.test_restaurant.pk)
+        self.assertEqual(entry.name, self.test_restaurant.name)
+        self.assertIsNone(entry.menu)
+        self.assertEqual(
+            entry.get_absolute_url(), self.test_restaurant.get_absolute_url())
+        self.assertEqual(SearchEntry.objects.count(), 4)
+
+    def test_saving_an_object_updates_its_entry(self):
+        self.test_menuitem.name = "Marinara"
+        self.test_menuitem.save()
+        self.assertEqual(search("margherita"), [])
+        self.assertEqual(
+            search("marinara"),
+            [(SearchEntry.MENUITEM, self.test_menuitem.pk)])
+        self.assertEqual(SearchEntry.objects.count(), 4)
+
+    def test_saving_other_fields_does_not_update_the_entry(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.test_menuitem.save(update_fields=['price'])
+        self.assertFalse(any(
+            SearchEntry._meta.db_table in query['sql']
+            for query in queries))
+
+    def test_deleting_an_object_deletes_its_entries(self):
+        menuitem = f.MenuItemFactory(
+            name="Margherita", menusection__menu=self.test_menu)
+        other_menuitem = f.MenuItemFactory(name="Margherita")
+        self.assertEqual(len(search("margherita")), 3)
+        menuitem.delete()
+        self.assertEqual(len(search("margherita")), 2)
+
+        # and those of its menus, sections and items
+        self.test_restaurant.delete()
+        self.assertEqual(
+            search("margherita"),
+            [(SearchEntry.MENUITEM, other_menuitem.pk)])
+        self.assertFalse(SearchEntry.objects.filter(
+            restaurant=self.test_restaurant.pk).exists())
+
+    def test_index_objects(self):
+        MenuItem.objects.bulk_create([
+            MenuItem(menusection=self.test_menusection, name=name,
+                     slug=name.lower())
+            for name in ["Calzone", "Capricciosa"]])
+        self.assertEqual(search("ca"), [])
+
+        self.assertEqual(index_objects(MenuItem.objects.all()), 3)
+        self.assertEqual(len(search("ca")), 2)
+        # the existing entries are replaced
+        self.assertEqual(
+            SearchEntry.objects.filter(kind=SearchEntry.MENUITEM).count(), 3)
+
+
+class RebuildSearchIndexTest(TestCase):
+
+    def test_rebuild(self):
+        f.MenuItemFactory(name="Margherita")
+        Restaurant.objects.bulk_create([Restaurant(
+            name="Pizzeria Napoli", slug='pizzeria-napoli')])
+        SearchEntry.objects.filter(kind=SearchEntry.MENUITEM).delete()
+
+        stdout = StringIO()
+        call_command('rebuild_search_index', stdout=stdout)
+        self.assertIn(
+            "Indexed 2 restaurants, 1 menus, 1 menu sections, 1 menu items",
+            stdout.getvalue())
+        self.assertEqual(len(search("margherita")), 1)
+        self.assertEqual(len(search("napoli")), 1)
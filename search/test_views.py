@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from menus_project import factories as f
+from .backends import SearchResults, get_query_terms
+from .views import SearchView
+
+
+class SearchResultsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menusection = f.MenuSectionFactory(
+            name="Pizza", note="Baked in a wood-fired oven")
+        cls.test_margherita = f.MenuItemFactory(
+            menusection=cls.test_menusection, name="Margherita",
+            description="Pizza with tomato, basil and mozzarella")
+        cls.test_marinara = f.MenuItemFactory(
+            menusection=cls.test_menusection, name="Marinara",
+            description="Tomato, garlic and oregano")
+
+    def search(self, query):
+        return [entry.name for entry in SearchResults(query)[:100]]
+
+    def test_get_query_terms(self):
+        self.assertEqual(
+            get_query_terms('Crème brûlée, a "dessert"*'),
+            ['crème', 'brûlée', 'dessert'])
+        self.assertEqual(get_query_terms(None), [])
+
+    def test_names_rank_above_text(self):
+        self.assertEqual(self.search("pizza"), ["Pizza", "Margherita"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search("tomato basil"), ["Margherita"])
+        self.assertCountEqual(
+            self.search("tomato"), ["Margherita", "Marinara"])
+
+    def test_prefixes_and_word_forms_match(self):
+        self.assertEqual(self.search("mari"), ["Marinara"])
+        self.assertEqual(self.search("pizzas"), ["Pizza", "Margherita"])
+
+    def test_query_without_words_matches_nothing(self):
+        results = SearchResults(' ""* - ')
+        with self.assertNumQueries(0):
+            self.assertEqual(results.count(), 0)
+            self.assertEqual(results[:10], [])
+
+    def test_slices(self):
+        results = SearchResults("tomato")
+        self.assertEqual(results.count(), 2)
+        self.assertEqual(len(results[1:]), 1)
+        self.assertEqual(results[2:4], [])
+        with self.assertRaises(TypeError):
+            results[0]
+
+
+class SearchViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_menuitems = [
+            f.MenuItemFactory(name=f"Margherita {name}")
+            for name in ["Classica", "Speciale", "Bianca"]]
+
+    def test_results(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('search:search'), {'q': 'margherita speciale'})
+        self.assertTemplateUsed(response, 'search/search.html')
+        self.assertContains(response, '1 result for "margherita speciale"')
+        menuitem = self.test_menuitems[1]
+        self.assertContains(
+            response,
+            f'<a href="{menuitem.get_absolute_url()}">{menuitem.name}</a>',
+            html=True)
+        self.assertContains(response, menuitem.menusection.name)
+
+    def test_no_results(self):
+        response = self.client.get(reverse('search:search'), {'q': 'calzone'})
+        self.assertContains(response, "Nothing was found.")
+
+    def test_empty_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('search:search'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Nothing was found.")
+
+    @mock.patch.object(SearchView, 'paginate_by', 2)
+    def test_pagination(self):
+        response = self.client.get(
+            reverse('search:search'), {'q': 'margherita'})
+        self.assertContains(response, '3 results for "margherita"')
+        self.assertEqual(len(response.context['results']), 2)
+        self.assertContains(response, 'Page 1 of 2')
+        self.assertContains(response, '?q=margherita&amp;page=2')
+
+        response = self.client.get(
+            reverse('search:search'), {'q': 'margherita', 'page': 2})
+        self.assertEqual(len(response.context['results']), 1)
+
+        response = self.client.get(
+            reverse('search:search'), {'q': 'margherita', 'page': 3})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from menus_project.async_views import async_read_view
+from . import views
+
+app_name = 'search'
+
+urlpatterns = [
+    path('',
+         async_read_view(views.SearchView.as_view()),
+         name='search'),
+    ]
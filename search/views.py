@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.views.generic import ListView
+
+from .backends import SearchResults
+
+
+class SearchView(ListView):
+    template_name = 'search/search.html'
+    context_object_name = 'results'
+    paginate_by = settings.SEARCH_PAGE_SIZE
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return SearchResults(self.get_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        return context